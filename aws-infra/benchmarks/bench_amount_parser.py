@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark the batch amount column parser against the per-cell parser
+
+Builds --cells synthetic amount cells (grouped amounts, CR/DR/C/D suffixes,
+₹/Rs/INR prefixes, blanks and dashes) and reports cells/second for
+parse_amount() called per cell and parse_amount_column() on the whole column.
+
+    python bench_amount_parser.py --cells 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+DEFAULT_PDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'handlers', 'pdf')
+
+PREFIXES = ['', '', '', '₹', 'Rs ', 'INR ']
+SUFFIXES = ['', '', ' CR', ' DR', ' Cr', 'Dr', ' C', ' D']
+BLANKS = ['', '-', ' ', '0.0']
+
+
+def synthetic_cells(count, seed=7):
+    """Amount cells roughly as pdfplumber returns them from statement tables"""
+    rng = random.Random(seed)
+    cells = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            cells.append(rng.choice(BLANKS))
+            continue
+        amount = f"{rng.randint(1, 9999999):,}.{rng.randint(0, 99):02d}"
+        cells.append(f"{rng.choice(PREFIXES)}{amount}{rng.choice(SUFFIXES)}")
+    return cells
+
+
+def run(pdf_dir, cell_count, repeat):
+    sys.path.insert(0, os.path.abspath(pdf_dir))
+    import statement_amounts
+
+    cells = synthetic_cells(cell_count)
+    scalar = _best_of(repeat, lambda: [statement_amounts.parse_amount(cell) for cell in cells])
+    batch = _best_of(repeat, lambda: statement_amounts.parse_amount_column(cells))
+
+    expected = [statement_amounts.parse_amount(cell) for cell in cells]
+    if statement_amounts.parse_amount_column(cells) != expected:
+        raise SystemExit('parse_amount_column() disagrees with parse_amount()')
+
+    print(f"{'parser':<28} {'cells':>8} {'seconds':>9} {'cells/sec':>12}")
+    print(f"{'parse_amount (per cell)':<28} {cell_count:>8} {scalar:>9.3f} {cell_count / scalar:>12,.0f}")
+    print(f"{'parse_amount_column':<28} {cell_count:>8} {batch:>9.3f} {cell_count / batch:>12,.0f}")
+    print(f"speedup: {scalar / batch:.2f}x")
+
+
+def _best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pdf-dir', default=DEFAULT_PDF_DIR, help='directory containing statement_amounts.py')
+    arg_parser.add_argument('--cells', type=int, default=100000, help='synthetic amount cells')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per parser (best time is reported)')
+    args = arg_parser.parse_args()
+    run(args.pdf_dir, args.cells, args.repeat)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for KeywordAutomaton against per-keyword `in` tests
+
+Runs every keyword list the parser and the fallback categories match with
+over --lines synthetic statement lines, once as any(k in line for k in
+keywords) and once through the automaton, and checks both agree. Install
+pyahocorasick to measure the accelerated automaton:
+
+    python bench_keyword_matcher.py
+    pip install pyahocorasick && python bench_keyword_matcher.py
+"""
+
+import argparse
+import os
+import sys
+
+from bench_line_parsers import DEFAULT_PDF_DIR, NOISE, _best_of, synthetic_lines
+
+
+def run(pdf_dir, line_count, repeat):
+    sys.path.insert(0, os.path.abspath(pdf_dir))
+    import fallback_categories
+    import keyword_matcher
+    import statement_patterns as patterns
+
+    lines = []
+    for layout in ('generic', 'icici_cc', 'hdfc_cc', 'sbi_cc'):
+        lines.extend(synthetic_lines(layout, line_count // 4))
+    lines.extend(NOISE)
+    lowered = [line.lower() for line in lines]
+
+    fallback_keywords = [keyword for _, _, keywords, _ in fallback_categories.FALLBACK_RULES for keyword in keywords]
+    cases = [
+        ('transaction_indicators', patterns.SCHEMA_TRANSACTION_INDICATORS, lines),
+        ('card_summary_terms', patterns.CREDIT_CARD_SUMMARY_TERMS, lowered),
+        ('sbi_summary_terms', patterns.SBI_CC_SUMMARY_TERMS, lowered),
+        ('transaction_row_keywords', patterns.TRANSACTION_ROW_KEYWORDS, lowered),
+        ('fallback_rules', keyword_matcher.KeywordAutomaton(fallback_keywords), lowered),
+    ]
+
+    backend = 'pyahocorasick' if keyword_matcher.AHOCORASICK_AVAILABLE else 'trie regex'
+    print(f"automaton backend: {backend}, {len(lines)} lines")
+    print(f"{'keywords':<26} {'count':>6} {'any(in) s':>10} {'automaton s':>12} {'speedup':>8}")
+    for name, automaton, texts in cases:
+        keywords = automaton.keywords
+        expected = [any(keyword in text for keyword in keywords) for text in texts]
+        if [automaton.found_in(text) for text in texts] != expected:
+            raise SystemExit(f"{name}: automaton disagrees with the per-keyword tests")
+        naive = _best_of(repeat, lambda: [any(keyword in text for keyword in keywords) for text in texts])
+        matched = _best_of(repeat, lambda: [automaton.found_in(text) for text in texts])
+        print(f"{name:<26} {len(keywords):>6} {naive:>10.3f} {matched:>12.3f} {naive / matched:>7.1f}x")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pdf-dir', default=DEFAULT_PDF_DIR, help='directory containing keyword_matcher.py')
+    arg_parser.add_argument('--lines', type=int, default=40000, help='synthetic lines')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per case (best time is reported)')
+    args = arg_parser.parse_args()
+    run(args.pdf_dir, args.lines, args.repeat)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the bank statement line parsers
+
+Builds a synthetic statement of --lines lines per layout (transactions mixed
+with header/summary noise) and reports lines/second for each text parser.
+
+Compare two versions of the parser by pointing --pdf-dir at each checkout:
+
+    python bench_line_parsers.py --pdf-dir /path/to/old/aws-infra/src/handlers/pdf
+    python bench_line_parsers.py
+
+Checkouts from before StatementDocument read schema-inference input from a
+PDF path, so for them that case parses the lines written to a real PDF and
+its time includes pdfplumber's text extraction (marked in the report).
+"""
+
+import argparse
+import atexit
+import inspect
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+DEFAULT_PDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'handlers', 'pdf')
+
+MERCHANTS = ['SWIGGY BANGALORE', 'AMAZON PAY INDIA', 'UBER INDIA SYSTEMS', 'MyntraDesignsPvtLtd GURGOAN 31',
+             'NETFLIX.COM MUMBAI', 'BBPS Payment received', 'ZOMATO LIMITED', 'IRCTC E TICKETING DELHI']
+NOISE = ['Page 3 of 40', 'Customer Care 1800 1080', 'Minimum Amount Due 5,000.00', 'Reward Points Summary',
+         'Statement Date 15/05/2025', 'Terms and Conditions apply', 'Credit Limit 2,00,000.00', '']
+
+
+def _amount(rng):
+    return f"{rng.randint(1, 99999):,}.{rng.randint(0, 99):02d}"
+
+
+def _slash_date(rng):
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025"
+
+
+def synthetic_lines(layout, count, seed=7):
+    """Synthetic statement lines for one layout, roughly 70% transactions"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        if rng.random() > 0.7:
+            lines.append(rng.choice(NOISE))
+            continue
+        merchant = rng.choice(MERCHANTS)
+        if layout == 'icici_cc':
+            suffix = rng.choice(['', ' CR', ' DR'])
+            lines.append(f"{_slash_date(rng)} {rng.randint(10**10, 10**11)} {merchant} {rng.randint(0, 40)} {_amount(rng)}{suffix}")
+        elif layout == 'hdfc_cc':
+            lines.append(f"{_slash_date(rng)} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00 {merchant} {_amount(rng)}{rng.choice(['', 'Cr'])}")
+        elif layout == 'sbi_cc':
+            lines.append(f"{rng.randint(1, 28)} {rng.choice(['Jan', 'Apr', 'Sep'])} 25 {merchant} {_amount(rng)} {rng.choice(['C', 'D'])}")
+        elif layout == 'indusind_cc':
+            lines.append(f"{_slash_date(rng)} {merchant} IN RESTAURANTS 41 {_amount(rng)} {rng.choice(['CR', 'DR'])}")
+        else:
+            lines.append(f"{rng.randint(1, 28):02d}-04-2025 UPI/{merchant.split()[0]}/Payment {_amount(rng)} {_amount(rng)}")
+    return lines
+
+
+class TextDocument:
+    """Minimal stand-in for StatementDocument built from plain text lines"""
+
+    def __init__(self, lines):
+        self.full_text = '\n'.join(lines) + '\n'
+        self.lines = self.full_text.split('\n')
+
+
+def takes_pdf_path(method):
+    """Whether a checkout's parser method still opens the PDF itself from (pdf_path, password)"""
+    return next(iter(inspect.signature(method).parameters), None) == 'pdf_path'
+
+
+def write_text_pdf(lines):
+    """Path of a temporary PDF with the lines drawn one per row, removed when the process exits"""
+    from synthetic_statements import text_pdf
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as pdf_file:
+        pdf_file.write(text_pdf(lines))
+    atexit.register(os.remove, pdf_file.name)
+    return pdf_file.name
+
+
+def schema_inference_call(parser, lines):
+    """(zero-argument call running the checkout's schema inference on the lines, whether it reads a PDF)"""
+    if takes_pdf_path(parser._parse_with_schema_inference):
+        path = write_text_pdf(lines)
+        return (lambda: parser._parse_with_schema_inference(path)), True
+    return (lambda: parser._parse_with_schema_inference(TextDocument(lines))), False
+
+
+def run(pdf_dir, line_count, repeat):
+    sys.path.insert(0, os.path.abspath(pdf_dir))
+    import parseBankStatement
+
+    # Parsing cost only: keep per-line INFO logging out of the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+    parser = parseBankStatement.ICICIStatementParser()
+
+    cases = [
+        ('icici_cc', parser._parse_icici_credit_card_text),
+        ('hdfc_cc', parser._parse_hdfc_credit_card_text),
+        ('sbi_cc', parser._parse_sbi_credit_card_text),
+        ('indusind_cc', parser._parse_indusind_credit_card_text),
+    ]
+    generic_lines = ['DATE PARTICULARS WITHDRAWALS DEPOSITS BALANCE'] + synthetic_lines('generic', line_count)
+
+    results = []
+    for name, parse in cases:
+        lines = synthetic_lines(name, line_count)
+        results.append((name, len(lines), _best_of(repeat, lambda: parse(lines))))
+    schema_inference, from_pdf = schema_inference_call(parser, generic_lines)
+    results.append(('schema_inference (from PDF)' if from_pdf else 'schema_inference', len(generic_lines),
+                    _best_of(repeat, schema_inference)))
+    results.append(('looks_like_transaction_row', len(generic_lines),
+                    _best_of(repeat, lambda: [parser._looks_like_transaction_row(line) for line in generic_lines])))
+
+    print(f"{'parser':<28} {'lines':>8} {'seconds':>9} {'lines/sec':>12}")
+    for name, lines, seconds in results:
+        print(f"{name:<28} {lines:>8} {seconds:>9.3f} {lines / seconds:>12,.0f}")
+
+
+def _best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pdf-dir', default=DEFAULT_PDF_DIR, help='directory containing parseBankStatement.py')
+    arg_parser.add_argument('--lines', type=int, default=50000, help='synthetic lines per layout')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per parser (best time is reported)')
+    args = arg_parser.parse_args()
+    run(args.pdf_dir, args.lines, args.repeat)
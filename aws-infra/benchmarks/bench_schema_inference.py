@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark the generic text parser (schema inference) on multi-line narrations
+
+Builds a bank statement of --lines lines where most dated rows carry one to
+four narration lines above them, with page footers, balance forward rows and
+summary lines mixed in, and reports lines/second. With --baseline-dir the
+same statement is parsed by another checkout as well; the run fails when the
+transactions differ or the speedup is below --min-speedup:
+
+    python bench_schema_inference.py --baseline-dir /path/to/old/aws-infra/src/handlers/pdf --min-speedup 1.5
+
+The parse-only comparison needs a baseline that takes a StatementDocument,
+i.e. 0b8888f or later; ece05fc^ is the tree just before the single-pass
+parser. Older checkouts such as 995edce only parse a PDF path: against them
+the statement is written to a real PDF and both checkouts parse that file, so
+both times include pdfplumber's text extraction and the speedup mostly
+disappears. --from-pdf does the same for any pair of checkouts.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+
+from bench_line_parsers import DEFAULT_PDF_DIR, MERCHANTS, TextDocument, _amount, _best_of, takes_pdf_path, write_text_pdf
+
+HEADER = 'DATE PARTICULARS WITHDRAWALS DEPOSITS BALANCE'
+NARRATIONS = ['UPI/{ref}/{merchant}/Payment from Ph', 'NEFT/N{ref}/ACME CORP SALARY', 'MMT/IMPS/{ref}/{merchant}',
+              'Ref No {ref} transferred via mobile app', 'BIL/ONL/{ref}/{merchant}', 'ACH/{merchant} MANDATE/{ref}']
+INTERRUPTIONS = ['Page 3 of 40', 'B/F 1,00,000.00', 'Minimum Amount Due 5,000.00', '', 'Statement of account',
+                 '12,345.00']
+
+
+def synthetic_statement(count, seed=11):
+    """Generic statement lines: dated rows preceded by narration lines"""
+    rng = random.Random(seed)
+    lines = [HEADER]
+    while len(lines) < count:
+        if rng.random() < 0.1:
+            lines.append(rng.choice(INTERRUPTIONS))
+        for _ in range(rng.choice([0, 1, 1, 2, 2, 3, 4])):
+            lines.append(rng.choice(NARRATIONS).format(ref=rng.randint(10**9, 10**10), merchant=rng.choice(MERCHANTS)))
+        separator = rng.choice(['-', '/'])
+        lines.append(f"{rng.randint(1, 28):02d}{separator}04{separator}2025 {rng.choice(['MOBILE BANKING', 'UPI/', 'ATM WDL', 'NEFT-ACME'])}"
+                     f" {_amount(rng)} {_amount(rng)}")
+    return lines[:count]
+
+
+def measure(pdf_dir, line_count, repeat, from_pdf=False):
+    """(lines, best seconds, transactions, digest of the transactions, parsed from a PDF) for one checkout"""
+    sys.path.insert(0, os.path.abspath(pdf_dir))
+    import parseBankStatement
+
+    logging.getLogger().setLevel(logging.WARNING)
+    parser = parseBankStatement.ICICIStatementParser()
+    lines = synthetic_statement(line_count)
+    reads_pdf = takes_pdf_path(parser._parse_with_schema_inference)
+    if reads_pdf or from_pdf:
+        path = write_text_pdf(lines)
+        if reads_pdf:
+            def parse():
+                return parser._parse_with_schema_inference(path)
+        else:
+            def parse():
+                # A fresh document each run, so text extraction is timed like in checkouts that open the path
+                with parseBankStatement.StatementDocument(path) as document:
+                    return parser._parse_with_schema_inference(document)
+    else:
+        document = TextDocument(lines)
+
+        def parse():
+            return parser._parse_with_schema_inference(document)
+    transactions = parse()
+    encoded = json.dumps(transactions, default=getattr(parseBankStatement, 'encode_transaction', None), sort_keys=True)
+    seconds = _best_of(repeat, parse)
+    return (line_count, seconds, len(transactions), hashlib.sha256(encoded.encode('utf-8')).hexdigest(),
+            reads_pdf or from_pdf)
+
+
+def _measure_in_subprocess(pdf_dir, line_count, repeat, from_pdf=False):
+    # Each checkout imports modules with the same names, so it runs in its own interpreter
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--pdf-dir', pdf_dir,
+                                      '--lines', str(line_count), '--repeat', str(repeat), '--json']
+                                     + (['--from-pdf'] if from_pdf else []))
+    return tuple(json.loads(output))
+
+
+def run(pdf_dir, line_count, repeat, baseline_dir=None, min_speedup=None, from_pdf=False):
+    results = []
+    if baseline_dir:
+        baseline = _measure_in_subprocess(baseline_dir, line_count, repeat, from_pdf)
+        # A baseline that can only parse a PDF path sets the input for both checkouts
+        from_pdf = baseline[4]
+        results.append(('baseline', baseline))
+    results.insert(0, ('current', _measure_in_subprocess(pdf_dir, line_count, repeat, from_pdf)))
+
+    print(f"{'checkout':<10} {'lines':>8} {'txns':>7} {'seconds':>9} {'lines/sec':>12}"
+          + ('   (parsed from a PDF: times include text extraction)' if from_pdf else ''))
+    for name, (lines, seconds, count, _, _) in results:
+        print(f"{name:<10} {lines:>8} {count:>7} {seconds:>9.3f} {lines / seconds:>12,.0f}")
+    if not baseline_dir:
+        return
+
+    (_, current_seconds, _, current_digest, _), (_, baseline_seconds, _, baseline_digest, _) = results[0][1], results[1][1]
+    speedup = baseline_seconds / current_seconds
+    print(f"speedup: {speedup:.2f}x, transactions {'identical' if current_digest == baseline_digest else 'DIFFER'}")
+    if current_digest != baseline_digest:
+        raise SystemExit("Transactions differ from the baseline checkout")
+    if min_speedup is not None and speedup < min_speedup:
+        raise SystemExit(f"Speedup {speedup:.2f}x is below --min-speedup {min_speedup:.2f}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pdf-dir', default=DEFAULT_PDF_DIR, help='directory containing parseBankStatement.py')
+    arg_parser.add_argument('--baseline-dir', help='checkout to compare against (same layout as --pdf-dir)')
+    arg_parser.add_argument('--lines', type=int, default=50000, help='synthetic statement lines')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per checkout (best time is reported)')
+    arg_parser.add_argument('--min-speedup', type=float, help='fail when baseline/current time is below this')
+    arg_parser.add_argument('--from-pdf', action='store_true',
+                            help='parse the statement from a real PDF (automatic for baselines that need one)')
+    arg_parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    if args.json:
+        print(json.dumps(measure(args.pdf_dir, args.lines, args.repeat, args.from_pdf)))
+    else:
+        run(args.pdf_dir, args.lines, args.repeat, args.baseline_dir, args.min_speedup, args.from_pdf)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Benchmark and regression-check the statement parser on a synthetic PDF corpus
+
+For every layout in synthetic_statements (ICICI savings and card, HDFC
+savings and card, SBI card, IndusInd card) a statement of --pages pages is
+generated and parsed end to end with ICICIStatementParser.parse_pdf_bytes,
+each layout in its own interpreter so peak RSS is per layout. Reported per
+layout: pages/sec, transactions/sec, peak RSS, how many of the transactions
+drawn on the PDF were read back, and the time spent in each stage of the
+parse (table extraction strategies, line parsers, schema inference, pdfplumber
+text/table reads).
+
+Save a baseline before a change and check the change against it:
+
+    python bench_statement_corpus.py --pages 20 --save-baseline corpus-baseline.json
+    python bench_statement_corpus.py --pages 20 --baseline corpus-baseline.json --max-regression 0.15
+
+The check fails when a layout's transactions differ from the baseline's,
+fewer of the drawn transactions are recovered, or pages/sec falls more than
+--max-regression below the baseline. Throughput baselines are only
+comparable on the same machine; pdfplumber must be installed.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+from collections import Counter
+
+from bench_line_parsers import DEFAULT_PDF_DIR, _best_of
+from synthetic_statements import LAYOUTS, ROWS_PER_PAGE, synthetic_statement
+
+# Stages reported in the per-strategy table, in pipeline order
+STAGE_COLUMNS = ['pdf_text', 'pdf_tables', 'detect_statement_type', 'table_parsing', 'line_parsing', 'schema_inference']
+
+
+def _peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _recovered(transactions, expected):
+    """How many drawn (date, amount) transactions the parser read back"""
+    parsed = Counter((txn['date'], round(txn['amount'], 2)) for txn in transactions)
+    return sum((parsed & Counter(expected)).values())
+
+
+def measure(pdf_dir, layout, pages, rows_per_page, repeat):
+    """Throughput, memory, recovery and stage timings for one layout parsed by one checkout"""
+    # Every run parses from scratch: no parse cache, no S3, no layout learned by an earlier run
+    os.environ['PDF_PARSE_CACHE'] = '0'
+    os.environ['PDF_LAYOUT_MEMORY'] = '0'
+    for name in ('PDF_PARSE_CACHE_BUCKET', 'PDF_CHECKPOINT_BUCKET', 'PROFILE_BUCKET'):
+        os.environ.pop(name, None)
+    sys.path.insert(0, os.path.abspath(pdf_dir))
+    import parseBankStatement
+    try:
+        from instrumentation import metrics
+    except ImportError:  # checkouts from before per-stage timings
+        metrics = None
+
+    logging.getLogger().setLevel(logging.WARNING)
+    pdf_bytes, expected = synthetic_statement(layout, pages, rows_per_page)
+    parser = parseBankStatement.ICICIStatementParser()
+    transactions = parser.parse_pdf_bytes(pdf_bytes)
+    encoded = json.dumps(transactions, default=getattr(parseBankStatement, 'encode_transaction', None), sort_keys=True)
+
+    best = {}
+
+    def parse():
+        if metrics:
+            metrics.reset()
+        parser.parse_pdf_bytes(pdf_bytes)
+
+    def timed_parse():
+        parse()
+        timings = metrics.timings() if metrics else {'stages_ms': {}, 'counters': {}}
+        if not best or sum(timings['stages_ms'].values()) < sum(best['stages_ms'].values()):
+            best.update(timings)
+
+    seconds = _best_of(repeat, timed_parse)
+    return {
+        'layout': layout,
+        'pages': pages,
+        'transactions': len(transactions),
+        'expected': len(expected),
+        'recovered': _recovered(transactions, expected),
+        'seconds': round(seconds, 4),
+        'pages_per_second': round(pages / seconds, 2),
+        'transactions_per_second': round(len(transactions) / seconds, 2),
+        'peak_rss_mib': _peak_rss_mib(),
+        'stages_ms': best.get('stages_ms', {}),
+        'counters': best.get('counters', {}),
+        'digest': hashlib.sha256(encoded.encode('utf-8')).hexdigest(),
+    }
+
+
+def _measure_in_subprocess(pdf_dir, layout, pages, rows_per_page, repeat):
+    # A fresh interpreter per layout keeps peak RSS per layout and lets --pdf-dir be any checkout
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--pdf-dir', pdf_dir,
+                                      '--layout', layout, '--pages', str(pages), '--rows-per-page', str(rows_per_page),
+                                      '--repeat', str(repeat), '--json'])
+    return json.loads(output)
+
+
+def regressions(results, baseline, max_regression):
+    """Messages for every layout that parses differently or slower than the baseline"""
+    if (baseline['pages'], baseline['rows_per_page']) != (results['pages'], results['rows_per_page']):
+        return [f"baseline corpus has {baseline['pages']} pages of {baseline['rows_per_page']} rows, "
+                f"this run {results['pages']} pages of {results['rows_per_page']} rows"]
+    failures = []
+    for layout, current in results['layouts'].items():
+        previous = baseline['layouts'].get(layout)
+        if previous is None:
+            continue
+        if current['recovered'] < previous['recovered']:
+            failures.append(f"{layout}: recovered {current['recovered']}/{current['expected']} transactions, "
+                            f"baseline {previous['recovered']}")
+        elif current['digest'] != previous['digest']:
+            failures.append(f"{layout}: transactions differ from the baseline "
+                            f"({current['transactions']} now, {previous['transactions']} before)")
+        floor = previous['pages_per_second'] * (1 - max_regression)
+        if current['pages_per_second'] < floor:
+            failures.append(f"{layout}: {current['pages_per_second']:.1f} pages/s is more than {max_regression:.0%} "
+                            f"below the baseline {previous['pages_per_second']:.1f} pages/s")
+    return failures
+
+
+def _print_report(results, baseline=None):
+    layouts = results['layouts']
+    print(f"{'layout':<14} {'pages':>5} {'txns':>6} {'recovered':>10} {'seconds':>8} {'pages/s':>9} {'txns/s':>9} "
+          f"{'rss MiB':>8} {'vs base':>8}")
+    for layout, result in layouts.items():
+        previous = (baseline or {}).get('layouts', {}).get(layout)
+        change = f"{result['pages_per_second'] / previous['pages_per_second'] - 1:+.0%}" if previous else ''
+        print(f"{layout:<14} {result['pages']:>5} {result['transactions']:>6} "
+              f"{result['recovered']:>5}/{result['expected']:<4} {result['seconds']:>8.3f} "
+              f"{result['pages_per_second']:>9.1f} {result['transactions_per_second']:>9.1f} "
+              f"{result['peak_rss_mib']:>8.1f} {change:>8}")
+
+    print(f"\nstage ms (nested: table_parsing includes pdf_tables)\n{'layout':<14} "
+          + ' '.join(f"{stage:>{max(len(stage), 8)}}" for stage in STAGE_COLUMNS) + f" {'strategies':>10}")
+    for layout, result in layouts.items():
+        stages = result['stages_ms']
+        cells = ' '.join(f"{stages.get(stage, 0.0):>{max(len(stage), 8)}.1f}" for stage in STAGE_COLUMNS)
+        print(f"{layout:<14} {cells} {result['counters'].get('table_strategies_tried', 0):>10}")
+
+
+def run(pdf_dir, layouts, pages, rows_per_page, repeat, baseline_path=None, save_baseline=None, max_regression=0.2):
+    results = {
+        'pages': pages,
+        'rows_per_page': rows_per_page,
+        'layouts': {layout: _measure_in_subprocess(pdf_dir, layout, pages, rows_per_page, repeat)
+                    for layout in layouts},
+    }
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+    _print_report(results, baseline)
+
+    if save_baseline:
+        with open(save_baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"\nbaseline written to {save_baseline}")
+    if baseline:
+        failures = regressions(results, baseline, max_regression)
+        if failures:
+            raise SystemExit('Regressions against the baseline:\n  ' + '\n  '.join(failures))
+        print(f"\nno regressions against {baseline_path} (max throughput regression {max_regression:.0%})")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pdf-dir', default=DEFAULT_PDF_DIR, help='directory containing parseBankStatement.py')
+    arg_parser.add_argument('--layout', action='append', choices=LAYOUTS, help='layouts to run (default: all)')
+    arg_parser.add_argument('--pages', type=int, default=10, help='pages per synthetic statement')
+    arg_parser.add_argument('--rows-per-page', type=int, default=ROWS_PER_PAGE, help='transactions per page')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='parses per layout (best time is reported)')
+    arg_parser.add_argument('--baseline', help='results JSON from --save-baseline to check against')
+    arg_parser.add_argument('--save-baseline', help='write this run\'s results as a baseline JSON')
+    arg_parser.add_argument('--max-regression', type=float, default=0.2,
+                            help='fail when pages/sec drops by more than this fraction of the baseline')
+    arg_parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    if args.json:
+        print(json.dumps(measure(args.pdf_dir, args.layout[0], args.pages, args.rows_per_page, args.repeat)))
+    else:
+        run(args.pdf_dir, args.layout or LAYOUTS, args.pages, args.rows_per_page, args.repeat,
+            args.baseline, args.save_baseline, args.max_regression)
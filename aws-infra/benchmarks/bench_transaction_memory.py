@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Measure the memory held by parsed transactions with tracemalloc
+
+Parses --lines synthetic statement lines (or table rows) per layout and
+reports the tracemalloc peak while parsing and keeping the transactions, and
+while also encoding them into the JSON response body. A run of at least
+LIMIT_LINES lines fails when a case's parse peak per transaction goes over
+its limit in PEAK_BYTES_PER_TRANSACTION (smaller runs are dominated by fixed
+costs such as the date cache); --max-bytes-per-transaction sets one limit for
+every case at any size. The per-row dicts used before the slotted Transaction
+records go over the card and table limits. Pass --baseline-dir to run the same
+measurement against another checkout and also fail when the peak is not
+reduced enough:
+
+    python bench_transaction_memory.py
+    python bench_transaction_memory.py --baseline-dir /path/to/old/aws-infra/src/handlers/pdf --max-ratio 0.9
+
+--stream also reads synthetic statements of STREAM_PAGES pages through
+iter_transactions() without keeping the transactions, and fails when the peak
+for the longest statement is more than STREAM_MAX_GROWTH times the peak for
+the shortest; this case needs pdfplumber and only runs on the current tree:
+
+    python bench_transaction_memory.py --stream
+
+Any checkout back to the pre-series tree (995edce) can be the baseline. The
+schema_inference case is left out for checkouts from before StatementDocument,
+whose schema inference only reads a PDF path: its peak would be mostly
+pdfplumber's.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from bench_line_parsers import DEFAULT_PDF_DIR, MERCHANTS, TextDocument, synthetic_lines, takes_pdf_path
+from synthetic_statements import synthetic_statement
+
+TABLE_HEADERS = ['Date', 'Narration', 'Withdrawal Amt.', 'Deposit Amt.', 'Closing Balance']
+
+# Parse peak bytes per transaction allowed per case at LIMIT_LINES lines, about 20-35% above the slotted
+# records (icici_cc also keeps each row's serial number, schema_inference its inferred rows)
+LIMIT_LINES = 20000
+PEAK_BYTES_PER_TRANSACTION = {
+    'icici_cc': 380,
+    'hdfc_cc': 300,
+    'sbi_cc': 300,
+    'indusind_cc': 300,
+    'schema_inference': 900,
+    'table_rows': 340,
+}
+
+# Streamed statements: a text card, a table layout and ICICI's text plus table pages. Reading 16x the pages
+# raises the peak about 1.25x (1.5x for ICICI, which remembers every row's signature to drop duplicates);
+# parse_pdf_bytes, which keeps every page, peaks about 15x higher on the same statements
+STREAM_LAYOUTS = ('hdfc_cc', 'hdfc_savings', 'icici_cc')
+STREAM_PAGES = (4, 16, 64)
+STREAM_MAX_GROWTH = 1.75
+
+
+def synthetic_rows(count, seed=7):
+    """Bank statement table rows as pdfplumber returns them"""
+    rng = random.Random(seed)
+    rows = []
+    balance = 500000.0
+    for _ in range(count):
+        amount = round(rng.uniform(1, 9999), 2)
+        debit = rng.random() < 0.7
+        balance += -amount if debit else amount
+        narration = f"UPI/{rng.randint(10**11, 10**12)}/{rng.choice(MERCHANTS)}/Payment from Ph"
+        rows.append([f"{rng.randint(1, 28):02d}/04/2025", narration, f"{amount:,.2f}" if debit else '',
+                     '' if debit else f"{amount:,.2f}", f"{balance:,.2f}"])
+    return rows
+
+
+def measure(pdf_dir, line_count):
+    """{case: (transactions, parse peak bytes, parse+encode peak bytes)} for one checkout"""
+    sys.path.insert(0, os.path.abspath(pdf_dir))
+    import parseBankStatement
+
+    logging.getLogger().setLevel(logging.WARNING)
+    parser = parseBankStatement.ICICIStatementParser()
+    encode = getattr(parseBankStatement, 'encode_transaction', None)
+
+    headers = TABLE_HEADERS
+    column_mapping = parser._infer_column_mapping(headers)
+    cases = {
+        'icici_cc': (parser._parse_icici_credit_card_text, synthetic_lines('icici_cc', line_count)),
+        'hdfc_cc': (parser._parse_hdfc_credit_card_text, synthetic_lines('hdfc_cc', line_count)),
+        'sbi_cc': (parser._parse_sbi_credit_card_text, synthetic_lines('sbi_cc', line_count)),
+        'indusind_cc': (parser._parse_indusind_credit_card_text, synthetic_lines('indusind_cc', line_count)),
+        'schema_inference': (lambda lines: parser._parse_with_schema_inference(TextDocument(lines)),
+                             ['DATE PARTICULARS WITHDRAWALS DEPOSITS BALANCE'] + synthetic_lines('generic', line_count)),
+        'table_rows': (lambda rows: [parser._parse_table_row(row, headers, column_mapping) for row in rows],
+                       synthetic_rows(line_count)),
+    }
+    if takes_pdf_path(parser._parse_with_schema_inference):
+        del cases['schema_inference']
+
+    results = {}
+    for name, (parse, source) in cases.items():
+        tracemalloc.start()
+        transactions = parse(source)
+        _, parse_peak = tracemalloc.get_traced_memory()
+        body = json.dumps({'transactions': transactions}, indent=2, default=encode)
+        _, encode_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = (len(transactions), parse_peak, encode_peak)
+        del transactions, body
+    return results
+
+
+def measure_streaming(pdf_dir):
+    """{layout: [(pages, transactions, peak bytes), ...]} reading each statement through iter_transactions()"""
+    sys.path.insert(0, os.path.abspath(pdf_dir))
+    import parseBankStatement
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {}
+    for layout in STREAM_LAYOUTS:
+        results[layout] = []
+        for pages in STREAM_PAGES:
+            # Read from a file, as the PDF bytes would otherwise grow with the page count
+            pdf_bytes, _ = synthetic_statement(layout, pages)
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as pdf_file:
+                pdf_file.write(pdf_bytes)
+            del pdf_bytes
+            try:
+                parser = parseBankStatement.ICICIStatementParser()
+                tracemalloc.start()
+                count = sum(1 for _ in parser.iter_transactions(pdf_file.name))
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            finally:
+                os.remove(pdf_file.name)
+            results[layout].append((pages, count, peak))
+    return results
+
+
+def _measure_in_subprocess(pdf_dir, line_count, stream=False):
+    # Each checkout imports modules with the same names, so it is measured in its own interpreter
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--pdf-dir', pdf_dir,
+                                      '--lines', str(line_count), '--json'] + (['--stream'] if stream else []))
+    return {name: tuple(values) for name, values in json.loads(output).items()}
+
+
+def _check_streaming(pdf_dir):
+    """Report streamed peaks per page count and the failures where the peak grew with the statement"""
+    print(f"\n{'streamed layout':<18} {'pages':>7} {'txns':>7} {'peak KiB':>10} {'growth':>7}")
+    failures = []
+    for layout, runs in _measure_in_subprocess(pdf_dir, 0, stream=True).items():
+        first_peak = runs[0][2]
+        for pages, count, peak in runs:
+            print(f"{layout:<18} {pages:>7} {count:>7} {peak / 1024:>10,.0f} {peak / first_peak:>7.2f}")
+        growth = runs[-1][2] / first_peak
+        if growth > STREAM_MAX_GROWTH:
+            failures.append(f"{layout}: streamed peak grew {growth:.2f}x from {runs[0][0]} to {runs[-1][0]} pages, "
+                            f"limit {STREAM_MAX_GROWTH:.2f}x")
+    return failures
+
+
+def run(pdf_dir, line_count, baseline_dir=None, max_ratio=None, max_bytes_per_transaction=None, stream=False):
+    current = _measure_in_subprocess(pdf_dir, line_count)
+    baseline = _measure_in_subprocess(baseline_dir, line_count) if baseline_dir else None
+
+    print(f"{'case':<18} {'txns':>7} {'parse KiB':>10} {'B/txn':>7} {'+encode KiB':>12}"
+          + (f" {'baseline KiB':>13} {'ratio':>6}" if baseline else ''))
+    worst_ratio = 0.0
+    failures = []
+    for name, (count, parse_peak, encode_peak) in current.items():
+        per_transaction = parse_peak / max(count, 1)
+        limit = max_bytes_per_transaction or (PEAK_BYTES_PER_TRANSACTION[name] if line_count >= LIMIT_LINES else None)
+        if limit and per_transaction > limit:
+            failures.append(f"{name}: {per_transaction:,.0f} bytes per transaction, limit {limit:,}")
+        line = f"{name:<18} {count:>7} {parse_peak / 1024:>10,.0f} {per_transaction:>7,.0f} {encode_peak / 1024:>12,.0f}"
+        if baseline and name in baseline:
+            ratio = parse_peak / baseline[name][1]
+            worst_ratio = max(worst_ratio, ratio)
+            line += f" {baseline[name][1] / 1024:>13,.0f} {ratio:>6.2f}"
+        elif baseline:
+            line += f" {'n/a':>13} {'':>6}"
+        print(line)
+
+    if baseline and max_ratio is not None and worst_ratio > max_ratio:
+        failures.append(f"peak memory ratio {worst_ratio:.2f} exceeds --max-ratio {max_ratio:.2f}")
+    if stream:
+        failures += _check_streaming(pdf_dir)
+    if failures:
+        raise SystemExit('Peak memory over the limit:\n  ' + '\n  '.join(failures))
+    if max_bytes_per_transaction or line_count >= LIMIT_LINES:
+        print("\npeak bytes per transaction within the limits")
+    else:
+        print(f"\nper-case limits are only checked with --lines {LIMIT_LINES} or more")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pdf-dir', default=DEFAULT_PDF_DIR, help='directory containing parseBankStatement.py')
+    arg_parser.add_argument('--baseline-dir', help='checkout to compare against (same layout as --pdf-dir)')
+    arg_parser.add_argument('--lines', type=int, default=LIMIT_LINES,
+                            help='synthetic lines (or table rows) per case')
+    arg_parser.add_argument('--max-ratio', type=float, help='fail when current/baseline parse peak exceeds this')
+    arg_parser.add_argument('--max-bytes-per-transaction', type=int,
+                            help='fail when any case\'s parse peak per transaction exceeds this '
+                                 '(default: PEAK_BYTES_PER_TRANSACTION per case)')
+    arg_parser.add_argument('--stream', action='store_true',
+                            help='also check that iter_transactions() peak memory stays flat as pages grow')
+    arg_parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    if args.json:
+        print(json.dumps(measure_streaming(args.pdf_dir) if args.stream else measure(args.pdf_dir, args.lines)))
+    else:
+        run(args.pdf_dir, args.lines, args.baseline_dir, args.max_ratio, args.max_bytes_per_transaction, args.stream)
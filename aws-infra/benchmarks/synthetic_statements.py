@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""Synthetic statement PDFs, one per supported layout, of any number of pages
+
+Each layout is drawn the way its issuer prints it, as far as the parser is
+concerned: ICICI savings as a ruled table, HDFC savings as a table with column
+rules only (so pdfplumber merges a page of rows into multi-line cells), and
+the ICICI, HDFC, SBI and IndusInd cards as text rows. Pages are written by a
+small PDF writer using the built-in Helvetica font, so generating a corpus
+needs nothing beyond the standard library.
+
+synthetic_statement() returns the PDF together with the transactions drawn
+on it, as (DD-MM-YYYY date, signed amount) pairs, which is what the parser is
+expected to read back. Write a corpus to disk with:
+
+    python synthetic_statements.py corpus/ --pages 20
+"""
+
+import argparse
+import os
+import random
+from datetime import date, timedelta
+
+LAYOUTS = ('icici_savings', 'icici_cc', 'hdfc_savings', 'hdfc_cc', 'sbi_cc', 'indusind_cc')
+ROWS_PER_PAGE = 25
+
+# A4 in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+FONT_SIZE = 8
+LINE_HEIGHT = 11
+# Left and top margin of text drawn by text_pdf()
+MARGIN = 40
+
+MERCHANTS = ['SWIGGY BANGALORE', 'AMAZON PAY INDIA', 'UBER INDIA SYSTEMS', 'NETFLIX.COM MUMBAI', 'ZOMATO LIMITED',
+             'IRCTC E TICKETING DELHI', 'BIGBASKET SUPERMARKET', 'APOLLO PHARMACY CHENNAI', 'INDIAN OIL PETROL PUMP',
+             'BOOKMYSHOW ENTERTAINMENT', 'FLIPKART INTERNET PVT', 'RELIANCE RETAIL JIO']
+CARD_CREDITS = ['PAYMENT RECEIVED THANK YOU', 'REFUND FROM AMAZON PAY INDIA', 'CASHBACK ON SWIGGY ORDER']
+SAVINGS_DEBITS = ['UPI/{ref}/{merchant}/Payment from Ph', 'POS {ref} {merchant}', 'ATM WDL {ref} MG ROAD BANGALORE',
+                  'BIL/ONL/{ref}/{merchant}', 'ACH D- {merchant} MANDATE {ref}']
+SAVINGS_CREDITS = ['NEFT-N{ref}-ACME CORP SALARY', 'UPI/{ref}/REFUND {merchant}', 'IMPS-{ref}-RAHUL SHARMA',
+                   'INT PD {ref} SAVINGS INTEREST']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+STATEMENT_START = date(2025, 4, 1)
+
+
+class PdfWriter:
+    """Pages of Helvetica text and straight rules, serialized as an uncompressed PDF"""
+
+    def __init__(self):
+        self.pages = []
+
+    def new_page(self):
+        self.pages.append([])
+
+    def text(self, x, y, text, size=FONT_SIZE):
+        escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        self.pages[-1].append(f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({escaped}) Tj ET")
+
+    def rule(self, x1, y1, x2, y2):
+        self.pages[-1].append(f"{x1:.1f} {y1:.1f} m {x2:.1f} {y2:.1f} l S")
+
+    def to_bytes(self):
+        page_count = len(self.pages)
+        # 1 catalog, 2 page tree, 3 font, then a page object and its content stream per page
+        kids = ' '.join(f"{4 + 2 * index} 0 R" for index in range(page_count))
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode('ascii'),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        ]
+        for index, operations in enumerate(self.pages):
+            content = ('0.5 w\n' + '\n'.join(operations)).encode('latin-1')
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                           f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * index} 0 R >>".encode('ascii'))
+            objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+        output = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(output))
+            output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref_offset = len(output)
+        output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        output += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+        output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+        return bytes(output)
+
+
+def _amount(rng, low=50, high=25000):
+    return round(rng.uniform(low, high), 2)
+
+
+def _format_amount(amount):
+    return f"{amount:,.2f}"
+
+
+def _reference(rng):
+    return rng.randint(10**9, 10**10)
+
+
+def _transaction_dates(rng, count):
+    """count non-decreasing dates from the statement start"""
+    day = STATEMENT_START
+    dates = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            day += timedelta(days=1)
+        dates.append(day)
+    return dates
+
+
+def _wrap(text, width):
+    """Split text into lines of at most width characters at spaces and slashes"""
+    lines = []
+    while len(text) > width:
+        cut = max(text.rfind(' ', 0, width), text.rfind('/', 0, width) + 1)
+        cut = cut if cut > 0 else width
+        lines.append(text[:cut].strip())
+        text = text[cut:].strip()
+    return lines + [text] if text else lines
+
+
+class _Statement:
+    """Draws one statement; subclasses lay out the letterhead and the rows of each page"""
+
+    # Issuer name and what its letterhead and page footers say
+    letterhead = []
+    footer = ''
+
+    def __init__(self, rng, pages, rows_per_page):
+        self.rng = rng
+        self.pdf = PdfWriter()
+        self.page_count = pages
+        self.rows_per_page = rows_per_page
+        self.expected = []
+
+    def build(self):
+        dates = _transaction_dates(self.rng, self.page_count * self.rows_per_page)
+        for page_index in range(self.page_count):
+            self.pdf.new_page()
+            y = PAGE_HEIGHT - 40
+            if page_index == 0:
+                for line in self.letterhead:
+                    self.pdf.text(40, y, line, size=10)
+                    y -= 14
+                y -= 10
+            page_dates = dates[page_index * self.rows_per_page:(page_index + 1) * self.rows_per_page]
+            self.draw_rows(y, page_dates)
+            footer = f"Page {page_index + 1} of {self.page_count}"
+            self.pdf.text(40, 30, f"{self.footer}    {footer}" if self.footer else footer)
+        return self.pdf.to_bytes(), self.expected
+
+    def draw_rows(self, top, dates):
+        raise NotImplementedError
+
+    def record(self, day, amount):
+        self.expected.append((day.strftime('%d-%m-%Y'), amount))
+
+
+class _SavingsStatement(_Statement):
+    """Running-balance account statement drawn as a table"""
+
+    # (header, x) for each column; the last column ends at TABLE_RIGHT
+    columns = []
+    table_right = PAGE_WIDTH - 30
+
+    def __init__(self, rng, pages, rows_per_page):
+        super().__init__(rng, pages, rows_per_page)
+        self.balance = 125000.0
+
+    def next_row(self, day):
+        """(narration, withdrawal or None, deposit or None, balance) for one row"""
+        merchant = self.rng.choice(MERCHANTS)
+        if self.rng.random() < 0.25:
+            narration = self.rng.choice(SAVINGS_CREDITS).format(ref=_reference(self.rng), merchant=merchant)
+            deposit = _amount(self.rng, 500, 60000)
+            self.balance = round(self.balance + deposit, 2)
+            self.record(day, deposit)
+            return narration, None, deposit, self.balance
+        narration = self.rng.choice(SAVINGS_DEBITS).format(ref=_reference(self.rng), merchant=merchant)
+        withdrawal = min(_amount(self.rng, 20, 8000), round(self.balance - 1000, 2))
+        self.balance = round(self.balance - withdrawal, 2)
+        self.record(day, -withdrawal)
+        return narration, withdrawal, None, self.balance
+
+    def draw_header(self, top):
+        xs = [x for _, x in self.columns] + [self.table_right]
+        for (header, x) in self.columns:
+            self.pdf.text(x + 3, top - 12, header)
+        self.pdf.rule(xs[0], top, xs[-1], top)
+        self.pdf.rule(xs[0], top - 18, xs[-1], top - 18)
+        return xs, top - 18
+
+
+class IciciSavingsStatement(_SavingsStatement):
+    """ICICI savings account: every cell ruled, DD-MM-YYYY dates, narration wrapped inside its cell"""
+
+    letterhead = ['ICICI Bank Limited', 'Statement of Transactions in Savings Account Number: XXXXXXXX4521',
+                  'for the period April 01, 2025 - March 31, 2026']
+    columns = [('DATE', 30), ('MODE', 85), ('PARTICULARS', 150), ('DEPOSITS', 340), ('WITHDRAWALS', 410),
+               ('BALANCE', 490)]
+
+    def draw_rows(self, top, dates):
+        xs, y = self.draw_header(top)
+        for day in dates:
+            narration, withdrawal, deposit, balance = self.next_row(day)
+            mode = 'UPI' if narration.startswith('UPI') else 'NEFT' if narration.startswith('NEFT') else ''
+            lines = _wrap(narration, 38)
+            row_height = 4 + LINE_HEIGHT * len(lines)
+            baseline = y - 10
+            self.pdf.text(xs[0] + 3, baseline, day.strftime('%d-%m-%Y'))
+            self.pdf.text(xs[1] + 3, baseline, mode)
+            for offset, line in enumerate(lines):
+                self.pdf.text(xs[2] + 3, baseline - offset * LINE_HEIGHT, line)
+            self.pdf.text(xs[3] + 3, baseline, _format_amount(deposit) if deposit else '')
+            self.pdf.text(xs[4] + 3, baseline, _format_amount(withdrawal) if withdrawal else '')
+            self.pdf.text(xs[5] + 3, baseline, _format_amount(balance))
+            y -= row_height
+            self.pdf.rule(xs[0], y, xs[-1], y)
+        for x in xs:
+            self.pdf.rule(x, top, x, y)
+
+
+class HdfcSavingsStatement(_SavingsStatement):
+    """HDFC savings account: column rules only, so a page of rows is one row of multi-line cells
+
+    The HDFC name is part of the logo, not the text, on the first page of these
+    statements; it only appears in the page footers.
+    """
+
+    letterhead = ['MR RAHUL SHARMA', '14 LAKESIDE ROAD KORAMANGALA', 'BANGALORE 560034',
+                  'Account Branch : KORAMANGALA', 'Statement of account']
+    footer = 'HDFC BANK LIMITED  *Closing balance includes funds earmarked for hold and uncleared funds'
+    columns = [('Date', 30), ('Narration', 75), ('Chq./Ref.No.', 255), ('Value Dt', 330), ('Withdrawal Amt.', 380),
+               ('Deposit Amt.', 450), ('Closing Balance', 510)]
+    table_right = PAGE_WIDTH - 10
+
+    def draw_rows(self, top, dates):
+        xs, y = self.draw_header(top)
+        y -= 12
+        for day in dates:
+            narration, withdrawal, deposit, balance = self.next_row(day)
+            short_date = day.strftime('%d/%m/%y')
+            self.pdf.text(xs[0] + 3, y, short_date)
+            lines = _wrap(narration, 34)
+            for offset, line in enumerate(lines):
+                self.pdf.text(xs[1] + 3, y - offset * LINE_HEIGHT, line)
+            self.pdf.text(xs[2] + 3, y, f"{_reference(self.rng):016d}")
+            self.pdf.text(xs[3] + 3, y, short_date)
+            if withdrawal:
+                self.pdf.text(xs[4] + 3, y, _format_amount(withdrawal))
+            if deposit:
+                self.pdf.text(xs[5] + 3, y, _format_amount(deposit))
+            self.pdf.text(xs[6] + 3, y, _format_amount(balance))
+            y -= LINE_HEIGHT * len(lines)
+        bottom = y + 4
+        self.pdf.rule(xs[0], bottom, xs[-1], bottom)
+        for x in xs:
+            self.pdf.rule(x, top, x, bottom)
+
+
+class _CardStatement(_Statement):
+    """Credit card statement: one text line per transaction between header and summary lines"""
+
+    column_header = ''
+    summary = ['Minimum Amount Due 5,000.00', 'Credit Limit 2,00,000.00', 'Reward Points Summary']
+
+    def draw_rows(self, top, dates):
+        y = top
+        self.pdf.text(40, y, self.column_header)
+        y -= LINE_HEIGHT * 1.5
+        for day in dates:
+            if self.rng.random() < 0.2:
+                description = self.rng.choice(CARD_CREDITS)
+                amount = _amount(self.rng, 100, 30000)
+            else:
+                description = self.rng.choice(MERCHANTS)
+                amount = -_amount(self.rng)
+            self.record(day, amount)
+            self.draw_transaction(y, day, description, amount)
+            y -= LINE_HEIGHT
+        y -= LINE_HEIGHT
+        for line in self.summary:
+            self.pdf.text(40, y, line)
+            y -= LINE_HEIGHT
+
+    def draw_transaction(self, y, day, description, amount):
+        raise NotImplementedError
+
+
+class IciciCardStatement(_CardStatement):
+    """ICICI credit card: date, serial number, details, reward points, amount with CR on credits"""
+
+    letterhead = ['ICICI Bank Credit Card', 'Statement of Account - Credit Card XXXX XXXX XXXX 4008',
+                  'Statement Date April 30, 2025']
+    column_header = 'Date        SerNo.          Transaction Details                                   Reward Points   Amount (in Rs)'
+
+    def draw_transaction(self, y, day, description, amount):
+        self.pdf.text(40, y, day.strftime('%d/%m/%Y'))
+        self.pdf.text(95, y, str(self.rng.randint(10**10, 10**11)))
+        self.pdf.text(160, y, description)
+        self.pdf.text(400, y, str(self.rng.randint(0, 40)))
+        self.pdf.text(470, y, _format_amount(abs(amount)) + (' CR' if amount > 0 else ''))
+
+
+class HdfcCardStatement(_CardStatement):
+    """HDFC credit card: date, description, amount with Cr attached on credits"""
+
+    letterhead = ['HDFC Bank Credit Cards', 'Credit Card Statement', 'Statement Date 30/04/2025']
+    column_header = 'Date                Transaction Description                                                   Amount (in Rs.)'
+
+    def draw_transaction(self, y, day, description, amount):
+        self.pdf.text(40, y, day.strftime('%d/%m/%Y'))
+        self.pdf.text(110, y, description)
+        self.pdf.text(470, y, _format_amount(abs(amount)) + ('Cr' if amount > 0 else ''))
+
+
+class SbiCardStatement(_CardStatement):
+    """SBI card: DD Mon YY date, description, amount followed by C or D"""
+
+    letterhead = ['SBI Card', 'Credit Card Statement', 'Statement Date 30 Apr 2025']
+    column_header = 'Date          Transaction Details                                                           Amount ( Rs. )'
+    summary = ['Previous Balance 12,000.00', 'Reward Points Earned 120']
+
+    def draw_transaction(self, y, day, description, amount):
+        self.pdf.text(40, y, f"{day.day:02d} {MONTHS[day.month - 1]} {day:%y}")
+        self.pdf.text(110, y, description)
+        self.pdf.text(470, y, f"{_format_amount(abs(amount))} {'C' if amount > 0 else 'D'}")
+
+
+class IndusIndCardStatement(_CardStatement):
+    """IndusInd credit card: date, merchant with category, amount followed by DR or CR"""
+
+    letterhead = ['IndusInd Bank', 'Credit Card Statement', 'Statement Date 30/04/2025']
+    column_header = 'Date              Transaction Details                              Merchant Category       Amount'
+
+    def draw_transaction(self, y, day, description, amount):
+        self.pdf.text(40, y, day.strftime('%d/%m/%Y'))
+        self.pdf.text(105, y, description)
+        self.pdf.text(330, y, 'IN RESTAURANTS 41' if amount < 0 else 'IN PAYMENTS')
+        self.pdf.text(470, y, f"{_format_amount(abs(amount))} {'CR' if amount > 0 else 'DR'}")
+
+
+STATEMENT_CLASSES = {
+    'icici_savings': IciciSavingsStatement,
+    'icici_cc': IciciCardStatement,
+    'hdfc_savings': HdfcSavingsStatement,
+    'hdfc_cc': HdfcCardStatement,
+    'sbi_cc': SbiCardStatement,
+    'indusind_cc': IndusIndCardStatement,
+}
+
+
+def text_pdf(lines):
+    """PDF bytes with the given text lines drawn one per row, top to bottom, page after page"""
+    writer = PdfWriter()
+    lines_per_page = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+    for start in range(0, max(len(lines), 1), lines_per_page):
+        writer.new_page()
+        for offset, line in enumerate(lines[start:start + lines_per_page]):
+            writer.text(MARGIN, PAGE_HEIGHT - MARGIN - offset * LINE_HEIGHT, line)
+    return writer.to_bytes()
+
+
+def synthetic_statement(layout, pages, rows_per_page=ROWS_PER_PAGE, seed=25):
+    """(PDF bytes, expected (date, amount) transactions) for a statement of the given layout and length"""
+    if layout not in STATEMENT_CLASSES:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {', '.join(LAYOUTS)}")
+    rng = random.Random(f"{layout}:{seed}")
+    return STATEMENT_CLASSES[layout](rng, pages, rows_per_page).build()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('output_dir', help='directory for <layout>.pdf files')
+    arg_parser.add_argument('--pages', type=int, default=10, help='pages per statement')
+    arg_parser.add_argument('--rows-per-page', type=int, default=ROWS_PER_PAGE, help='transactions per page')
+    arg_parser.add_argument('--layout', action='append', choices=LAYOUTS, help='layouts to write (default: all)')
+    args = arg_parser.parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+    for layout in args.layout or LAYOUTS:
+        pdf_bytes, expected = synthetic_statement(layout, args.pages, args.rows_per_page)
+        path = os.path.join(args.output_dir, f"{layout}.pdf")
+        with open(path, 'wb') as pdf_file:
+            pdf_file.write(pdf_bytes)
+        print(f"{path}: {args.pages} pages, {len(expected)} transactions")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Copy the shared Python modules into each Lambda package that imports them
+
+src/handlers/shared holds the one editable copy of the modules both Python
+packages use (logging, response encoding, instrumentation, profiling, keyword
+matching, fallback categories). The pdf and ml packages are built and deployed
+separately from their own directories, so each gets a generated copy marked
+as such. Run this after editing a shared module, and with --check before
+`sam build` (or in CI) to fail when a copy is missing, stale or hand-edited:
+
+    python scripts/sync_shared_modules.py
+    python scripts/sync_shared_modules.py --check
+"""
+
+import argparse
+import os
+import sys
+
+HANDLERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'handlers')
+SHARED_DIR = os.path.join(HANDLERS_DIR, 'shared')
+PACKAGES = ('pdf', 'ml')
+
+GENERATED_HEADER = ("# Generated from src/handlers/shared/{name} by scripts/sync_shared_modules.py.\n"
+                    "# Edit the shared module and re-run the script; changes made here are overwritten.\n")
+
+
+def shared_modules():
+    return sorted(name for name in os.listdir(SHARED_DIR) if name.endswith('.py'))
+
+
+def generated_copy(name):
+    """Contents of a package's copy of a shared module: the header after the shebang line"""
+    with open(os.path.join(SHARED_DIR, name)) as shared_file:
+        source = shared_file.read()
+    header = GENERATED_HEADER.format(name=name)
+    if source.startswith('#!'):
+        shebang, _, rest = source.partition('\n')
+        return f"{shebang}\n{header}{rest}"
+    return header + source
+
+
+def sync(check=False):
+    """Write (or with check, compare) every package copy; returns the paths that were out of date"""
+    stale = []
+    for name in shared_modules():
+        expected = generated_copy(name)
+        for package in PACKAGES:
+            path = os.path.join(HANDLERS_DIR, package, name)
+            current = None
+            if os.path.exists(path):
+                with open(path) as copy_file:
+                    current = copy_file.read()
+            if current == expected:
+                continue
+            stale.append(os.path.relpath(path, HANDLERS_DIR))
+            if not check:
+                with open(path, 'w') as copy_file:
+                    copy_file.write(expected)
+    return stale
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--check', action='store_true', help='only report copies that differ; exit 1 if any')
+    args = arg_parser.parse_args()
+    stale = sync(args.check)
+    if args.check and stale:
+        sys.exit("Out of sync with src/handlers/shared (run scripts/sync_shared_modules.py):\n  " + '\n  '.join(stale))
+    for path in stale:
+        print(f"updated {path}")
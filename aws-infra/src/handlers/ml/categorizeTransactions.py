@@ -6,6 +6,11 @@ import os
 import uuid
 from datetime import datetime
 from typing import Dict, List, Any
+from log_utils import setup_logger, payload_for_log
+from response_encoding import response_options, encode_response
+from instrumentation import metrics, instrumented, timings_requested
+from fallback_categories import fallback_categorization
+from profiling import profiled
 
 # Set cache directories and disable problematic optimizations before importing ML libraries
 os.environ['TORCH_HOME'] = '/tmp'
@@ -36,8 +41,7 @@ except ImportError as e:
     AWS_AVAILABLE = False
 
 # Set up logging
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = setup_logger()
 
 class TransactionCategorizer:
     def __init__(self):
@@ -61,6 +65,7 @@ class TransactionCategorizer:
         # All categories combined for ML processing
         self.categories = self.income_categories + self.expense_categories
         
+    @metrics.timed('model_load')
     def load_model(self):
         """Load sentence transformer model and precompute category embeddings"""
         if not ML_AVAILABLE:
@@ -305,30 +310,10 @@ class TransactionCategorizer:
     
     def _fallback_categorization(self, description, amount):
         """Simple fallback categorization when ML is not available"""
-        if not description:
-            return {
-                "category": "Miscellaneous",
-                "confidence": 0.1,
-                "processing_time_ms": 1,
-                "method": "fallback_no_description"
-            }
-        
-        desc_lower = description.lower()
-        
-        # Basic patterns matching frontend categories
-        if any(word in desc_lower for word in ['swiggy', 'zomato', 'food', 'restaurant', 'dining']):
-            return {"category": "Food & Drink", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_food"}
-        elif any(word in desc_lower for word in ['uber', 'ola', 'taxi', 'transport', 'metro', 'bus']):
-            return {"category": "Transport", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_transport"}
-        elif any(word in desc_lower for word in ['grocery', 'supermarket', 'vegetables', 'fruits']):
-            return {"category": "Groceries", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_grocery"}
-        elif any(word in desc_lower for word in ['salary', 'income', 'payroll']) and amount and amount > 0:
-            return {"category": "Salary", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_income"}
-        elif any(word in desc_lower for word in ['fuel', 'petrol', 'diesel']):
-            return {"category": "Fuel", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_fuel"}
-        else:
-            return {"category": "Miscellaneous", "confidence": 0.3, "processing_time_ms": 1, "method": "fallback"}
+        metrics.count('fallback_categorized')
+        return fallback_categorization(description, amount)
     
+    @metrics.timed('batch_categorize')
     def batch_categorize(self, transactions):
         """Process multiple transactions efficiently"""
         results = []
@@ -360,13 +345,15 @@ class TransactionCategorizer:
 # Global categorizer instance (reused across warm invocations)
 categorizer = None
 
+@instrumented('ml-categorizer')
+@profiled('ml-categorizer')
 def lambda_handler(event, context):
     """Main Lambda handler"""
     global categorizer
     
     try:
         logger.info("ML Categorization Lambda invoked")
-        logger.info(f"Event: {json.dumps(event, indent=2)}")
+        logger.info("Event: %s", payload_for_log(event))
         
         # Initialize categorizer (cached across warm starts)
         if categorizer is None:
@@ -448,7 +435,8 @@ def lambda_handler(event, context):
                         }
                         
                         # Store async (don't block main response)
-                        table.put_item(Item=feedback_record)
+                        with metrics.span('dynamodb_write'):
+                            table.put_item(Item=feedback_record)
                 
                 logger.info(f"Stored {len(result['results'])} ML results in DynamoDB table {ml_feedback_table}")
                 
@@ -456,14 +444,13 @@ def lambda_handler(event, context):
             logger.error(f"Error storing ML results to DynamoDB: {ddb_error}")
             # Don't fail the main response for DynamoDB errors
         
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Credentials": True,
-            },
-            "body": json.dumps(result, indent=2)
-        }
+        if timings_requested(event, body):
+            result['timings'] = metrics.timings()
+        
+        return encode_response(200, result, {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        }, response_options(event, body), records_key='results')
         
     except Exception as e:
         logger.error(f"Error processing transactions: {str(e)}", exc_info=True)
@@ -21,6 +21,11 @@ import re
 from typing import Dict, List, Any
 import numpy as np
 import boto3
+from log_utils import setup_logger, payload_for_log, StageLogger
+from response_encoding import response_options, encode_response
+from instrumentation import metrics, instrumented, timings_requested
+from fallback_categories import fallback_categorization
+from profiling import profiled
 
 # Import ML libraries with ARM64 Lambda compatibility
 try:
@@ -52,8 +57,7 @@ except Exception as e:
     ML_AVAILABLE = False
 
 # Set up logging
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = setup_logger()
 
 class HybridTransactionCategorizer:
     def __init__(self):
@@ -61,6 +65,9 @@ class HybridTransactionCategorizer:
         self.category_embeddings = None
         self.dynamodb = boto3.resource('dynamodb')
         self.ml_feedback_table = None
+        # Per-transaction logging: sampled at INFO, full detail only with LOG_LEVEL=DEBUG
+        self.txn_log = StageLogger('transactions')
+        self.feedback_log = StageLogger('feedback_lookup')
         
         # Categories from frontend /src/config/categories.js
         self.income_categories = [
@@ -89,6 +96,7 @@ class HybridTransactionCategorizer:
                 logger.warning(f"Could not initialize ML feedback table: {e}")
                 self.ml_feedback_table = None
         
+    @metrics.timed('model_load')
     def load_model(self):
         """Load sentence transformer model"""
         if not ML_AVAILABLE:
@@ -234,18 +242,19 @@ class HybridTransactionCategorizer:
         first_part = desc.split(' ')[0].split('|')[0].strip()
         return first_part[:50]  # Limit length
     
+    @metrics.timed('feedback_lookup')
     def query_user_feedback(self, user_id, wallet_id, description):
         """Query user's historical feedback for similar transaction patterns"""
         if not self.ml_feedback_table or not user_id or not wallet_id:
-            logger.info(f"❌ No feedback table or missing user_id/wallet_id: table={bool(self.ml_feedback_table)}, user_id={user_id}, wallet_id={wallet_id}")
+            self.feedback_log.trace("❌ No feedback table or missing user_id/wallet_id: table=%s, user_id=%s, wallet_id=%s", bool(self.ml_feedback_table), user_id, wallet_id)
             return None
         
         try:
             description_prefix = self.extract_description_prefix(description)
             wallet_id_prefix = f"{wallet_id}#{description_prefix}"
             
-            logger.info(f"🔍 Querying feedback for pattern: '{description_prefix}' from description: '{description}'")
-            logger.info(f"🔍 Full GSI key: '{wallet_id_prefix}'")
+            self.feedback_log.trace("🔍 Querying feedback for pattern: '%s' from description: '%s'", description_prefix, description)
+            self.feedback_log.trace("🔍 Full GSI key: '%s'", wallet_id_prefix)
             
             # Query GSI for similar corrections
             response = self.ml_feedback_table.query(
@@ -257,14 +266,13 @@ class HybridTransactionCategorizer:
             )
             
             items = response.get('Items', [])
-            logger.info(f"📊 DynamoDB query returned {len(items)} items")
+            self.feedback_log.trace("📊 DynamoDB query returned %d items", len(items))
             
-            if items:
-                for i, item in enumerate(items):
-                    logger.info(f"  Item {i+1}: prefix='{item.get('descriptionPrefix', 'missing')}', category='{item.get('correctedCategory', 'missing')}'")
+            for i, item in enumerate(items):
+                self.feedback_log.trace("  Item %d: prefix='%s', category='%s'", i + 1, item.get('descriptionPrefix', 'missing'), item.get('correctedCategory', 'missing'))
             
             if not items:
-                logger.info(f"⚠️ No historical feedback found for pattern: '{description_prefix}'")
+                self.feedback_log.trace("⚠️ No historical feedback found for pattern: '%s'", description_prefix)
                 return None
             
             # Get the most common corrected category
@@ -281,7 +289,7 @@ class HybridTransactionCategorizer:
             suggested_category = max(category_map, key=category_map.get)
             confidence = category_map[suggested_category] / len(items)
             
-            logger.info(f"Found {len(items)} historical corrections for pattern '{description_prefix}': suggesting '{suggested_category}' with {confidence:.2f} confidence")
+            self.feedback_log.sample("Found %d historical corrections for pattern '%s': suggesting '%s' with %.2f confidence", len(items), description_prefix, suggested_category, confidence)
             
             return {
                 'category': suggested_category,
@@ -475,30 +483,10 @@ class HybridTransactionCategorizer:
     
     def _fallback_categorization(self, description, amount):
         """Simple fallback categorization when ML is not available"""
-        if not description:
-            return {
-                "category": "Miscellaneous",
-                "confidence": 0.1,
-                "processing_time_ms": 1,
-                "method": "fallback_no_description"
-            }
-        
-        desc_lower = description.lower()
-        
-        # Basic patterns matching frontend categories
-        if any(word in desc_lower for word in ['swiggy', 'zomato', 'food', 'restaurant', 'dining']):
-            return {"category": "Food & Drink", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_food"}
-        elif any(word in desc_lower for word in ['uber', 'ola', 'taxi', 'transport', 'metro', 'bus']):
-            return {"category": "Transport", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_transport"}
-        elif any(word in desc_lower for word in ['grocery', 'supermarket', 'vegetables', 'fruits']):
-            return {"category": "Groceries", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_grocery"}
-        elif any(word in desc_lower for word in ['salary', 'income', 'payroll']) and amount and amount > 0:
-            return {"category": "Salary", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_income"}
-        elif any(word in desc_lower for word in ['fuel', 'petrol', 'diesel']):
-            return {"category": "Fuel", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_fuel"}
-        else:
-            return {"category": "Miscellaneous", "confidence": 0.3, "processing_time_ms": 1, "method": "fallback"}
+        metrics.count('fallback_categorized')
+        return fallback_categorization(description, amount)
     
+    @metrics.timed('batch_categorize')
     def batch_categorize(self, transactions, user_id=None, wallet_id=None):
         """Process multiple transactions efficiently with historical pattern learning"""
         results = []
@@ -510,25 +498,26 @@ class HybridTransactionCategorizer:
             description = txn.get('description', '')
             amount = txn.get('amount')
             
-            logger.info(f"📝 Transaction {i+1}: '{description}' (amount: {amount})")
+            self.txn_log.trace("📝 Transaction %d: '%s' (amount: %s)", i + 1, description, amount)
             
             # Try historical pattern first
             if user_id and wallet_id and description:
                 historical_result = self.query_user_feedback(user_id, wallet_id, description)
                 if historical_result and historical_result['confidence'] >= 0.7:
-                    logger.info(f"✅ Using historical pattern for transaction {i+1}: '{historical_result['category']}' (confidence: {historical_result['confidence']})")
+                    self.txn_log.sample("✅ Using historical pattern for transaction %d: '%s' (confidence: %s)", i + 1, historical_result['category'], historical_result['confidence'])
                     historical_result.update({
                         "transaction_index": i,
                         "original_description": description
                     })
                     results.append(historical_result)
                     historical_hits += 1
+                    metrics.count('historical_hits')
                     continue
                 else:
                     if historical_result:
-                        logger.info(f"⚠️ Historical pattern found but low confidence ({historical_result['confidence']}) for transaction {i+1}")
+                        self.txn_log.trace("⚠️ Historical pattern found but low confidence (%s) for transaction %d", historical_result['confidence'], i + 1)
                     else:
-                        logger.info(f"❌ No historical pattern found for transaction {i+1}")
+                        self.txn_log.trace("❌ No historical pattern found for transaction %d", i + 1)
             
             # Mark for ML processing if no historical match
             results.append(None)  # Placeholder for ML processing
@@ -611,6 +600,8 @@ class HybridTransactionCategorizer:
                 results[i] = fallback_result
         
         total_processing_time = (time.time() - total_start_time) * 1000
+        self.txn_log.summary()
+        self.feedback_log.summary()
         
         return {
             "results": results,
@@ -660,13 +651,15 @@ class HybridTransactionCategorizer:
 # Global categorizer instance (reused across warm invocations)
 categorizer = None
 
+@instrumented('ml-categorizer-hybrid')
+@profiled('ml-categorizer-hybrid')
 def lambda_handler(event, context):
     """Main Lambda handler"""
     global categorizer
     
     try:
         logger.info("Hybrid ML Categorization Lambda invoked")
-        logger.info(f"Event: {json.dumps(event, indent=2)}") 
+        logger.info("Event: %s", payload_for_log(event))
         
         # Initialize categorizer (cached across warm starts)
         if categorizer is None:
@@ -710,14 +703,13 @@ def lambda_handler(event, context):
         
         logger.info(f"Processing complete. Summary: {result['summary']}")
         
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Credentials": True,
-            },
-            "body": json.dumps(result, indent=2)
-        }
+        if timings_requested(event, body):
+            result['timings'] = metrics.timings()
+        
+        return encode_response(200, result, {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        }, response_options(event, body), records_key='results')
         
     except Exception as e:
         logger.error(f"Error processing transactions: {str(e)}", exc_info=True)
@@ -19,6 +19,11 @@ import time
 import re
 from typing import Dict, List, Any
 import numpy as np
+from log_utils import setup_logger, payload_for_log
+from response_encoding import response_options, encode_response
+from instrumentation import metrics, instrumented, timings_requested
+from fallback_categories import fallback_categorization
+from profiling import profiled
 
 # Import ONNX Runtime and supporting libraries
 ML_AVAILABLE = False
@@ -60,8 +65,7 @@ except Exception as e:
     ML_AVAILABLE = False
 
 # Set up logging
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = setup_logger()
 
 class ONNXTransactionCategorizer:
     def __init__(self):
@@ -87,6 +91,7 @@ class ONNXTransactionCategorizer:
         # All categories combined for ML processing
         self.categories = self.income_categories + self.expense_categories
         
+    @metrics.timed('model_load')
     def load_model(self):
         """Load ONNX model and tokenizer"""
         if not ML_AVAILABLE:
@@ -151,6 +156,7 @@ class ONNXTransactionCategorizer:
         logger.info(f"ONNX model saved to {model_path}")
         return model_path
     
+    @metrics.timed('onnx_inference')
     def _encode_text(self, text):
         """Encode text using ONNX model"""
         # Tokenize
@@ -411,30 +417,10 @@ class ONNXTransactionCategorizer:
     
     def _fallback_categorization(self, description, amount):
         """Simple fallback categorization when ML is not available"""
-        if not description:
-            return {
-                "category": "Miscellaneous",
-                "confidence": 0.1,
-                "processing_time_ms": 1,
-                "method": "fallback_no_description"
-            }
-        
-        desc_lower = description.lower()
-        
-        # Basic patterns matching frontend categories
-        if any(word in desc_lower for word in ['swiggy', 'zomato', 'food', 'restaurant', 'dining']):
-            return {"category": "Food & Drink", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_food"}
-        elif any(word in desc_lower for word in ['uber', 'ola', 'taxi', 'transport', 'metro', 'bus']):
-            return {"category": "Transport", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_transport"}
-        elif any(word in desc_lower for word in ['grocery', 'supermarket', 'vegetables', 'fruits']):
-            return {"category": "Groceries", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_grocery"}
-        elif any(word in desc_lower for word in ['salary', 'income', 'payroll']) and amount and amount > 0:
-            return {"category": "Salary", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_income"}
-        elif any(word in desc_lower for word in ['fuel', 'petrol', 'diesel']):
-            return {"category": "Fuel", "confidence": 0.7, "processing_time_ms": 1, "method": "fallback_fuel"}
-        else:
-            return {"category": "Miscellaneous", "confidence": 0.3, "processing_time_ms": 1, "method": "fallback"}
+        metrics.count('fallback_categorized')
+        return fallback_categorization(description, amount)
     
+    @metrics.timed('batch_categorize')
     def batch_categorize(self, transactions):
         """Process multiple transactions efficiently using true batching"""
         if not self.load_model():
@@ -521,6 +507,7 @@ class ONNXTransactionCategorizer:
             }
         }
     
+    @metrics.timed('onnx_inference')
     def _encode_text_batch(self, texts):
         """Encode multiple texts in a single ONNX inference call"""
         if not texts:
@@ -593,13 +580,15 @@ class ONNXTransactionCategorizer:
 # Global categorizer instance (reused across warm invocations)
 categorizer = None
 
+@instrumented('ml-categorizer-onnx')
+@profiled('ml-categorizer-onnx')
 def lambda_handler(event, context):
     """Main Lambda handler"""
     global categorizer
     
     try:
         logger.info("ONNX ML Categorization Lambda invoked")
-        logger.info(f"Event: {json.dumps(event, indent=2)}")
+        logger.info("Event: %s", payload_for_log(event))
         
         # Initialize categorizer (cached across warm starts)
         if categorizer is None:
@@ -625,8 +614,9 @@ def lambda_handler(event, context):
             logger.info(f"Reading transactions from S3: s3://{s3_bucket}/{s3_key}")
             
             try:
-                response = s3_client.get_object(Bucket=s3_bucket, Key=s3_key)
-                s3_data = json.loads(response['Body'].read().decode('utf-8'))
+                with metrics.span('s3_read'):
+                    response = s3_client.get_object(Bucket=s3_bucket, Key=s3_key)
+                    s3_data = json.loads(response['Body'].read().decode('utf-8'))
                 transactions = s3_data.get('transactions', [])
                 
                 logger.info(f"Loaded {len(transactions)} transactions from S3")
@@ -715,12 +705,13 @@ def lambda_handler(event, context):
                 output_key = s3_key.replace('parsed-transactions/', 'categorized-results/')
                 output_key = output_key.replace('.json', '-categorized.json')
                 
-                s3_client.put_object(
-                    Bucket=s3_bucket,
-                    Key=output_key,
-                    Body=json.dumps(output_data, indent=2),
-                    ContentType='application/json'
-                )
+                with metrics.span('s3_write'):
+                    s3_client.put_object(
+                        Bucket=s3_bucket,
+                        Key=output_key,
+                        Body=json.dumps(output_data, separators=(',', ':')),
+                        ContentType='application/json'
+                    )
                 
                 logger.info(f"Wrote categorized results to S3: s3://{s3_bucket}/{output_key}")
                 
@@ -764,7 +755,8 @@ def lambda_handler(event, context):
                             }
                             
                             # Store async (don't block main response)
-                            table.put_item(Item=feedback_record)
+                            with metrics.span('dynamodb_write'):
+                                table.put_item(Item=feedback_record)
                     
                     logger.info(f"Stored {len(result['results'])} ML results in DynamoDB table {ml_feedback_table}")
                     
@@ -773,32 +765,27 @@ def lambda_handler(event, context):
                     # Don't fail the main response for DynamoDB errors
                 
                 # Return success with S3 location
-                return {
-                    "statusCode": 200,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Credentials": True,
-                    },
-                    "body": json.dumps({
-                        "message": "Categorization complete",
-                        "input_file": f"s3://{s3_bucket}/{s3_key}",
-                        "output_file": f"s3://{s3_bucket}/{output_key}",
-                        "summary": result['summary']
-                    }, indent=2)
-                }
+                return encode_response(200, {
+                    "message": "Categorization complete",
+                    "input_file": f"s3://{s3_bucket}/{s3_key}",
+                    "output_file": f"s3://{s3_bucket}/{output_key}",
+                    "summary": result['summary']
+                }, {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": True,
+                }, response_options(event, body))
                 
             except Exception as e:
                 logger.error(f"Error writing results to S3: {e}")
                 # Fall through to return normal response
         
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Credentials": True,
-            },
-            "body": json.dumps(result, indent=2)
-        }
+        if timings_requested(event, body):
+            result['timings'] = metrics.timings()
+        
+        return encode_response(200, result, {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        }, response_options(event, body), records_key='results')
         
     except Exception as e:
         logger.error(f"Error processing transactions: {str(e)}", exc_info=True)
@@ -1,16 +1,17 @@
 import json
-import logging
 import boto3
 import time
 from decimal import Decimal
+from log_utils import setup_logger, payload_for_log
+from instrumentation import metrics, instrumented, timings_requested
 
 # Set up logging
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = setup_logger()
 
 # DynamoDB client
 dynamodb = boto3.resource('dynamodb')
 
+@instrumented('ml-feedback')
 def lambda_handler(event, context):
     """
     Handle customer feedback for ML categorization corrections
@@ -28,7 +29,7 @@ def lambda_handler(event, context):
     
     try:
         logger.info("Feedback handler invoked")
-        logger.info(f"Event: {json.dumps(event, indent=2)}")
+        logger.info("Event: %s", payload_for_log(event))
         
         # Parse input
         if 'body' in event:
@@ -78,7 +79,9 @@ def lambda_handler(event, context):
         }
         
         # Put item in table
-        table.put_item(Item=feedback_item)
+        with metrics.span('dynamodb_write'):
+            table.put_item(Item=feedback_item)
+        metrics.count('feedback_records')
         
         logger.info(f"Stored feedback for user {user_id}: {predicted_category} -> {actual_category}")
         
@@ -101,36 +104,42 @@ def lambda_handler(event, context):
             }
             
             # Use update expression to increment count if pattern exists
-            patterns_table.put_item(
-                Item=pattern_item,
-                ConditionExpression='attribute_not_exists(patternKey)'
-            )
+            with metrics.span('pattern_update'):
+                patterns_table.put_item(
+                    Item=pattern_item,
+                    ConditionExpression='attribute_not_exists(patternKey)'
+                )
             
         except patterns_table.meta.client.exceptions.ConditionalCheckFailedException:
             # Pattern already exists, increment feedback count
-            patterns_table.update_item(
-                Key={'userId': user_id, 'patternKey': pattern_key},
-                UpdateExpression='SET feedbackCount = feedbackCount + :inc, lastUpdated = :time, preferredCategory = :cat',
-                ExpressionAttributeValues={
-                    ':inc': 1,
-                    ':time': int(time.time()),
-                    ':cat': actual_category
-                }
-            )
+            with metrics.span('pattern_update'):
+                patterns_table.update_item(
+                    Key={'userId': user_id, 'patternKey': pattern_key},
+                    UpdateExpression='SET feedbackCount = feedbackCount + :inc, lastUpdated = :time, preferredCategory = :cat',
+                    ExpressionAttributeValues={
+                        ':inc': 1,
+                        ':time': int(time.time()),
+                        ':cat': actual_category
+                    }
+                )
         except Exception as e:
             logger.warning(f"Could not update patterns table: {e}")
         
+        response_body = {
+            "message": "Feedback recorded successfully",
+            "feedbackId": feedback_item['feedbackId'],
+            "patternKey": pattern_key
+        }
+        if timings_requested(event, body):
+            response_body['timings'] = metrics.timings()
+        
         return {
             "statusCode": 200,
             "headers": {
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Credentials": True,
             },
-            "body": json.dumps({
-                "message": "Feedback recorded successfully",
-                "feedbackId": feedback_item['feedbackId'],
-                "patternKey": pattern_key
-            })
+            "body": json.dumps(response_body)
         }
         
     except Exception as e:
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# Generated from src/handlers/shared/log_utils.py by scripts/sync_shared_modules.py.
+# Edit the shared module and re-run the script; changes made here are overwritten.
+"""Logging helpers shared by the Python Lambda handlers"""
+
+import json
+import logging
+import os
+
+# Root log level for every handler (LOG_LEVEL=DEBUG turns on row traces)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+# Stage loggers emit their first LOG_SAMPLE_HEAD messages, then one in LOG_SAMPLE_EVERY;
+# LOG_SAMPLE_EVERY_<STAGE> overrides the rate for a single stage
+LOG_SAMPLE_HEAD = int(os.environ.get('LOG_SAMPLE_HEAD', 5))
+LOG_SAMPLE_EVERY = int(os.environ.get('LOG_SAMPLE_EVERY', 100))
+
+# Payload values that must never reach CloudWatch
+REDACTED_KEYS = frozenset([
+    'pdf_content', 'file_content', 'password', 'pdf_password',
+    'authorization', 'token', 'id_token', 'access_token', 'refresh_token',
+])
+MAX_LOGGED_STRING = 200
+MAX_LOGGED_ITEMS = 10
+MAX_LOGGED_DEPTH = 6
+
+
+def setup_logger():
+    """Root logger at LOG_LEVEL (INFO unless overridden)"""
+    logger = logging.getLogger()
+    logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+    return logger
+
+
+class LazyMessage:
+    """Log argument whose text is only built if the record is actually emitted"""
+
+    __slots__ = ('_build', '_args')
+
+    def __init__(self, build, *args):
+        self._build = build
+        self._args = args
+
+    def __str__(self):
+        return str(self._build(*self._args))
+
+
+def redact_payload(payload, max_string=MAX_LOGGED_STRING, max_items=MAX_LOGGED_ITEMS, _depth=0):
+    """Copy of payload with secrets masked and long strings/lists truncated
+
+    API Gateway 'body' strings holding JSON are decoded so the fields inside
+    them are redacted too.
+    """
+    if _depth >= MAX_LOGGED_DEPTH:
+        return '<...>'
+    if isinstance(payload, dict):
+        redacted = {}
+        for key, value in payload.items():
+            if str(key).lower() in REDACTED_KEYS:
+                size = len(value) if isinstance(value, (str, bytes)) else 0
+                redacted[key] = f'<redacted {size} chars>' if size else '<redacted>'
+            elif key == 'body' and isinstance(value, str) and value.lstrip().startswith('{'):
+                try:
+                    redacted[key] = redact_payload(json.loads(value), max_string, max_items, _depth + 1)
+                except ValueError:
+                    redacted[key] = _truncate(value, max_string)
+            else:
+                redacted[key] = redact_payload(value, max_string, max_items, _depth + 1)
+        return redacted
+    if isinstance(payload, (list, tuple)):
+        items = [redact_payload(item, max_string, max_items, _depth + 1) for item in payload[:max_items]]
+        if len(payload) > max_items:
+            items.append(f'<+{len(payload) - max_items} more>')
+        return items
+    if isinstance(payload, str):
+        return _truncate(payload, max_string)
+    if isinstance(payload, bytes):
+        return f'<{len(payload)} bytes>'
+    return payload
+
+
+def _truncate(text, max_length):
+    if len(text) <= max_length:
+        return text
+    return f'{text[:max_length]}...<+{len(text) - max_length} chars>'
+
+
+def payload_for_log(payload, max_string=MAX_LOGGED_STRING, max_items=MAX_LOGGED_ITEMS):
+    """Compact JSON of the redacted payload, built lazily: logger.info("Event: %s", payload_for_log(event))"""
+    return LazyMessage(lambda: json.dumps(redact_payload(payload, max_string, max_items), default=str))
+
+
+class StageLogger:
+    """Logger for one processing stage: sampled per-item INFO messages and DEBUG-only traces
+
+    Messages use %-style arguments so nothing is formatted unless emitted.
+    """
+
+    def __init__(self, stage, logger=None, sample_every=None, sample_head=None):
+        self.stage = stage
+        self.logger = logger or logging.getLogger()
+        env_rate = os.environ.get(f'LOG_SAMPLE_EVERY_{stage.upper()}')
+        self.sample_every = max(1, sample_every or int(env_rate or LOG_SAMPLE_EVERY))
+        self.sample_head = LOG_SAMPLE_HEAD if sample_head is None else sample_head
+        self.count = 0
+        self.suppressed = 0
+
+    def sample(self, msg, *args):
+        """INFO for the first few messages of the stage, then one in sample_every"""
+        self.count += 1
+        if self.count > self.sample_head and self.count % self.sample_every:
+            self.suppressed += 1
+            return
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info('[%s] ' + msg, self.stage, *args)
+
+    def trace(self, msg, *args):
+        """Per-row detail, only when DEBUG is enabled"""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('[%s] ' + msg, self.stage, *args)
+
+    def summary(self):
+        """Log how many messages were sampled out and start counting afresh"""
+        if self.suppressed:
+            self.logger.info('[%s] %d messages, %d sampled out', self.stage, self.count, self.suppressed)
+        self.count = 0
+        self.suppressed = 0
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Parse archived statements offline with a pool of worker processes
+
+Reprocessing statements after a parser fix doesn't need Lambda: this runs
+ICICIStatementParser over local PDFs, one statement per task, and writes one
+NDJSON record per statement (path, status, transaction count, pages, latency
+and the transactions). A throughput and latency summary goes to stderr, and
+to --summary as JSON. Nothing here talks to AWS: S3 caches and checkpoints
+are switched off before the parser is imported.
+
+    python bulk_parse.py archive/ --jobs 8 --passwords passwords.json --output parsed.ndjson
+    python bulk_parse.py --manifest statements.txt --jobs 4 --fields date,description,amount
+
+Inputs are PDF files, directories (searched recursively for *.pdf) and
+manifests (one path per line, relative to the manifest; blank lines and
+# comments are skipped). The password map is a JSON object keyed by statement
+path, file name, or "*" for every other statement. Exit status is 1 when any
+statement failed to parse.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Offline runs parse every statement afresh and keep no state in S3
+os.environ['PDF_PARSE_CACHE'] = '0'
+for _name in ('PDF_PARSE_CACHE_BUCKET', 'PDF_CHECKPOINT_BUCKET', 'PROFILE_BUCKET'):
+    os.environ.pop(_name, None)
+
+from instrumentation import metrics
+from parseBankStatement import ICICIStatementParser
+from response_encoding import project
+from statement_transaction import encode_transaction
+
+logger = logging.getLogger()
+
+_COMPACT_SEPARATORS = (',', ':')
+
+# One parser per worker process, created by _init_worker
+_parser = None
+
+
+def find_statements(inputs, manifests=()):
+    """Statement paths from files, directories and manifests, in a stable order without duplicates"""
+    paths = []
+    for manifest in manifests:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest) as manifest_file:
+            for line in manifest_file:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+
+    for path in inputs:
+        if not os.path.isdir(path):
+            paths.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith('.pdf'))
+
+    seen = set()
+    return [path for path in paths if not (path in seen or seen.add(path))]
+
+
+def load_passwords(path):
+    """Password map from a JSON object of path / file name / "*" -> password"""
+    if not path:
+        return {}
+    with open(path) as password_file:
+        passwords = json.load(password_file)
+    if not isinstance(passwords, dict):
+        raise SystemExit(f"{path}: expected a JSON object of statement -> password")
+    return passwords
+
+
+def password_for(passwords, path):
+    for key in (path, os.path.basename(path), '*'):
+        if key in passwords:
+            return passwords[key]
+    return None
+
+
+def _init_worker(log_level):
+    global _parser
+    logging.getLogger().setLevel(log_level)
+    # Statements are the unit of parallelism, so pages are parsed in-process
+    _parser = ICICIStatementParser(parallel=False)
+
+
+def parse_statement(path, password=None, fields=None, include_timings=False):
+    """NDJSON record for one statement; failures are reported in the record, not raised"""
+    metrics.reset()
+    start_time = time.perf_counter()
+    record = {'path': path, 'status': 'ok'}
+    try:
+        with open(path, 'rb') as pdf_file:
+            pdf_bytes = pdf_file.read()
+        transactions = _parser.parse_pdf_bytes(pdf_bytes, password)
+    except Exception as e:
+        record.update(status='error', error=f"{type(e).__name__}: {e}")
+        transactions = None
+
+    timings = metrics.timings()
+    record['elapsed_ms'] = round((time.perf_counter() - start_time) * 1000, 1)
+    record['pages'] = timings['counters'].get('pages_read', 0)
+    if transactions is not None:
+        record['transaction_count'] = len(transactions)
+        record['transactions'] = [project(transaction, fields) for transaction in transactions]
+    if include_timings:
+        record['timings'] = timings
+    return record
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    # Nearest rank
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(records, wall_seconds, jobs):
+    """Throughput and latency over all parsed statements"""
+    latencies = sorted(record['elapsed_ms'] for record in records)
+    succeeded = [record for record in records if record['status'] == 'ok']
+    transactions = sum(record['transaction_count'] for record in succeeded)
+    pages = sum(record['pages'] for record in records)
+    wall_seconds = max(wall_seconds, 1e-9)
+    return {
+        'statements': len(records),
+        'succeeded': len(succeeded),
+        'failed': len(records) - len(succeeded),
+        'transactions': transactions,
+        'pages': pages,
+        'jobs': jobs,
+        'wall_seconds': round(wall_seconds, 3),
+        'statements_per_second': round(len(records) / wall_seconds, 2),
+        'pages_per_second': round(pages / wall_seconds, 2),
+        'transactions_per_second': round(transactions / wall_seconds, 2),
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            'p50': _percentile(latencies, 50),
+            'p90': _percentile(latencies, 90),
+            'p99': _percentile(latencies, 99),
+            'max': latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+def run(paths, passwords, output, jobs=1, fields=None, include_timings=False, log_level=logging.WARNING):
+    """Parse every statement, writing records to output as they finish; returns the records"""
+    records = []
+
+    def write(record):
+        records.append(record)
+        output.write(json.dumps(record, separators=_COMPACT_SEPARATORS, default=encode_transaction) + '\n')
+        output.flush()
+
+    tasks = [(path, password_for(passwords, path), fields, include_timings) for path in paths]
+    if jobs <= 1:
+        _init_worker(log_level)
+        for task in tasks:
+            write(parse_statement(*task))
+        return records
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(log_level,)) as executor:
+        futures = [executor.submit(parse_statement, *task) for task in tasks]
+        for future in as_completed(futures):
+            write(future.result())
+    return records
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('inputs', nargs='*', help='PDF files or directories of PDFs')
+    arg_parser.add_argument('--manifest', action='append', default=[], help='file listing one PDF path per line')
+    arg_parser.add_argument('--passwords', help='JSON object of path / file name / "*" -> password')
+    arg_parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='worker processes')
+    arg_parser.add_argument('--output', '-o', help='NDJSON output file (default: stdout)')
+    arg_parser.add_argument('--summary', help='also write the summary to this JSON file')
+    arg_parser.add_argument('--fields', help='comma-separated transaction fields to keep')
+    arg_parser.add_argument('--timings', action='store_true', help='add per-stage timings to each record')
+    arg_parser.add_argument('--verbose', '-v', action='store_true', help='log parser progress at INFO')
+    args = arg_parser.parse_args(argv)
+
+    paths = find_statements(args.inputs, args.manifest)
+    if not paths:
+        arg_parser.error('no statements found')
+    fields = tuple(field.strip() for field in args.fields.split(',') if field.strip()) if args.fields else None
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.getLogger().setLevel(log_level)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    start_time = time.perf_counter()
+    try:
+        records = run(paths, load_passwords(args.passwords), output, max(1, args.jobs), fields, args.timings, log_level)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    summary = summarize(records, time.perf_counter() - start_time, max(1, args.jobs))
+    if args.summary:
+        with open(args.summary, 'w') as summary_file:
+            json.dump(summary, summary_file, indent=2)
+    latency = summary['latency_ms']
+    sys.stderr.write(
+        f"📊 {summary['succeeded']}/{summary['statements']} statements, {summary['transactions']} transactions, "
+        f"{summary['pages']} pages in {summary['wall_seconds']:.1f}s with {summary['jobs']} jobs: "
+        f"{summary['statements_per_second']:.1f} statements/s, {summary['pages_per_second']:.1f} pages/s, "
+        f"{summary['transactions_per_second']:.1f} transactions/s; latency p50 {latency['p50']:.0f}ms, "
+        f"p90 {latency['p90']:.0f}ms, p99 {latency['p99']:.0f}ms, max {latency['max']:.0f}ms\n")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import logging
+import re
+from functools import lru_cache
+
+logger = logging.getLogger()
+
+# Cities HDFC appends to card transaction descriptions (lowercase, in stripping order)
+CITY_NAMES = (
+    'mumbai', 'delhi', 'bangalore', 'bengaluru', 'chennai', 'hyderabad', 'pune',
+    'kolkata', 'ahmedabad', 'jaipur', 'lucknow', 'chandigarh', 'gurgaon',
+    'gurgoan',  # common misspelling on statements
+    'noida', 'faridabad'
+)
+
+# Business suffixes that don't help with categorization (in stripping order)
+BUSINESS_SUFFIXES = ('limited', 'ltd', 'pvt', 'private', 'india', 'in')
+
+# Each city may be stripped twice (e.g. "... MUMBAI MUMBAI 40"), after which any
+# trailing word with a location code, then any trailing word, is dropped once
+_CITY_RULES = [city for city in CITY_NAMES for _ in range(2)]
+_CODED_WORD_RULE = len(_CITY_RULES)
+_ANY_WORD_RULE = _CODED_WORD_RULE + 1
+
+_TIMESTAMP_PREFIX_RE = re.compile(r'^\d{2}:\d{2}:\d{2}\s+')
+# Trailing "<word> [digits]" unit, e.g. " BANGALORE 70" or " Mumbai"
+_TRAILING_LOCATION_RE = re.compile(r'\s+([A-Z]+)\s*(\d*)\s*$', re.IGNORECASE)
+_TRAILING_CODE_RE = re.compile(r'\s+\d{1,3}\s*$')
+_TRAILING_WORD_RE = re.compile(r'\s+([A-Z]+)\s*$', re.IGNORECASE)
+
+DESCRIPTION_CACHE_SIZE = 4096
+
+
+def _location_rule_accepts(rule, word, digits):
+    if rule < _CODED_WORD_RULE:
+        return word.lower() == _CITY_RULES[rule]
+    if rule == _CODED_WORD_RULE:
+        return len(word) >= 3 and bool(digits)
+    return len(word) >= 3
+
+
+def _strip_locations(description):
+    """Strip trailing city/location-code units in one right-to-left pass over the rules"""
+    rule = 0
+    while rule <= _ANY_WORD_RULE:
+        match = _TRAILING_LOCATION_RE.search(description)
+        if not match:
+            break
+        word, digits = match.group(1), match.group(2)
+        # Rules that don't fit the current trailing unit would be no-ops, so skip past them
+        while rule <= _ANY_WORD_RULE and not _location_rule_accepts(rule, word, digits):
+            rule += 1
+        if rule > _ANY_WORD_RULE:
+            break
+        description = description[:match.start()]
+        rule += 1
+    return description
+
+
+def _strip_business_suffixes(description):
+    """Drop each business suffix at most once, in BUSINESS_SUFFIXES order"""
+    suffix_index = 0
+    while suffix_index < len(BUSINESS_SUFFIXES):
+        match = _TRAILING_WORD_RE.search(description)
+        if not match:
+            break
+        word = match.group(1).lower()
+        while suffix_index < len(BUSINESS_SUFFIXES) and BUSINESS_SUFFIXES[suffix_index] != word:
+            suffix_index += 1
+        if suffix_index == len(BUSINESS_SUFFIXES):
+            break
+        description = description[:match.start()]
+        suffix_index += 1
+    return description
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def clean_hdfc_cc_description(description):
+    """Clean HDFC credit card descriptions by removing timestamps, locations and suffixes
+
+    "09:43:59 AVENUEECOMMERCELIMITED Mumbai" -> "AVENUEECOMMERCELIMITED"
+    "22:38:58 MyntraDesignsPvtLtd BANGALORE 70" -> "MyntraDesignsPvtLtd"
+    Results are memoized because the same merchant strings repeat across a statement
+    and are cleaned again when building the ML payload.
+    """
+    if not description:
+        return description
+
+    # Remove timestamp at the beginning (HH:MM:SS)
+    description = _TIMESTAMP_PREFIX_RE.sub('', description)
+
+    # Remove city names / location codes, then standalone location numbers like " 70"
+    description = _strip_locations(description)
+    description = _TRAILING_CODE_RE.sub('', description)
+
+    description = _strip_business_suffixes(description)
+
+    # Final cleanup: collapse whitespace
+    cleaned = ' '.join(description.split())
+
+    if cleaned != description.strip():
+        logger.debug("Cleaned HDFC CC description: '%s' -> '%s'", description.strip(), cleaned)
+
+    return cleaned
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Generated from src/handlers/shared/keyword_matcher.py by scripts/sync_shared_modules.py.
+# Edit the shared module and re-run the script; changes made here are overwritten.
+"""Which of a fixed list of keywords occur in a line, found in one scan
+
+Statement parsing and the keyword fallback categories ask the same question
+of every line or description: does it contain any of these N substrings (and
+which ones)? Testing `keyword in text` for each keyword scans the text N
+times. KeywordAutomaton is built once, at import, and scans the text once
+however many keywords there are.
+
+With pyahocorasick installed (AHOCORASICK_AVAILABLE) the scan runs in its C
+Aho-Corasick automaton. Otherwise the keywords are arranged in a trie and
+the trie is compiled into one prefix-factored regex, so the scan still runs
+in the re engine instead of a per-character Python loop.
+"""
+
+import re
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Marks a trie node where a keyword ends
+_END = ''
+
+
+def _trie_pattern(node):
+    """Regex for a trie node; keywords that continue past a shorter one are tried first"""
+    alternatives = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != _END]
+    if not alternatives:
+        return ''
+    if len(alternatives) == 1 and _END not in node:
+        return alternatives[0]
+    group = '(?:' + '|'.join(alternatives) + ')'
+    return group + '?' if _END in node else group
+
+
+class KeywordAutomaton:
+    """Fixed keywords matched as substrings, case-sensitively
+
+    keywords is an iterable of strings, or of (keyword, value) pairs when the
+    caller needs to know which group of keywords matched (a plain keyword is
+    its own value). Callers lowercase the text themselves when the keywords
+    are lowercase.
+    """
+
+    def __init__(self, keywords):
+        values = {}
+        for entry in keywords:
+            keyword, value = (entry, entry) if isinstance(entry, str) else entry
+            if keyword:
+                values.setdefault(keyword, set()).add(value)
+        self.keywords = tuple(values)
+
+        if AHOCORASICK_AVAILABLE and values:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, keyword_values in values.items():
+                self._automaton.add_word(keyword, frozenset(keyword_values))
+            self._automaton.make_automaton()
+            return
+
+        self._automaton = None
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[_END] = True
+        pattern = _trie_pattern(trie) if trie else r'(?!)'
+        self._search = re.compile(pattern).search
+        # A lookahead reports the longest keyword starting at every position, overlaps included
+        self._finditer = re.compile(f'(?=({pattern}))').finditer
+        # The longest keyword at a position implies every keyword that is a prefix of it
+        self._values = {}
+        for keyword in self.keywords:
+            self._values[keyword] = frozenset().union(
+                *(values[keyword[:end]] for end in range(1, len(keyword) + 1) if keyword[:end] in values))
+
+    def found_in(self, text):
+        """Whether any keyword occurs in text"""
+        if self._automaton is not None:
+            for _ in self._automaton.iter(text):
+                return True
+            return False
+        return self._search(text) is not None
+
+    def values_in(self, text):
+        """Set of the values of all keywords that occur in text"""
+        found = set()
+        if self._automaton is not None:
+            for _, keyword_values in self._automaton.iter(text):
+                found |= keyword_values
+            return found
+        for match in self._finditer(text):
+            found |= self._values[match.group(1)]
+        return found
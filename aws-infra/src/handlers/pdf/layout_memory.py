@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Which table-extraction strategy works for a statement layout
+
+A layout fingerprint combines the issuer (detected statement type, the bank
+named in the statement header and whether it is a card statement), the
+transaction table's header row and its column count. The issuer is built only
+from the fixed markers in ISSUER_MARKERS, never from free text on the page,
+which on savings statements starts with the account holder's name. The
+strategy that produced transactions for a fingerprint is tried first on later
+pages and later statements from the same issuer, so the strategies that
+failed for that layout are skipped. Entries live in memory for warm Lambda
+containers and are mirrored to a small JSON file on /tmp.
+"""
+
+import json
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger()
+
+# Table-extraction cascade, in the order it is tried for an unknown layout
+STRATEGY_DEFAULT = 'default'
+STRATEGY_LINES_STRICT = 'lines_strict'
+STRATEGY_TEXT = 'text'
+TABLE_STRATEGIES = (STRATEGY_DEFAULT, STRATEGY_LINES_STRICT, STRATEGY_TEXT)
+
+DEFAULT_MEMORY_PATH = os.path.join(tempfile.gettempdir(), 'layout-memory.json')
+MAX_REMEMBERED_ISSUERS = 256
+# Characters at the start of the statement searched for the bank markers
+ISSUER_HEADER_CHARS = 500
+
+# Bank -> names printed in statement letterheads and the prefix of its branch IFSC codes
+ISSUER_MARKERS = (
+    ('icici', ('icici bank', 'icic0')),
+    ('hdfc', ('hdfc bank', 'hdfc0')),
+    ('sbi', ('state bank of india', 'sbi card', 'sbin0')),
+    ('axis', ('axis bank', 'utib0')),
+    ('kotak', ('kotak mahindra bank', 'kkbk0')),
+    ('indusind', ('indusind bank', 'indb0')),
+    ('yes', ('yes bank', 'yesb0')),
+    ('idfc', ('idfc first bank', 'idfb0')),
+    ('bob', ('bank of baroda', 'barb0')),
+    ('pnb', ('punjab national bank', 'punb0')),
+    ('canara', ('canara bank', 'cnrb0')),
+    ('union', ('union bank of india', 'ubin0')),
+    ('federal', ('federal bank', 'fdrl0')),
+)
+_ISSUER_BANKS = {bank for bank, _ in ISSUER_MARKERS}
+# Card and account statements of one bank (e.g. both ICICI) have different tables
+CARD_MARKER = 'credit card'
+CARD_SUFFIX = ':card'
+
+
+def _normalize(text):
+    return ' '.join(str(text or '').lower().split())
+
+
+def layout_issuer(statement_type, header_text):
+    """Issuer key: the statement type plus the bank whose marker comes first in the statement header"""
+    header = _normalize(header_text)
+    # The letterhead precedes any bank named in a transaction narration
+    found = [(header.find(marker), bank) for bank, markers in ISSUER_MARKERS for marker in markers if marker in header]
+    issuer = f"{statement_type}:{min(found)[1]}" if found else statement_type
+    return issuer + CARD_SUFFIX if CARD_MARKER in header else issuer
+
+
+def _is_issuer_key(issuer):
+    if issuer.endswith(CARD_SUFFIX):
+        issuer = issuer[:-len(CARD_SUFFIX)]
+    statement_type, _, bank = issuer.partition(':')
+    return statement_type.isupper() and (not bank or bank in _ISSUER_BANKS)
+
+
+def layout_fingerprint(issuer, headers):
+    """Fingerprint of an issuer's transaction table from its header row"""
+    cells = [_normalize(cell) for cell in headers]
+    return f"{issuer}|{len(cells)}|" + '|'.join(cells)
+
+
+class LayoutMemory:
+    """Issuer -> (fingerprint, strategy) for the layout that last produced transactions"""
+
+    def __init__(self, path=None, max_issuers=MAX_REMEMBERED_ISSUERS):
+        self.path = path
+        self.max_issuers = max_issuers
+        self._layouts = {}
+        if path:
+            self._load()
+
+    def lookup(self, issuer):
+        """(fingerprint, strategy) learned for the issuer, or (None, None)"""
+        return tuple(self._layouts.get(issuer, (None, None)))
+
+    def record(self, issuer, fingerprint, strategy):
+        """Remember the strategy that produced transactions for a layout"""
+        if not issuer or self.lookup(issuer) == (fingerprint, strategy):
+            return
+        # Re-inserting keeps the dict in least recently learned order for trimming
+        self._layouts.pop(issuer, None)
+        self._layouts[issuer] = (fingerprint, strategy)
+        while len(self._layouts) > self.max_issuers:
+            del self._layouts[next(iter(self._layouts))]
+        logger.info(f"📐 Learned {strategy} table strategy for {issuer}")
+        self._save()
+
+    def _load(self):
+        try:
+            with open(self.path) as memory_file:
+                layouts = json.load(memory_file)
+        except (OSError, ValueError):
+            return
+        # Entries keyed on page text by older versions are dropped
+        for issuer, entry in layouts.items():
+            if (_is_issuer_key(issuer) and isinstance(entry, list) and len(entry) == 2 and
+                    entry[1] in TABLE_STRATEGIES and str(entry[0]).startswith(issuer + '|')):
+                self._layouts[issuer] = tuple(entry)
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as memory_file:
+                json.dump(self._layouts, memory_file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist layout memory: {e}")
+
+
+def memory_from_environment():
+    """Shared memory persisted at PDF_LAYOUT_MEMORY_PATH (PDF_LAYOUT_MEMORY=0 disables it)"""
+    if os.environ.get('PDF_LAYOUT_MEMORY', '1') != '1':
+        return None
+    return LayoutMemory(os.environ.get('PDF_LAYOUT_MEMORY_PATH', DEFAULT_MEMORY_PATH))
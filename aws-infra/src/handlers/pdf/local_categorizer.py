@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""In-process categorization with the ONNX categorizer packaged alongside the parser
+
+Invoking the categorizer Lambda costs a second cold start, a JSON round trip
+and network latency. When categorizeTransactions_onnx.py, its libraries and
+model.onnx are packaged with this function (in the code directory or a layer
+on sys.path), ONNXTransactionCategorizer.batch_categorize runs here instead.
+
+ML_CATEGORIZER_MODE picks the path: "remote" always invokes the Lambda,
+"local" categorizes in-process whenever the model loads, and "auto" (the
+default) does so for statements of up to ML_LOCAL_MAX_TRANSACTIONS
+transactions. Without a packaged model every mode ends up remote.
+
+The categorizer Lambda stores each result as an 'ml_original' record in
+ML_FEEDBACK_TABLE, next to the users' corrections; store_ml_feedback() writes
+the same records for in-process results.
+"""
+
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from instrumentation import metrics
+
+try:
+    import boto3
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+logger = logging.getLogger()
+
+MODE_REMOTE = 'remote'
+MODE_LOCAL = 'local'
+MODE_AUTO = 'auto'
+CATEGORIZER_MODES = (MODE_REMOTE, MODE_LOCAL, MODE_AUTO)
+
+DEFAULT_LOCAL_MAX_TRANSACTIONS = 500
+
+# Loaded once per container; a failed load is not retried on warm invocations
+_categorizer = None
+_load_attempted = False
+
+
+def categorizer_mode():
+    mode = os.environ.get('ML_CATEGORIZER_MODE', MODE_AUTO)
+    return mode if mode in CATEGORIZER_MODES else MODE_AUTO
+
+
+def local_categorizer():
+    """Loaded ONNXTransactionCategorizer, or None when its module, libraries or model aren't packaged"""
+    global _categorizer, _load_attempted
+    if _load_attempted:
+        return _categorizer
+    _load_attempted = True
+
+    try:
+        import categorizeTransactions_onnx as onnx_module
+    except ImportError as e:
+        logger.info(f"In-process categorizer not packaged ({e}), using the categorizer Lambda")
+        return None
+
+    model_path = os.path.join(os.path.dirname(os.path.abspath(onnx_module.__file__)), 'model.onnx')
+    if not onnx_module.ML_AVAILABLE or not os.path.exists(model_path):
+        # Without them batch_categorize would only apply its keyword rules
+        logger.info("ONNX Runtime or model.onnx not packaged, using the categorizer Lambda")
+        return None
+
+    categorizer = onnx_module.ONNXTransactionCategorizer()
+    if not categorizer.load_model():
+        logger.warning("In-process ONNX model failed to load, using the categorizer Lambda")
+        return None
+    _categorizer = categorizer
+    logger.info("🧠 In-process ONNX categorizer loaded")
+    return _categorizer
+
+
+def should_categorize_locally(transaction_count):
+    """Whether this many transactions are categorized in-process rather than by the Lambda"""
+    mode = categorizer_mode()
+    if mode == MODE_REMOTE:
+        return False
+    max_transactions = int(os.environ.get('ML_LOCAL_MAX_TRANSACTIONS', DEFAULT_LOCAL_MAX_TRANSACTIONS))
+    if mode == MODE_AUTO and transaction_count > max_transactions:
+        return False
+    return local_categorizer() is not None
+
+
+def _feedback_record(transaction, result, user_id, wallet_id):
+    """'ml_original' feedback record in the shape the categorizer Lambda writes"""
+    timestamp = datetime.utcnow().isoformat()
+    record = {
+        'userId': user_id,
+        'feedbackId': f"ml-original-{uuid.uuid4()}",
+        'timestamp': timestamp,
+        'feedbackType': 'ml_original',
+        'originalResult': {
+            'description': transaction.get('description'),
+            'amount': transaction.get('amount'),
+            'category': result.get('category'),
+            'confidence': result.get('confidence'),
+            'method': result.get('method'),
+            'processing_time_ms': result.get('processing_time_ms', 0)
+        },
+        'userCorrection': None,
+        'source': 'pdf_import',
+        'walletId': wallet_id,
+        'createdAt': timestamp
+    }
+    # DynamoDB takes numbers as Decimal, not float
+    return json.loads(json.dumps(record), parse_float=Decimal)
+
+
+def store_ml_feedback(transactions, results, user_id, wallet_id):
+    """Write an 'ml_original' record per in-process result to ML_FEEDBACK_TABLE; failures are logged, not raised"""
+    table_name = os.environ.get('ML_FEEDBACK_TABLE')
+    if not table_name or not BOTO3_AVAILABLE:
+        logger.warning("ML_FEEDBACK_TABLE or boto3 unavailable, in-process ML results not stored for feedback")
+        return 0
+
+    stored = 0
+    try:
+        with metrics.span('dynamodb_write'):
+            with boto3.resource('dynamodb').Table(table_name).batch_writer() as batch:
+                for position, result in enumerate(results or []):
+                    index = result.get('transaction_index', position)
+                    if isinstance(index, int) and 0 <= index < len(transactions):
+                        batch.put_item(Item=_feedback_record(transactions[index], result, user_id, wallet_id))
+                        stored += 1
+    except Exception as e:
+        logger.error(f"Error storing in-process ML results to DynamoDB: {e}")
+        return 0
+    metrics.count('feedback_records', stored)
+    logger.info(f"Stored {stored} in-process ML results in DynamoDB table {table_name}")
+    return stored
@@ -1,51 +1,223 @@
 #!/usr/bin/env python3
 
 import json
-import logging  
 import base64
-import boto3
+import io
 import os
 import tempfile
-import pdfplumber
-import re
-from datetime import datetime
 from typing import Dict, List, Any
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# boto3 ships with the Lambda runtime; offline runs (bulk_parse.py) parse local files without it
+try:
+    import boto3
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+from statement_document import StatementDocument, STRICT_LINE_TABLE_SETTINGS
+from statement_layouts import transaction_region
+import statement_patterns as patterns
+from statement_continuations import ContinuationBuffer
+from description_cleaner import clean_hdfc_cc_description
+from fallback_categories import fallback_categorization
+from local_categorizer import local_categorizer, should_categorize_locally, store_ml_feedback
+from statement_dates import StatementDateParser
+from statement_amounts import parse_amount, parse_amount_column, parse_amount_cells
+from statement_transaction import Transaction, TABLE_FIELDS, CARD_FIELDS, SCHEMA_FIELDS, encode_transaction
+from response_encoding import ResponseOptions, response_options, encode_response, project, FORMAT_NDJSON
+from instrumentation import metrics, instrumented, timings_requested
+from profiling import profiled
+from log_utils import setup_logger, payload_for_log, StageLogger
+from parse_cache import cache_from_environment, cache_key, content_digest, etag_digest, source_version
+from parse_checkpoints import API_GATEWAY_TIMEOUT_MS, Deadline, DeadlineReached, store_from_environment
+from layout_memory import (ISSUER_HEADER_CHARS, STRATEGY_DEFAULT, STRATEGY_LINES_STRICT, STRATEGY_TEXT,
+                           layout_fingerprint, layout_issuer, memory_from_environment)
 
 # Set up logging
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = setup_logger()
+
+# Statement layouts recognised by _detect_statement_type
+STATEMENT_SBI_CC = 'SBI_CC'
+STATEMENT_HDFC_CC = 'HDFC_CC'
+STATEMENT_INDUSIND_CC = 'INDUSIND_CC'
+STATEMENT_ICICI = 'ICICI'
+STATEMENT_GENERIC = 'GENERIC'
+
+# Credit card layouts by header markers (first 500 chars), most specific first
+CARD_HEADER_MARKERS = [
+    (STATEMENT_SBI_CC, ['sbi card', 'sbi credit card', 'state bank of india']),
+    (STATEMENT_HDFC_CC, ['hdfc bank', 'hdfc credit card', 'hdfc card']),
+    (STATEMENT_INDUSIND_CC, ['indusind', 'indusind bank']),
+]
+CARD_CONFIRM_KEYWORDS = ['credit card', 'statement']
+
+# Statements shorter than this are cheaper to parse than to fan out
+PARALLEL_MIN_PAGES = 4
+
+# Pages parsed both cropped and whole before a transaction region is trusted
+# (the first page and the first continuation page use different boxes)
+REGION_SAMPLE_PAGES = 2
+
+# Part of every parse cache key; derived from this package's sources unless pinned
+PARSER_VERSION = os.environ.get('PDF_PARSER_VERSION') or source_version(os.path.dirname(os.path.abspath(__file__)))
+
+# Parsed transactions by statement content (reused across warm invocations)
+parse_cache = cache_from_environment()
+
+# Table strategy learned per statement layout (reused across pages and statements)
+layout_memory = memory_from_environment()
+
+# Where deadline-interrupted parses are checkpointed for their continuation_token
+checkpoint_store = store_from_environment()
+
+# Batch requests ("files": [...]): statements per request and statements parsed at once
+MAX_BATCH_FILES = int(os.environ.get('PDF_BATCH_MAX_FILES', 24))
+BATCH_WORKERS = int(os.environ.get('PDF_BATCH_WORKERS', 4))
+
+# Categorizer calls: transactions per invoke and invokes in flight at once
+ML_CHUNK_SIZE = max(1, int(os.environ.get('ML_CHUNK_SIZE', 250)))
+ML_MAX_CONCURRENCY = int(os.environ.get('ML_MAX_CONCURRENCY', 4))
+
+
+def _available_cpu_count():
+    """Number of CPUs this process may run on (vCPUs on Lambda)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class PageWorkerError(Exception):
+    """A page worker process failed or died before returning its pages"""
+
+
+def _extract_page_chunk(pdf_source, password, page_indices, issuer=None, region=None):
+    """Worker entry point: parse a contiguous range of pages in its own process"""
+    parser = ICICIStatementParser(parallel=False)
+    parser._begin_layout(issuer)
+    with StatementDocument(pdf_source, password) as document:
+        document.set_region(region)
+        return [parser._extract_page_transactions(document, page_index) for page_index in page_indices]
+
+
+def _pipe_page_chunk_worker(connection, pdf_source, password, page_indices, issuer=None, region=None):
+    """Pipe-based worker used where multiprocessing queues are unavailable"""
+    try:
+        connection.send(('ok', _extract_page_chunk(pdf_source, password, page_indices, issuer, region)))
+    except Exception as e:
+        connection.send(('error', str(e)))
+    finally:
+        connection.close()
+
+
+def _run_page_chunks_with_pipes(pdf_source, password, chunks, issuer=None, region=None):
+    """Run page chunks in separate processes connected by pipes, results in chunk order"""
+    workers = []
+    try:
+        for page_indices in chunks:
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_pipe_page_chunk_worker,
+                args=(sender, pdf_source, password, page_indices, issuer, region)
+            )
+            process.start()
+            sender.close()
+            workers.append((process, receiver))
+        
+        chunk_results = []
+        for process, receiver in workers:
+            try:
+                status, payload = receiver.recv()
+            except EOFError:
+                # The worker died without sending (e.g. killed when the function ran out of memory)
+                process.join()
+                raise PageWorkerError(f"Page worker exited with code {process.exitcode} before sending its pages")
+            process.join()
+            if status != 'ok':
+                raise PageWorkerError(f"Page worker failed: {payload}")
+            if process.exitcode:
+                raise PageWorkerError(f"Page worker exited with code {process.exitcode}")
+            chunk_results.append(payload)
+        return chunk_results
+    finally:
+        # Workers still running after a failure are stopped rather than left behind
+        for process, receiver in workers:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            receiver.close()
+
 
 class ICICIStatementParser:
     """Parse ICICI Bank PDF statements"""
     
-    def __init__(self):
+    def __init__(self, parallel=None, max_workers=None, use_temp_files=None, crop_regions=None):
         self.temp_files = []
+        # Page-parallel table extraction (opt-in via constructor or PDF_PARSER_PARALLEL=1)
+        if parallel is None:
+            parallel = os.environ.get('PDF_PARSER_PARALLEL', '0') == '1'
+        self.parallel = parallel
+        self.max_workers = max_workers or int(os.environ.get('PDF_PARSER_WORKERS', 0)) or _available_cpu_count()
+        # Statements are parsed from memory; PDF_PARSER_TEMP_FILES=1 spools them to /tmp as before
+        if use_temp_files is None:
+            use_temp_files = os.environ.get('PDF_PARSER_TEMP_FILES', '0') == '1'
+        self.use_temp_files = use_temp_files
+        # Read pages through the issuer's transaction region (opt-in via constructor or PDF_PARSER_CROP=1)
+        if crop_regions is None:
+            crop_regions = os.environ.get('PDF_PARSER_CROP', '0') == '1'
+        self.crop_regions = crop_regions
+        # Learns the statement's date format on the first row
+        self.date_parser = StatementDateParser()
+        # Per-item logging: sampled at INFO, full row traces only with LOG_LEVEL=DEBUG
+        self.table_log = StageLogger('tables')
+        self.row_log = StageLogger('table_rows')
+        self.header_log = StageLogger('headers')
+        self.multiline_log = StageLogger('multiline_rows')
+        self.line_log = StageLogger('text_lines')
+        # Table strategy for the current statement's layout (see layout_memory)
+        self.layout_memory = layout_memory
+        self.layout_issuer = None
+        self.layout_fingerprint = None
+        self.layout_strategy = None
+        self.layout_region = None
+        # Set by the Lambda handler: stop at a page boundary when time runs out,
+        # and start from the pages a previous invocation extracted
+        self.deadline = None
+        self.resume_pages = None
     
     def parse_pdf_from_base64(self, pdf_base64_content, password=None):
         """Parse PDF from base64 encoded content with optional password"""
         try:
             # Decode base64 content
             pdf_bytes = base64.b64decode(pdf_base64_content)
+        except Exception as e:
+            logger.error(f"Error parsing PDF from base64: {e}")
+            raise
+        return self.parse_pdf_bytes(pdf_bytes, password)
+    
+    def parse_pdf_bytes(self, pdf_bytes, password=None):
+        """Parse PDF from raw bytes with optional password"""
+        try:
+            if self.use_temp_files:
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+                    self.temp_files.append(temp_file.name)
+                    temp_file.write(pdf_bytes)
+                pdf_source = temp_file.name
+            else:
+                pdf_source = pdf_bytes
             
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_file.write(pdf_bytes)
-                temp_file_path = temp_file.name
-                self.temp_files.append(temp_file_path)
-            
-            # Parse the PDF
-            transactions = self._parse_icici_statement(temp_file_path, password)
-            
-            # Clean up
-            self._cleanup_temp_files()
-            
-            return transactions
+            return self._parse_pdf_source(pdf_source, password)
             
+        except DeadlineReached:
+            raise
         except Exception as e:
-            logger.error(f"Error parsing PDF from base64: {e}")
-            self._cleanup_temp_files()
+            logger.error(f"Error parsing PDF from bytes: {e}")
             raise
+        finally:
+            self._cleanup_temp_files()
     
     def parse_pdf_from_s3(self, bucket, key, password=None):
         """Parse PDF from S3 bucket with optional password"""
@@ -53,104 +225,84 @@ class ICICIStatementParser:
             # Download PDF from S3
             s3_client = boto3.client('s3')
             
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                s3_client.download_fileobj(bucket, key, temp_file)
-                temp_file_path = temp_file.name
-                self.temp_files.append(temp_file_path)
-            
-            # Parse the PDF
-            transactions = self._parse_icici_statement(temp_file_path, password)
-            
-            # Clean up
-            self._cleanup_temp_files()
+            if self.use_temp_files:
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+                    self.temp_files.append(temp_file.name)
+                    s3_client.download_fileobj(bucket, key, temp_file)
+                pdf_source = temp_file.name
+            else:
+                buffer = io.BytesIO()
+                s3_client.download_fileobj(bucket, key, buffer)
+                pdf_source = buffer.getvalue()
             
-            return transactions
+            return self._parse_pdf_source(pdf_source, password)
             
+        except DeadlineReached:
+            raise
         except Exception as e:
             logger.error(f"Error parsing PDF from S3: {e}")
-            self._cleanup_temp_files()
             raise
+        finally:
+            self._cleanup_temp_files()
     
-    def _parse_icici_statement(self, pdf_path, password=None):
+    def _parse_pdf_source(self, pdf_source, password=None):
+        """Parse a PDF given as bytes or a path (opened once and shared by every strategy)"""
+        with StatementDocument(pdf_source, password) as document:
+            if self.resume_pages:
+                document.restore_pages(self.resume_pages)
+            if self.deadline:
+                document.page_hook = self.deadline.check
+            try:
+                transactions = self._parse_icici_statement(document)
+            except DeadlineReached as e:
+                e.pages = document.snapshot_pages()
+                logger.info(f"⏱️ {e}, checkpointing {len(e.pages['text'])} extracted pages")
+                raise
+        self._log_stage_summaries()
+        return transactions
+    
+    def _log_stage_summaries(self):
+        for stage_log in (self.table_log, self.row_log, self.header_log, self.multiline_log, self.line_log):
+            stage_log.summary()
+    
+    def _parse_icici_statement(self, document):
         """Generic bank statement parser with automatic schema inference"""
         
         logger.info("🚀 _parse_icici_statement called - starting bank detection")
         
         # First, check what type of statement this is
-        try:
-            with pdfplumber.open(pdf_path, password=password) as pdf:
-                text = ''
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + '\n'
-        except Exception as e:
-            # Check if this is a password-related error
-            error_str = str(e).lower()
-            if any(keyword in error_str for keyword in ['password', 'encrypted', 'decrypt', 'authentication']):
-                logger.error(f"PDF password authentication failed: {e}")
-                raise Exception("PDF is password protected. Please provide the correct password.")
-            else:
-                logger.error(f"❌ Failed to extract text for statement detection: {e}")
-                logger.error(f"❌ Text extraction failed - will fall back to table extraction only")
-                text = ''
-        
-        logger.info(f"✅ Text extraction complete. Text length: {len(text)} chars")
-        logger.info(f"✅ Text sample (first 100 chars): {repr(text[:100])}")
-        
-        # Check for different bank credit card formats with more precise detection
-        # Look for bank names in the first few lines (header area) to avoid false positives
-        first_500_chars = text[:500].lower()
-        first_1000_chars = text[:1000].lower()
-        
-        logger.info(f"🔍 Statement detection - first 500 chars: {repr(first_500_chars[:200])}")
-        logger.info(f"🔍 Looking for ICICI patterns in first 1000 chars")
-        logger.info(f"🔍 Does text contain 'icici'? {'icici' in text.lower()}")
-        logger.info(f"🔍 Does first_500_chars contain 'icici'? {'icici' in first_500_chars}")
-        logger.info(f"🔍 Full text length: {len(text)} chars")
+        statement_type = self._detect_statement_type(document)
+        self._begin_layout(layout_issuer(statement_type, document.header_text(ISSUER_HEADER_CHARS)))
+        self._apply_region(document, statement_type)
         
         # SBI Credit Card - check first (most specific patterns)
-        if any(pattern in first_500_chars for pattern in ['sbi card', 'sbi credit card', 'state bank of india']) and \
-           any(keyword in text.lower() for keyword in ['credit card', 'statement']):
+        if statement_type == STATEMENT_SBI_CC:
             logger.info("Detected SBI Credit Card statement, using specialized text parsing")
-            lines = text.split('\n')
-            return self._parse_sbi_credit_card_text(lines)
+            return self._parse_sbi_credit_card_text(document.lines)
         
         # HDFC Credit Card - check header area, not entire document
-        elif any(pattern in first_500_chars for pattern in ['hdfc bank', 'hdfc credit card', 'hdfc card']) and \
-             any(keyword in text.lower() for keyword in ['credit card', 'statement']):
+        elif statement_type == STATEMENT_HDFC_CC:
             logger.info("Detected HDFC Credit Card statement, using specialized text parsing")
-            lines = text.split('\n')
-            return self._parse_hdfc_credit_card_text(lines)
+            return self._parse_hdfc_credit_card_text(document.lines)
         
         # IndusInd Credit Card
-        elif any(pattern in first_500_chars for pattern in ['indusind', 'indusind bank']) and \
-             any(keyword in text.lower() for keyword in ['credit card', 'statement']):
+        elif statement_type == STATEMENT_INDUSIND_CC:
             logger.info("Detected IndusInd Credit Card statement, using specialized text parsing")
-            lines = text.split('\n')
-            return self._parse_indusind_credit_card_text(lines)
+            return self._parse_indusind_credit_card_text(document.lines)
         
         # For ICICI credit cards, combine table and text parsing (enhanced detection)
-        elif ('icici' in text.lower()):
-            logger.info(f"🔍 Found ICICI in text, checking credit card patterns...")
-            logger.info(f"🔍 Text contains credit: {'credit' in text.lower()}")
-            logger.info(f"🔍 Text contains card: {'card' in text.lower()}")
-            logger.info(f"🔍 Text contains statement: {'statement' in text.lower()}")
-            
+        elif statement_type == STATEMENT_ICICI:
             # Very broad ICICI detection since table parsing is failing
             if True:  # Force ICICI processing for any ICICI document
                 logger.info("🔍 Detected ICICI Credit Card - using enhanced parsing approach")
-                logger.info(f"🔍 ICICI detection matched - first 200 chars: {repr(first_1000_chars[:200])}")
                 
                 # Force text parsing for ICICI CC (more reliable than table extraction)
                 logger.info("🚀 Starting text-based parsing for ICICI CC")
-                lines = text.split('\n')
-                text_transactions = self._parse_icici_credit_card_text(lines)
+                text_transactions = self._parse_icici_credit_card_text(document.lines)
                 
                 # Also try table-based extraction
                 logger.info("🚀 Starting table-based parsing for ICICI CC")
-                table_transactions = self._parse_with_table_extraction(pdf_path, password)
+                table_transactions = self._parse_with_table_extraction(document)
                 
                 # Combine transactions from both methods
                 all_transactions = []
@@ -164,18 +316,18 @@ class ICICIStatementParser:
                 if table_transactions:
                     existing_signatures = set()
                     for txn in all_transactions:
-                        sig = f"{txn['date']}|{txn['amount']}|{txn['description'][:20]}"
-                        existing_signatures.add(sig)
+                        existing_signatures.add(self._transaction_signature(txn))
                 
                     added_from_table = 0
                     for txn in table_transactions:
-                        sig = f"{txn['date']}|{txn['amount']}|{txn['description'][:20]}"
+                        sig = self._transaction_signature(txn)
                         if sig not in existing_signatures:
                             all_transactions.append(txn)
                             existing_signatures.add(sig)
                             added_from_table += 1
                         else:
-                            logger.info(f"Skipping duplicate from table: {txn['date']} - {txn['description'][:30]}")
+                            metrics.count('duplicates_dropped')
+                            self.row_log.trace("Skipping duplicate from table: %s - %s", txn['date'], txn['description'][:30])
                     
                     logger.info(f"✅ Table extraction found {len(table_transactions)} transactions ({added_from_table} new, {len(table_transactions) - added_from_table} duplicates)")
                 
@@ -186,180 +338,435 @@ class ICICIStatementParser:
                     logger.warning("❌ No transactions found with ICICI CC parsing - falling back to generic parsing")
         
         # For other formats, try table-based extraction first
-        table_transactions = self._parse_with_table_extraction(pdf_path, password)
+        table_transactions = self._parse_with_table_extraction(document)
         if table_transactions:
             logger.info(f"Table extraction found {len(table_transactions)} transactions")
             return table_transactions
         
         # Fallback to generic text-based parsing for other formats
-        return self._parse_with_schema_inference(pdf_path, password)
+        metrics.count('schema_inference_fallbacks')
+        return self._parse_with_schema_inference(document)
     
-    def _parse_with_table_extraction(self, pdf_path, password=None):
+    @metrics.timed('detect_statement_type')
+    def _detect_statement_type(self, document):
+        """Classify the statement from its first page, reading further pages only when ambiguous"""
+        try:
+            # Look for bank names in the first few lines (header area) to avoid false positives
+            first_500_chars = document.header_text(500).lower()
+            first_page = document.first_page_text().lower()
+            logger.debug("🔍 Statement detection - first 500 chars: %r", first_500_chars[:200])
+            
+            for statement_type, header_markers in CARD_HEADER_MARKERS:
+                if not any(marker in first_500_chars for marker in header_markers):
+                    continue
+                # Card header found but not confirmed on the first page: search the rest
+                if any(keyword in first_page for keyword in CARD_CONFIRM_KEYWORDS) or \
+                   document.contains_any(CARD_CONFIRM_KEYWORDS):
+                    return statement_type
+            if 'icici' in first_page:
+                return STATEMENT_ICICI
+            return STATEMENT_GENERIC
+            
+        except DeadlineReached:
+            raise
+        except Exception as e:
+            # Check if this is a password-related error
+            error_str = str(e).lower()
+            if any(keyword in error_str for keyword in ['password', 'encrypted', 'decrypt', 'authentication']):
+                logger.error(f"PDF password authentication failed: {e}")
+                raise Exception("PDF is password protected. Please provide the correct password.")
+            logger.error(f"❌ Failed to extract text for statement detection: {e}")
+            logger.error(f"❌ Text extraction failed - will fall back to table extraction only")
+            return STATEMENT_GENERIC
+    
+    def _transaction_signature(self, txn):
+        """Key used to drop the same transaction found by both text and table parsing"""
+        return f"{txn['date']}|{txn['amount']}|{txn['description'][:20]}"
+    
+    def iter_transactions(self, pdf_source, password=None):
+        """Yield transactions page by page with bounded memory
+        
+        pdf_source is a path, bytes or binary file object. Each page's pdfplumber objects
+        and cached text/tables are released as soon as the page has been parsed, so
+        downstream stages can start before the last page is read. Only the generic
+        text fallback (used when no page yields a table transaction) needs the
+        whole document.
+
+        Transactions come out in page order, which is not always the order
+        parse_pdf_bytes returns: for ICICI each page's text rows are followed by
+        that page's new table rows, while parse_pdf_bytes returns every text row
+        before the first table row. Callers that need that order should use
+        parse_pdf_bytes.
+        """
+        with StatementDocument(pdf_source, password) as document:
+            statement_type = self._detect_statement_type(document)
+            self._begin_layout(layout_issuer(statement_type, document.header_text(ISSUER_HEADER_CHARS)))
+            self._apply_region(document, statement_type)
+            logger.info(f"🌊 Streaming {document.page_count} pages as {statement_type}")
+            
+            line_parsers = {
+                STATEMENT_SBI_CC: self._parse_sbi_credit_card_text,
+                STATEMENT_HDFC_CC: self._parse_hdfc_credit_card_text,
+                STATEMENT_INDUSIND_CC: self._parse_indusind_credit_card_text,
+            }
+            line_parser = line_parsers.get(statement_type)
+            seen_signatures = set()
+            yielded = 0
+            
+            for page_index in range(document.page_count):
+                if line_parser:
+                    page_transactions = line_parser(document.page_lines(page_index))
+                elif statement_type == STATEMENT_ICICI:
+                    # Text rows first, then table rows not already seen on this or an earlier page
+                    page_transactions = self._parse_icici_credit_card_text(document.page_lines(page_index))
+                    seen_signatures.update(self._transaction_signature(txn) for txn in page_transactions)
+                    for txn in self._extract_page_transactions(document, page_index):
+                        sig = self._transaction_signature(txn)
+                        if sig not in seen_signatures:
+                            seen_signatures.add(sig)
+                            page_transactions.append(txn)
+                else:
+                    page_transactions = self._extract_page_transactions(document, page_index)
+                
+                document.release_page(page_index)
+                
+                for txn in page_transactions:
+                    yielded += 1
+                    yield txn
+            
+            if not yielded and not line_parser:
+                logger.info("No table transactions streamed, falling back to text schema inference")
+                for txn in self._parse_with_schema_inference(document):
+                    yield txn
+        self._log_stage_summaries()
+    
+    @metrics.timed('table_parsing')
+    def _parse_with_table_extraction(self, document):
         """Extract transactions using table detection with enhanced debugging"""
         all_transactions = []
         
         try:
-            with pdfplumber.open(pdf_path, password=password) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    logger.info(f"Processing page {page_num}")
-                    
-                    # Try different table extraction strategies
-                    tables = page.extract_tables()
-                    logger.info(f"Found {len(tables)} tables on page {page_num}")
-                    
-                    # If no tables found, try with different settings
-                    if not tables:
-                        # Try with explicit table settings
-                        tables = page.extract_tables(table_settings={
-                            "vertical_strategy": "lines_strict",
-                            "horizontal_strategy": "lines_strict"
-                        })
-                        logger.info(f"Retry with strict lines found {len(tables)} tables")
-                    
-                    if not tables:
-                        # Try text-based table detection
-                        text_lines = page.extract_text().split('\n')
-                        potential_table = self._detect_text_table(text_lines, page_num)
-                        if potential_table:
-                            tables = [potential_table]
-                            logger.info(f"Text-based detection found table with {len(potential_table)} rows")
-                    
-                    # Track header table and transaction tables separately for ICICI CC format
-                    icici_cc_header = None
-                    icici_cc_column_mapping = None
+            if self._should_parallelize(document):
+                page_results = self._extract_pages_in_parallel(document)
+            else:
+                page_results = (self._extract_page_transactions(document, page_index)
+                                for page_index in range(document.page_count))
+            
+            # Page results arrive in page order, so merging keeps statement order
+            for page_transactions in page_results:
+                all_transactions.extend(page_transactions)
+            
+            logger.info(f"Table extraction found {len(all_transactions)} transactions")
+            
+            # ICICI CC Fallback: If we found very few transactions but detected ICICI CC patterns,
+            # also try text-based parsing as a fallback
+            if len(all_transactions) <= 2:  # Very few transactions found
+                try:
+                    # Get the full text to check if this might be ICICI CC (cached on the document)
+                    text = document.full_text
                     
-                    for table_idx, table in enumerate(tables):
-                        if not table or len(table) < 1:
-                            logger.info(f"Skipping table {table_idx + 1}: insufficient rows ({len(table) if table else 0})")
-                            continue
-                        
-                        logger.info(f"Table {table_idx + 1} structure: {len(table)} rows, {len(table[0]) if table[0] else 0} columns")
-                        
-                        # Check if this is an ICICI CC header table (1 row, 6 columns)
-                        if len(table) == 1 and len(table[0]) == 6:
-                            row = table[0]
-                            row_text = [str(cell).lower().strip() if cell else '' for cell in row]
-                            if 'date' in row_text[0] and 'serno' in row_text[1] and 'transaction details' in row_text[2]:
-                                logger.info(f"✅ Found ICICI CC header table {table_idx + 1}: {row}")
-                                icici_cc_header = row
-                                icici_cc_column_mapping = self._infer_column_mapping(row)
-                                logger.info(f"ICICI CC column mapping: {icici_cc_column_mapping}")
-                                continue
-                        
-                        # Check if this is an ICICI CC transaction table (1 row, 6 columns with data)
-                        if len(table) == 1 and len(table[0]) == 6:
-                            row = table[0]
-                            logger.info(f"🔍 Checking potential ICICI CC transaction row: {row}")
-                            
-                            # Check if this looks like transaction data (has date and amount)
-                            if self._looks_like_icici_cc_transaction(row):
-                                logger.info(f"✅ Found ICICI CC transaction table {table_idx + 1}: {row}")
-                                try:
-                                    transaction = self._parse_icici_cc_table_row(row, icici_cc_header)
-                                    if transaction:
-                                        all_transactions.append(transaction)
-                                        logger.info(f"✅ Parsed ICICI CC transaction: {transaction['date']} - {transaction['amount']} - {transaction['description']}")
-                                    else:
-                                        logger.info(f"❌ Failed to parse ICICI CC transaction row")
-                                except Exception as e:
-                                    logger.error(f"❌ Failed to parse ICICI CC transaction: {e}", exc_info=True)
-                                continue
-                            else:
-                                logger.info(f"❌ Row doesn't look like ICICI CC transaction: {row}")
-                        
-                        # Also check for potential ICICI CC rows without header context
-                        elif len(table) == 1 and len(table[0]) == 6:
-                            row = table[0]
-                            logger.info(f"🔍 Checking potential ICICI CC transaction row (no header): {row}")
-                            
-                            if self._looks_like_icici_cc_transaction(row):
-                                logger.info(f"✅ Found standalone ICICI CC transaction: {row}")
-                                try:
-                                    # Use default header for parsing
-                                    default_header = ['Date', 'SerNo.', 'Transaction Details', 'Reward Points', 'Intl Amount', 'Amount']
-                                    transaction = self._parse_icici_cc_table_row(row, default_header)
-                                    if transaction:
-                                        all_transactions.append(transaction)
-                                        logger.info(f"✅ Parsed standalone ICICI CC transaction: {transaction['date']} - {transaction['amount']} - {transaction['description']}")
-                                    else:
-                                        logger.info(f"❌ Failed to parse standalone ICICI CC transaction row")
-                                except Exception as e:
-                                    logger.error(f"❌ Failed to parse standalone ICICI CC transaction: {e}", exc_info=True)
-                                continue
+                    # Check if this looks like ICICI CC but we missed it in table parsing
+                    if 'icici' in text.lower() and any(keyword in text.lower() for keyword in ['credit', 'card', 'statement']):
+                        logger.info(f"🔄 ICICI CC fallback: Only found {len(all_transactions)} transactions, trying text-based parsing")
+                        lines = text.split('\n')
+                        text_transactions = self._parse_icici_credit_card_text(lines)
                         
-                        # Regular table processing for non-ICICI CC format
-                        if len(table) < 2:
-                            logger.info(f"Skipping table {table_idx + 1}: insufficient rows for regular processing")
-                            continue
-                        
-                        # Find the actual header row (might not be first row)
-                        header_row_idx, headers = self._find_header_row(table)
-                        if header_row_idx == -1:
-                            logger.info(f"No valid headers found in table {table_idx + 1}")
-                            continue
-                        
-                        logger.info(f"Found headers at row {header_row_idx}: {headers}")
-                        
-                        # Map headers to our schema
-                        column_mapping = self._infer_column_mapping(headers)
-                        logger.info(f"Column mapping: {column_mapping}")
-                        
-                        if 'date_col' not in column_mapping and not self._has_date_pattern(table):
-                            logger.info(f"No date column found, skipping table {table_idx + 1}")
-                            continue
-                        
-                        # Parse transactions from table (starting after header row)
-                        data_rows = table[header_row_idx + 1:]
-                        logger.info(f"Processing {len(data_rows)} data rows")
-                        
-                        for row_idx, row in enumerate(data_rows, 1):
-                            try:
-                                logger.info(f"Processing row {row_idx}: {row}")
-                                # Handle multi-line rows (like HDFC format)
-                                transactions = self._parse_multiline_row(row, headers, column_mapping)
-                                if transactions:
-                                    for txn in transactions:
-                                        all_transactions.append(txn)
-                                    logger.info(f"✅ Parsed {len(transactions)} transactions from row {row_idx}")
-                                else:
-                                    logger.info(f"❌ Row {row_idx} returned None - failed validation")
-                            except Exception as e:
-                                logger.error(f"❌ Failed to parse row {row_idx}: {e}", exc_info=True)
+                        if text_transactions and len(text_transactions) > len(all_transactions):
+                            logger.info(f"✅ Text-based fallback found {len(text_transactions)} transactions (vs {len(all_transactions)} from tables)")
+                            return text_transactions
+                        else:
+                            logger.info(f"📝 Text-based fallback found {len(text_transactions) if text_transactions else 0} transactions (keeping table results)")
                 
-                logger.info(f"Table extraction found {len(all_transactions)} transactions")
+                except DeadlineReached:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ ICICI CC fallback parsing failed: {e}")
+            
+            return all_transactions
+            
+        except DeadlineReached:
+            raise
+        except Exception as e:
+            logger.error(f"Table extraction failed: {e}", exc_info=True)
+            return []
+    
+    def _extract_page_transactions(self, document, page_index):
+        """Extract transactions from the tables (or text table) of a single page
+        
+        The strategy learned for this layout (on an earlier page or statement) is
+        tried first; the full cascade only runs when it doesn't fit the page.
+        """
+        page_num = page_index + 1
+        logger.info("Processing page %d", page_num)
+        
+        learned_strategy = self.layout_strategy
+        page_transactions = headers = None
+        if learned_strategy:
+            tables = self._page_tables_with_strategy(document, page_index, learned_strategy)
+            if tables:
+                page_transactions, headers = self._transactions_from_tables(tables)
+                # Continuation pages (ICICI CC) carry no header row of their own
+                if page_transactions and (headers is None or
+                                          layout_fingerprint(self.layout_issuer, headers) == self.layout_fingerprint):
+                    self.table_log.sample("Reused %s table strategy on page %d", learned_strategy, page_num)
+                    metrics.count('layout_strategy_reused')
+                    return page_transactions
+            self.table_log.sample("Learned %s table strategy did not fit page %d, trying all strategies", learned_strategy, page_num)
+        
+        # Try different table extraction strategies
+        tables = self._page_tables_with_strategy(document, page_index, STRATEGY_DEFAULT)
+        strategy = STRATEGY_DEFAULT
+        logger.info("Found %d tables on page %d", len(tables), page_num)
+        
+        # If no tables found, try with different settings
+        if not tables:
+            # Try with explicit table settings
+            tables = self._page_tables_with_strategy(document, page_index, STRATEGY_LINES_STRICT)
+            strategy = STRATEGY_LINES_STRICT
+            logger.info("Retry with strict lines found %d tables", len(tables))
+        
+        if not tables:
+            # Try text-based table detection
+            tables = self._page_tables_with_strategy(document, page_index, STRATEGY_TEXT)
+            strategy = STRATEGY_TEXT
+            if tables:
+                logger.info("Text-based detection found table with %d rows", len(tables[0]))
+        
+        # The learned strategy's tables were already parsed above when the cascade lands on them again
+        if strategy != learned_strategy or page_transactions is None:
+            page_transactions, headers = self._transactions_from_tables(tables)
+        if page_transactions and headers is not None:
+            self._learn_layout(strategy, headers)
+        return page_transactions
+    
+    def _page_tables_with_strategy(self, document, page_index, strategy):
+        """Tables of a page using one strategy of the extraction cascade"""
+        metrics.count('table_strategies_tried')
+        if strategy == STRATEGY_DEFAULT:
+            return document.page_tables(page_index)
+        if strategy == STRATEGY_LINES_STRICT:
+            return document.page_tables(page_index, STRICT_LINE_TABLE_SETTINGS)
+        potential_table = self._detect_text_table(document.page_lines(page_index), page_index + 1)
+        return [potential_table] if potential_table else []
+    
+    def _begin_layout(self, issuer):
+        """Start a statement: seed the table strategy from what was learned for its issuer"""
+        self.layout_issuer = issuer
+        if self.layout_memory:
+            self.layout_fingerprint, self.layout_strategy = self.layout_memory.lookup(issuer)
+        else:
+            self.layout_fingerprint, self.layout_strategy = None, None
+    
+    def _apply_region(self, document, statement_type):
+        """Crop pages to the statement type's transaction region when cropping is enabled
+        
+        The crop is kept only if the first page and the first continuation page
+        (one for each box of the region) parse as many transactions, and map the
+        same table columns, cropped as whole; otherwise the statement is read in full.
+        """
+        self.layout_region = None
+        if not self.crop_regions:
+            return
+        region = transaction_region(statement_type, document.first_page_text())
+        if not region:
+            return
+        document.set_region(region)
+        for page_index in range(min(REGION_SAMPLE_PAGES, document.page_count)):
+            cropped_rows, cropped_columns = self._page_yield(statement_type, document.page_lines(page_index),
+                                                             document.page_tables(page_index))
+            whole_rows, whole_columns = self._page_yield(statement_type, document.whole_page_text(page_index).split('\n'),
+                                                         document.whole_page_tables(page_index))
+            if cropped_rows < whole_rows or not cropped_columns >= whole_columns:
+                logger.info(f"✂️ {statement_type} transaction region loses rows on page {page_index + 1} "
+                            f"({cropped_rows} vs {whole_rows}, columns {sorted(whole_columns - cropped_columns)}), "
+                            f"reading whole pages")
+                metrics.count('region_fallbacks')
+                document.set_region(None)
+                return
+        logger.info(f"✂️ Cropping pages to the {statement_type} transaction region")
+        self.layout_region = region
+    
+    def _page_yield(self, statement_type, lines, tables):
+        """(transactions, mapped table columns) the parser for this statement type gets from one page"""
+        line_parser = {
+            STATEMENT_SBI_CC: self._parse_sbi_credit_card_text,
+            STATEMENT_HDFC_CC: self._parse_hdfc_credit_card_text,
+            STATEMENT_INDUSIND_CC: self._parse_indusind_credit_card_text,
+        }.get(statement_type)
+        if line_parser:
+            return len(line_parser(lines)), set()
+        
+        rows = len(self._parse_icici_credit_card_text(lines)) if statement_type == STATEMENT_ICICI else 0
+        table_transactions, headers = self._transactions_from_tables(tables)
+        columns = set(self._infer_column_mapping(headers)) if headers else set()
+        return rows + len(table_transactions), columns
+    
+    def _learn_layout(self, strategy, headers):
+        """Remember the strategy that produced transactions for this statement's layout"""
+        self.layout_fingerprint = layout_fingerprint(self.layout_issuer, headers)
+        self.layout_strategy = strategy
+        if self.layout_memory and self.layout_issuer:
+            self.layout_memory.record(self.layout_issuer, self.layout_fingerprint, strategy)
+    
+    def _transactions_from_tables(self, tables):
+        """Transactions from a page's tables, with the header row that produced them (or None)"""
+        page_transactions = []
+        # Header row of the first table that produced transactions
+        layout_headers = None
+        
+        # Track header table and transaction tables separately for ICICI CC format
+        icici_cc_header = None
+        icici_cc_column_mapping = None
+        
+        for table_idx, table in enumerate(tables):
+            if not table or len(table) < 1:
+                self.table_log.trace("Skipping table %d: insufficient rows (%d)", table_idx + 1, len(table) if table else 0)
+                continue
+            
+            self.table_log.sample("Table %d structure: %d rows, %d columns", table_idx + 1, len(table), len(table[0]) if table[0] else 0)
+            
+            # Check if this is an ICICI CC header table (1 row, 6 columns)
+            if len(table) == 1 and len(table[0]) == 6:
+                row = table[0]
+                row_text = [str(cell).lower().strip() if cell else '' for cell in row]
+                if 'date' in row_text[0] and 'serno' in row_text[1] and 'transaction details' in row_text[2]:
+                    self.table_log.trace("✅ Found ICICI CC header table %d: %s", table_idx + 1, row)
+                    icici_cc_header = row
+                    icici_cc_column_mapping = self._infer_column_mapping(row)
+                    self.table_log.trace("ICICI CC column mapping: %s", icici_cc_column_mapping)
+                    continue
+            
+            # Check if this is an ICICI CC transaction table (1 row, 6 columns with data)
+            if len(table) == 1 and len(table[0]) == 6:
+                row = table[0]
+                self.row_log.trace("🔍 Checking potential ICICI CC transaction row: %s", row)
                 
-                # ICICI CC Fallback: If we found very few transactions but detected ICICI CC patterns,
-                # also try text-based parsing as a fallback
-                if len(all_transactions) <= 2:  # Very few transactions found
+                # Check if this looks like transaction data (has date and amount)
+                if self._looks_like_icici_cc_transaction(row):
+                    self.row_log.trace("✅ Found ICICI CC transaction table %d: %s", table_idx + 1, row)
                     try:
-                        # Get the full text to check if this might be ICICI CC
-                        with pdfplumber.open(pdf_path, password=password) as pdf:
-                            text = ''
-                            for page in pdf.pages:
-                                page_text = page.extract_text()
-                                if page_text:
-                                    text += page_text + '\n'
-                        
-                        # Check if this looks like ICICI CC but we missed it in table parsing
-                        if 'icici' in text.lower() and any(keyword in text.lower() for keyword in ['credit', 'card', 'statement']):
-                            logger.info(f"🔄 ICICI CC fallback: Only found {len(all_transactions)} transactions, trying text-based parsing")
-                            lines = text.split('\n')
-                            text_transactions = self._parse_icici_credit_card_text(lines)
-                            
-                            if text_transactions and len(text_transactions) > len(all_transactions):
-                                logger.info(f"✅ Text-based fallback found {len(text_transactions)} transactions (vs {len(all_transactions)} from tables)")
-                                return text_transactions
-                            else:
-                                logger.info(f"📝 Text-based fallback found {len(text_transactions) if text_transactions else 0} transactions (keeping table results)")
-                    
+                        transaction = self._parse_icici_cc_table_row(row, icici_cc_header)
+                        if transaction:
+                            page_transactions.append(transaction)
+                            if layout_headers is None:
+                                layout_headers = icici_cc_header
+                            self.row_log.sample("✅ Parsed ICICI CC transaction: %s - %s - %s", transaction['date'], transaction['amount'], transaction['description'])
+                        else:
+                            self.row_log.trace("❌ Failed to parse ICICI CC transaction row")
                     except Exception as e:
-                        logger.error(f"❌ ICICI CC fallback parsing failed: {e}")
-                
-                return all_transactions
+                        logger.error(f"❌ Failed to parse ICICI CC transaction: {e}", exc_info=True)
+                    continue
+                else:
+                    self.row_log.trace("❌ Row doesn't look like ICICI CC transaction: %s", row)
+            
+            # Also check for potential ICICI CC rows without header context
+            elif len(table) == 1 and len(table[0]) == 6:
+                row = table[0]
+                self.row_log.trace("🔍 Checking potential ICICI CC transaction row (no header): %s", row)
                 
+                if self._looks_like_icici_cc_transaction(row):
+                    self.row_log.trace("✅ Found standalone ICICI CC transaction: %s", row)
+                    try:
+                        # Use default header for parsing
+                        default_header = ['Date', 'SerNo.', 'Transaction Details', 'Reward Points', 'Intl Amount', 'Amount']
+                        transaction = self._parse_icici_cc_table_row(row, default_header)
+                        if transaction:
+                            page_transactions.append(transaction)
+                            self.row_log.sample("✅ Parsed standalone ICICI CC transaction: %s - %s - %s", transaction['date'], transaction['amount'], transaction['description'])
+                        else:
+                            self.row_log.trace("❌ Failed to parse standalone ICICI CC transaction row")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to parse standalone ICICI CC transaction: {e}", exc_info=True)
+                    continue
+            
+            # Regular table processing for non-ICICI CC format
+            if len(table) < 2:
+                self.table_log.trace("Skipping table %d: insufficient rows for regular processing", table_idx + 1)
+                continue
+            
+            # Find the actual header row (might not be first row)
+            header_row_idx, headers = self._find_header_row(table)
+            if header_row_idx == -1:
+                self.table_log.trace("No valid headers found in table %d", table_idx + 1)
+                continue
+            
+            self.table_log.sample("Found headers at row %d: %s", header_row_idx, headers)
+            
+            # Map headers to our schema
+            column_mapping = self._infer_column_mapping(headers)
+            self.table_log.trace("Column mapping: %s", column_mapping)
+            
+            if 'date_col' not in column_mapping and not self._has_date_pattern(table):
+                self.table_log.trace("No date column found, skipping table %d", table_idx + 1)
+                continue
+            
+            # Parse transactions from table (starting after header row)
+            data_rows = table[header_row_idx + 1:]
+            self.table_log.sample("Processing %d data rows", len(data_rows))
+            row_amounts = self._parse_amount_columns(data_rows, column_mapping)
+            
+            for row_idx, row in enumerate(data_rows, 1):
+                try:
+                    self.row_log.trace("Processing row %d: %s", row_idx, row)
+                    # Handle multi-line rows (like HDFC format)
+                    transactions = self._parse_multiline_row(row, headers, column_mapping, row_amounts[row_idx - 1])
+                    if transactions:
+                        for txn in transactions:
+                            page_transactions.append(txn)
+                        if layout_headers is None:
+                            layout_headers = headers
+                        self.row_log.sample("✅ Parsed %d transactions from row %d", len(transactions), row_idx)
+                    else:
+                        self.row_log.trace("❌ Row %d returned None - failed validation", row_idx)
+                except Exception as e:
+                    logger.error(f"❌ Failed to parse row {row_idx}: {e}", exc_info=True)
+        
+        return page_transactions, layout_headers
+    
+    def _should_parallelize(self, document):
+        """Decide whether table extraction should fan pages out to worker processes"""
+        if not self.parallel or self.max_workers < 2:
+            return False
+        # Workers read pages on their own, past the deadline checks and without the resumed pages
+        if self.deadline or self.resume_pages:
+            return False
+        return document.page_count >= PARALLEL_MIN_PAGES
+    
+    def _extract_pages_in_parallel(self, document):
+        """Run per-page table extraction across a process pool, returning results in page order"""
+        page_count = document.page_count
+        workers = min(self.max_workers, page_count)
+        
+        # Contiguous page ranges keep each worker's PDF open/parse cost to one pass
+        chunk_size = -(-page_count // workers)
+        chunks = [list(range(start, min(start + chunk_size, page_count)))
+                  for start in range(0, page_count, chunk_size)]
+        
+        logger.info(f"⚡ Parallel table extraction: {page_count} pages across {len(chunks)} workers")
+        
+        try:
+            try:
+                executor = ProcessPoolExecutor(max_workers=len(chunks))
+            except (OSError, NotImplementedError) as e:
+                # AWS Lambda has no /dev/shm, so pool queues cannot be created there;
+                # plain processes with pipes still work
+                logger.warning(f"Process pool unavailable ({e}), using pipe-based workers")
+                chunk_results = _run_page_chunks_with_pipes(document.pdf_source, document.password, chunks,
+                                                            self.layout_issuer, self.layout_region)
+            else:
+                with executor:
+                    chunk_results = list(executor.map(
+                        _extract_page_chunk, [document.pdf_source] * len(chunks),
+                        [document.password] * len(chunks), chunks, [self.layout_issuer] * len(chunks),
+                        [self.layout_region] * len(chunks)
+                    ))
         except Exception as e:
-            logger.error(f"Table extraction failed: {e}", exc_info=True)
-            return []
+            # A worker that failed or was killed (BrokenProcessPool, PageWorkerError) costs time, not transactions
+            logger.warning(f"⚠️ Parallel table extraction failed ({e}), extracting pages serially")
+            metrics.count('parallel_fallbacks')
+            return [self._extract_page_transactions(document, page_index) for page_index in range(page_count)]
+        
+        return [page_transactions for chunk_result in chunk_results for page_transactions in chunk_result]
     
     def _infer_column_mapping(self, headers):
         """Intelligently map column headers to transaction fields"""
@@ -374,43 +781,43 @@ class ICICIStatementParser:
         # Balance patterns
         balance_patterns = ['balance', 'running balance', 'closing balance', 'available balance']
         
-        logger.info(f"Mapping headers: {headers}")
+        self.header_log.trace("Mapping headers: %s", headers)
         
         for idx, header in enumerate(headers):
             header_lower = str(header).lower().strip()
-            logger.info(f"Processing header {idx}: '{header_lower}'")
+            self.header_log.trace("Processing header %d: '%s'", idx, header_lower)
             
             # Date detection
             if any(pattern in header_lower for pattern in date_patterns):
                 if 'date_col' not in mapping:  # Prefer first date column
                     mapping['date_col'] = idx
-                    logger.info(f"Mapped date column to index {idx}")
+                    self.header_log.trace("Mapped date column to index %d", idx)
             
             # Description detection - enhanced patterns
             elif any(pattern in header_lower for pattern in desc_patterns):
                 mapping['desc_col'] = idx
-                logger.info(f"Mapped description column to index {idx}")
+                self.header_log.trace("Mapped description column to index %d", idx)
             
             # Amount detection (handle debit/credit separately)
             elif any(pattern in header_lower for pattern in ['debit', 'withdrawal', 'dr']):
                 mapping['debit_col'] = idx
-                logger.info(f"Mapped debit column to index {idx}")
+                self.header_log.trace("Mapped debit column to index %d", idx)
             elif any(pattern in header_lower for pattern in ['credit', 'deposit', 'cr']):
                 mapping['credit_col'] = idx
-                logger.info(f"Mapped credit column to index {idx}")
+                self.header_log.trace("Mapped credit column to index %d", idx)
             elif 'amount' in header_lower and 'debit_col' not in mapping and 'credit_col' not in mapping:
                 mapping['amount_col'] = idx
-                logger.info(f"Mapped amount column to index {idx}")
+                self.header_log.trace("Mapped amount column to index %d", idx)
             
             # Balance detection
             elif any(pattern in header_lower for pattern in balance_patterns):
                 mapping['balance_col'] = idx
-                logger.info(f"Mapped balance column to index {idx}")
+                self.header_log.trace("Mapped balance column to index %d", idx)
         
-        logger.info(f"Final column mapping: {mapping}")
+        self.header_log.sample("Final column mapping: %s", mapping)
         return mapping
     
-    def _parse_multiline_row(self, row, headers, column_mapping):
+    def _parse_multiline_row(self, row, headers, column_mapping, parsed_amounts=None):
         """Parse a row that may contain multiple transactions in newline-separated format (HDFC style)"""
         try:
             # Check if any cells contain newlines (indicating multiple transactions)
@@ -418,7 +825,7 @@ class ICICIStatementParser:
             
             if not has_multiline:
                 # Single transaction row
-                transaction = self._parse_table_row(row, headers, column_mapping)
+                transaction = self._parse_table_row(row, headers, column_mapping, parsed_amounts)
                 return [transaction] if transaction else []
             
             # For HDFC format, use dates/balances as the primary indicator of transaction count
@@ -432,7 +839,7 @@ class ICICIStatementParser:
             elif balance_col is not None and row[balance_col] and '\n' in str(row[balance_col]):
                 transaction_count = len(str(row[balance_col]).split('\n'))
             
-            logger.info(f"Multi-line row detected with {transaction_count} transactions")
+            self.multiline_log.sample("Multi-line row detected with %d transactions", transaction_count)
             
             # Split all cells into lines
             split_cells = {}
@@ -453,15 +860,13 @@ class ICICIStatementParser:
             
             if debit_col is not None and row[debit_col]:
                 debit_strs = [amt.strip() for amt in str(row[debit_col]).split('\n') if amt.strip()]
-                for amt in debit_strs:
-                    parsed = self._parse_single_amount(amt)
+                for parsed in parse_amount_column(debit_strs):
                     if parsed:
                         debit_amounts.append(-abs(parsed))
             
             if credit_col is not None and row[credit_col]:
                 credit_strs = [amt.strip() for amt in str(row[credit_col]).split('\n') if amt.strip()]
-                for amt in credit_strs:
-                    parsed = self._parse_single_amount(amt)
+                for parsed in parse_amount_column(credit_strs):
                     if parsed:
                         credit_amounts.append(abs(parsed))
             
@@ -470,12 +875,11 @@ class ICICIStatementParser:
             if balance_col is not None and row[balance_col]:
                 balance_strs = [bal.strip() for bal in str(row[balance_col]).split('\n') if bal.strip()]
                 balances = []
-                for bal in balance_strs:
-                    parsed = self._parse_single_amount(bal)
+                for parsed in parse_amount_column(balance_strs):
                     if parsed:
                         balances.append(parsed)
                 
-                logger.info(f"Found {len(balances)} balance values for amount calculation")
+                self.multiline_log.trace("Found %d balance values for amount calculation", len(balances))
                 
                 # Calculate amounts from balance changes
                 if len(balances) >= 2:
@@ -492,7 +896,7 @@ class ICICIStatementParser:
                         balance_change = balances[i+1] - balances[i]
                         all_amounts.append(balance_change)
                     
-                    logger.info(f"Calculated amounts from balance changes: {all_amounts}")
+                    self.multiline_log.trace("Calculated amounts from balance changes: %s", all_amounts)
                     
                     # Ensure we have the right number of transactions
                     if len(all_amounts) > transaction_count:
@@ -515,10 +919,10 @@ class ICICIStatementParser:
             
             # If we still don't have enough amounts, fall back to simple concatenation
             if len(all_amounts) < transaction_count:
-                logger.warning(f"Smart distribution provided {len(all_amounts)} amounts for {transaction_count} transactions, falling back")
+                logger.warning("Smart distribution provided %d amounts for %d transactions, falling back", len(all_amounts), transaction_count)
                 all_amounts = debit_amounts + credit_amounts
             
-            logger.info(f"Using {len(all_amounts)} amounts for {transaction_count} transactions")
+            self.multiline_log.trace("Using %d amounts for %d transactions", len(all_amounts), transaction_count)
             
             # Build transactions with proper description grouping
             transactions = []
@@ -531,12 +935,13 @@ class ICICIStatementParser:
                 if '\n' in desc_text:
                     description_lines = [line.strip() for line in desc_text.split('\n') if line.strip()]
             
-            logger.info(f"All description lines: {description_lines}")
+            self.multiline_log.trace("All description lines: %s", description_lines)
             
             # For HDFC format, group descriptions based on UPI patterns
             grouped_descriptions = self._group_hdfc_descriptions(description_lines, transaction_count)
-            logger.info(f"Grouped descriptions: {grouped_descriptions}")
+            self.multiline_log.trace("Grouped descriptions: %s", grouped_descriptions)
             
+            single_rows = []
             for txn_idx in range(transaction_count):
                 single_row = []
                 for cell_idx, cell in enumerate(row):
@@ -565,19 +970,47 @@ class ICICIStatementParser:
                         if credit_col is not None:
                             single_row[credit_col] = str(amount)
                 
-                transaction = self._parse_table_row(single_row, headers, column_mapping)
+                single_rows.append(single_row)
+            
+            for single_row, single_amounts in zip(single_rows, self._parse_amount_columns(single_rows, column_mapping)):
+                transaction = self._parse_table_row(single_row, headers, column_mapping, single_amounts)
                 if transaction:
                     transactions.append(transaction)
             
             return transactions
             
         except Exception as e:
-            logger.debug(f"Error parsing multiline row: {e}")
+            self.multiline_log.trace("Error parsing multiline row: %s", e)
             return []
     
-    def _parse_table_row(self, row, headers, column_mapping):
-        """Parse a single table row into a transaction"""
+    def _parse_amount_columns(self, rows, column_mapping):
+        """Batch-parse the amount columns of a table into one {mapping key: amount} dict per row
+        
+        Debit/credit/balance cells take the first amount of a multi-line cell like
+        _parse_amount, the amount column is parsed as a single value. Keys are left
+        out for rows too short to have the column, so those rows are rejected as before.
+        """
+        parsed_rows = [{} for _ in rows]
+        for key in ('debit_col', 'credit_col', 'balance_col', 'amount_col'):
+            if key not in column_mapping:
+                continue
+            col = column_mapping[key]
+            present = [row_idx for row_idx, row in enumerate(rows) if col < len(row)]
+            cells = [rows[row_idx][col] for row_idx in present]
+            if key == 'amount_col':
+                values = parse_amount_column([str(cell).strip() for cell in cells])
+            else:
+                values = parse_amount_cells(cells)
+            for row_idx, value in zip(present, values):
+                parsed_rows[row_idx][key] = value
+        return parsed_rows
+    
+    def _parse_table_row(self, row, headers, column_mapping, parsed_amounts=None):
+        """Parse a single table row into a transaction (amounts pre-parsed by _parse_amount_columns)"""
         try:
+            if parsed_amounts is None:
+                parsed_amounts = self._parse_amount_columns([row], column_mapping)[0]
+            
             # Extract date
             date_str = row[column_mapping['date_col']] if 'date_col' in column_mapping else None
             if not date_str:
@@ -602,15 +1035,15 @@ class ICICIStatementParser:
             # Extract amount (handle debit/credit columns)
             amount = 0
             if 'debit_col' in column_mapping and 'credit_col' in column_mapping:
-                debit = self._parse_amount(row[column_mapping['debit_col']])
-                credit = self._parse_amount(row[column_mapping['credit_col']])
+                debit = parsed_amounts['debit_col']
+                credit = parsed_amounts['credit_col']
                 if debit:
                     amount = -abs(debit)  # Debits are negative
                 elif credit:
                     amount = abs(credit)  # Credits are positive
             elif 'amount_col' in column_mapping:
                 amount_str = str(row[column_mapping['amount_col']]).strip()
-                amount = self._parse_single_amount(amount_str)
+                amount = parsed_amounts['amount_col']
                 
                 if amount is not None:
                     # For HDFC credit cards and other formats, check if amount already has sign from suffix
@@ -635,24 +1068,17 @@ class ICICIStatementParser:
             # Extract balance
             balance = None
             if 'balance_col' in column_mapping:
-                balance = self._parse_amount(row[column_mapping['balance_col']])
+                balance = parsed_amounts['balance_col']
             
             # Determine transaction type
             transaction_type = 'income' if amount > 0 else 'expense'
             
-            return {
-                'date': date,
-                'description': description.strip(),
-                'amount': amount,
-                'balance': balance,
-                'type': transaction_type,
-                'mode': None,  # Can be inferred later from description
-                'details': description.strip(),
-                'raw_line': ' | '.join(str(cell) for cell in row if cell)
-            }
+            # Mode can be inferred later from description; details repeat the description
+            return Transaction(TABLE_FIELDS, date, description.strip(), amount, transaction_type,
+                               balance=balance, row=row)
             
         except Exception as e:
-            logger.debug(f"Error parsing row: {e}")
+            self.row_log.trace("Error parsing row: %s", e)
             return None
     
     def _parse_date_flexible(self, date_str):
@@ -678,21 +1104,7 @@ class ICICIStatementParser:
     
     def _parse_single_date(self, date_str):
         """Parse a single date string"""
-        date_formats = [
-            '%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d', '%Y/%m/%d',
-            '%d-%m-%y', '%d/%m/%y', '%d %b %Y', '%d %B %Y',
-            '%d-%b-%Y', '%d-%b-%y', '%d/%b/%Y', '%d/%b/%y',
-            '%d %b %y', '%d %B %y'  # Added credit card formats like "20 Apr 25"
-        ]
-        
-        for fmt in date_formats:
-            try:
-                parsed = datetime.strptime(date_str.strip(), fmt)
-                return parsed.strftime('%d-%m-%Y')  # Standardize format
-            except:
-                continue
-        
-        return None
+        return self.date_parser.parse(date_str)
     
     def _parse_amount(self, amount_str):
         """Parse amount from string, handling commas and decimals"""
@@ -717,42 +1129,7 @@ class ICICIStatementParser:
     
     def _parse_single_amount(self, amount_str):
         """Parse a single amount string"""
-        try:
-            # Remove currency symbols and spaces
-            cleaned = str(amount_str).replace('₹', '').replace('Rs', '').replace('INR', '')
-            cleaned = cleaned.replace(',', '').replace(' ', '').strip()
-            
-            # Handle empty or dash values
-            if not cleaned or cleaned == '-' or cleaned == '0.0' or cleaned == '':
-                return None
-            
-            # Handle credit card format with C/D/CR/DR suffixes (like "174.00 C", "130.00 D", "10,546.66 CR")
-            is_credit = False
-            is_debit = False
-            if cleaned.endswith('CR') or cleaned.endswith('C') or cleaned.endswith('Cr'):
-                is_credit = True
-                cleaned = cleaned.rstrip('CR').rstrip('Cr').rstrip('C').strip()
-            elif cleaned.endswith('DR') or cleaned.endswith('D') or cleaned.endswith('Dr'):
-                is_debit = True
-                cleaned = cleaned.rstrip('DR').rstrip('Dr').rstrip('D').strip()
-            
-            # Try to convert to float
-            amount = float(cleaned)
-            
-            # Apply sign based on credit card notation
-            if is_credit:
-                return abs(amount)  # Credits are positive
-            elif is_debit:
-                return -abs(amount)  # Debits are negative
-            else:
-                # For amounts without suffix, we need context to determine sign
-                # This will be handled by the calling function based on transaction type
-                return amount  # Return as-is for regular amounts
-                
-        except (ValueError, TypeError):
-            pass
-        
-        return None
+        return parse_amount(amount_str)
     
     def _find_header_row(self, table):
         """Find the actual header row in a table (may not be first row)"""
@@ -774,7 +1151,7 @@ class ICICIStatementParser:
             # Check for ICICI credit card specific header pattern (exact match)
             # ICICI CC format: ['Date', 'SerNo.', 'Transaction Details', 'Reward\nPoints', 'Intl.#\namount', 'Amount (in`)']
             if len(row) == 6 and 'date' in row_text[0] and 'serno' in row_text[1] and 'transaction details' in row_text[2]:
-                logger.info(f"✅ Found ICICI Credit Card header at row {idx}: {row_text}")
+                self.header_log.trace("✅ Found ICICI Credit Card header at row %d: %s", idx, row_text)
                 return idx, row_text
             
             # Check for generic headers
@@ -782,7 +1159,7 @@ class ICICIStatementParser:
             
             # Log header analysis for debugging
             if header_score > 0:
-                logger.info(f"Row {idx} header analysis: cells={row_text}, score={header_score}")
+                self.header_log.trace("Row %d header analysis: cells=%s, score=%s", idx, row_text, header_score)
             
             if header_score >= 2:  # At least 2 header-like cells
                 return idx, row_text
@@ -801,7 +1178,7 @@ class ICICIStatementParser:
             
             # Check if this line contains multiple header indicators
             if sum(1 for indicator in header_indicators if indicator in line_lower) >= 3:
-                logger.info(f"Found potential header at line {i}: {line}")
+                self.header_log.trace("Found potential header at line %d: %s", i, line)
                 
                 # Try to parse this as a header
                 # Split by common delimiters
@@ -822,7 +1199,7 @@ class ICICIStatementParser:
                                 table_rows.append(data_cells)
                     
                     if len(table_rows) > 1:  # Header + at least 1 data row
-                        logger.info(f"Text table detection found {len(table_rows)} rows")
+                        logger.info("Text table detection found %d rows", len(table_rows))
                         return table_rows
         
         return None
@@ -842,9 +1219,7 @@ class ICICIStatementParser:
                 return parts
         
         # Strategy 3: Look for amount patterns and work backwards
-        import re
-        amount_pattern = r'\b\d{1,3}(?:,\d{3})*\.?\d{0,2}\b'
-        amounts = list(re.finditer(amount_pattern, line))
+        amounts = patterns.GROUPED_AMOUNT_RE.findall(line)
         
         if len(amounts) >= 2:  # Likely has amount and balance
             # This is a more complex parsing strategy
@@ -857,48 +1232,20 @@ class ICICIStatementParser:
     
     def _looks_like_transaction_row(self, line):
         """Check if a line looks like a transaction row"""
-        # Check for date patterns
-        date_patterns = [
-            r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b',  # DD-MM-YYYY or DD/MM/YYYY
-            r'\b\d{4}[-/]\d{1,2}[-/]\d{1,2}\b',    # YYYY-MM-DD
-            r'\b\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\b' # DD MMM YY/YYYY (credit card format)
-        ]
-        
-        has_date = any(re.search(pattern, line) for pattern in date_patterns)
+        # Check for date patterns (DD-MM-YYYY, YYYY-MM-DD, DD MMM YY in one scan)
+        has_date = patterns.ANY_DATE_RE.search(line) is not None
         
         # Check for amount patterns
-        amount_pattern = r'\b\d{1,3}(?:,\d{3})*\.?\d{0,2}\b'
-        has_amounts = len(re.findall(amount_pattern, line)) >= 1
-        
-        # Check for transaction keywords - updated to include ICICI specific codes
-        transaction_keywords = [
-            # UPI patterns
-            'upi', 'upi-',
-            # ICICI specific codes (lowercase for pattern matching)
-            'bbps', 'bctt', 'bil', 'bpay', 'ccwd', 'dtax', 'eba', 'isec', 'idtx', 
-            'imps', 'inf', 'inft', 'lccbrn', 'lnpy', 'mmt', 'netg', 'neft', 'onl', 
-            'pac', 'pavc', 'payc', 'rchg', 'sgb', 'smo', 'top', 'uccbrn', 'vat', 
-            'mat', 'nfs', 'vps', 'ips', 'rtgs',
-            # Generic banking patterns
-            'ach', 'banking', 'transfer', 'payment', 'corp', 'bank', 'ofi', 'coll', 
-            'salary', 'cms', 'ecs', 'nach', 'mandate', 'reversal', 'refund', 'interest',
-            'charges', 'tax', 'tds', 'gst', 'dividend', 'bonus', 'commission', 'credit', 'debit'
-        ]
-        has_keywords = any(keyword in line.lower() for keyword in transaction_keywords)
-        
-        return has_date and (has_amounts or has_keywords)
+        has_amounts = patterns.GROUPED_AMOUNT_RE.search(line) is not None
+        
+        # Check for transaction keywords (ICICI codes included), only needed without amounts
+        return has_date and (has_amounts or patterns.TRANSACTION_ROW_KEYWORDS.found_in(line.lower()))
     
     def _has_date_pattern(self, table):
         """Check if table has date patterns in any column"""
-        date_patterns = [
-            r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b',
-            r'\b\d{4}[-/]\d{1,2}[-/]\d{1,2}\b',
-            r'\b\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\b'  # DD MMM YY/YYYY (credit card format)
-        ]
-        
         for row in table[1:6]:  # Check first few data rows
             for cell in row:
-                if cell and any(re.search(pattern, str(cell)) for pattern in date_patterns):
+                if cell and patterns.ANY_DATE_RE.search(str(cell)):
                     return True
         return False
     
@@ -909,13 +1256,13 @@ class ICICIStatementParser:
         
         # Check if first column looks like a date (DD/MM/YYYY format)
         date_cell = str(row[0]).strip()
-        if not re.match(r'\d{2}/\d{2}/\d{4}', date_cell):
+        if not patterns.ICICI_CC_ROW_DATE_RE.match(date_cell):
             return False
         
         # Check if last column looks like an amount (with or without CR/DR suffix)
         amount_cell = str(row[5]).strip()
         # More flexible pattern to catch all amount formats
-        if not re.search(r'[\d,]+\.?\d*(\s*(CR|DR))?$', amount_cell) and not re.search(r'^\d+[\d,]*\.?\d*$', amount_cell):
+        if not patterns.ICICI_CC_ROW_AMOUNT_RE.search(amount_cell) and not patterns.ICICI_CC_ROW_PLAIN_AMOUNT_RE.search(amount_cell):
             return False
         
         # Check if transaction details column has meaningful content
@@ -925,10 +1272,10 @@ class ICICIStatementParser:
         
         # Serial number should be mostly numeric (allow some flexibility)
         serial_cell = str(row[1]).strip()
-        if not re.match(r'^\d+', serial_cell):  # Starts with digits
+        if not patterns.ICICI_CC_ROW_SERIAL_RE.match(serial_cell):  # Starts with digits
             return False
         
-        logger.info(f"✅ Row looks like ICICI CC transaction: {row}")
+        self.row_log.trace("✅ Row looks like ICICI CC transaction: %s", row)
         return True
     
     def _parse_icici_cc_table_row(self, row, header):
@@ -946,18 +1293,18 @@ class ICICIStatementParser:
             intl_amount = str(row[4]).strip()
             amount_str = str(row[5]).strip()
             
-            logger.info(f"🔍 Parsing ICICI CC row: date={date_str}, serial={serial_no}, desc={description}, amount={amount_str}")
+            self.row_log.trace("🔍 Parsing ICICI CC row: date=%s, serial=%s, desc=%s, amount=%s", date_str, serial_no, description, amount_str)
             
             # Parse date
             date = self._parse_date_flexible(date_str)
             if not date:
-                logger.info(f"❌ Invalid date: {date_str}")
+                self.row_log.trace("❌ Invalid date: %s", date_str)
                 return None
             
             # Parse amount with enhanced CR/DR handling
             amount = self._parse_single_amount(amount_str)
             if amount is None:
-                logger.info(f"❌ Could not parse amount: {amount_str}")
+                self.row_log.trace("❌ Could not parse amount: %s", amount_str)
                 return None
             
             # Enhanced transaction type determination for ICICI CC
@@ -967,11 +1314,11 @@ class ICICIStatementParser:
             if 'CR' in amount_str.upper():
                 amount = abs(amount)  # Credits are positive
                 transaction_type = 'income'
-                logger.info(f"✅ Credit transaction (CR suffix): {amount}")
+                self.row_log.trace("✅ Credit transaction (CR suffix): %s", amount)
             elif 'DR' in amount_str.upper():
                 amount = -abs(amount)  # Debits are negative
                 transaction_type = 'expense'
-                logger.info(f"✅ Debit transaction (DR suffix): {amount}")
+                self.row_log.trace("✅ Debit transaction (DR suffix): %s", amount)
             else:
                 # No suffix - determine from context
                 if any(keyword in description_upper for keyword in [
@@ -979,53 +1326,47 @@ class ICICIStatementParser:
                 ]):
                     amount = abs(amount)
                     transaction_type = 'income'
-                    logger.info(f"✅ Inferred credit transaction (keywords): {amount}")
+                    self.row_log.trace("✅ Inferred credit transaction (keywords): %s", amount)
                 else:
                     # Default to expense for purchases/charges
                     amount = -abs(amount)
                     transaction_type = 'expense'
-                    logger.info(f"✅ Inferred debit transaction (default): {amount}")
-            
-            transaction = {
-                'date': date,
-                'description': description,
-                'amount': amount,
-                'type': transaction_type,
-                'mode': 'CREDIT_CARD',
-                'details': f"SerNo: {serial_no} | {description}" + (f" | Reward Points: {reward_points}" if reward_points and reward_points != '0' else ''),
-                'raw_line': ' | '.join(str(cell) for cell in row if cell)
-            }
+                    self.row_log.trace("✅ Inferred debit transaction (default): %s", amount)
             
-            logger.info(f"✅ Successfully parsed ICICI CC transaction: {transaction}")
+            transaction = Transaction(
+                CARD_FIELDS, date, description, amount, transaction_type, mode='CREDIT_CARD', serial_no=serial_no,
+                details_suffix=f" | Reward Points: {reward_points}" if reward_points and reward_points != '0' else '',
+                row=row
+            )
+            
+            self.row_log.trace("✅ Successfully parsed ICICI CC transaction: %s", transaction)
             return transaction
             
         except Exception as e:
             logger.error(f"❌ Error parsing ICICI CC table row: {e}", exc_info=True)
             return None
     
-    def _parse_with_schema_inference(self, pdf_path, password=None):
+    @metrics.timed('schema_inference')
+    def _parse_with_schema_inference(self, document):
         """Fallback text-based parsing with intelligent pattern matching"""
-        with pdfplumber.open(pdf_path, password=password) as pdf:
-            text = ''
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + '\n'
+        text = document.full_text
+        text_lower = text.lower()
         
         lines = text.split('\n')
+        is_statement = any(keyword in text_lower for keyword in ['credit card', 'statement'])
         
         # Check if this is an IndusInd credit card statement (check this first as it's more specific)
-        if 'indusind' in text.lower() and any(keyword in text.lower() for keyword in ['credit card', 'statement']):
+        if 'indusind' in text_lower and is_statement:
             logger.info("Detected IndusInd Credit Card statement, using specialized text parsing")
             return self._parse_indusind_credit_card_text(lines)
         
         # Check if this is an HDFC credit card statement
-        if 'hdfc' in text.lower() and any(keyword in text.lower() for keyword in ['credit card', 'statement']):
+        if 'hdfc' in text_lower and is_statement:
             logger.info("Detected HDFC Credit Card statement, using specialized text parsing")
             return self._parse_hdfc_credit_card_text(lines)
         
         # Check if this is an ICICI credit card statement
-        if 'icici' in text.lower() and any(keyword in text.lower() for keyword in ['credit card', 'statement']):
+        if 'icici' in text_lower and is_statement:
             logger.info("Detected ICICI Credit Card statement, using specialized text parsing")
             return self._parse_icici_credit_card_text(lines)
         
@@ -1036,26 +1377,13 @@ class ICICIStatementParser:
         # Find transaction table section
         in_transaction_section = False
         
-        # Enhanced transaction indicators for comprehensive parsing
-        # Updated to include all ICICI bank statement legends and common banking patterns
-        transaction_indicators = [
-            # UPI patterns
-            'UPI/', 'UPI-',
-            # ICICI specific codes from bank statement legends
-            'BBPS', 'BCTT', 'BIL/', 'BPAY', 'CCWD', 'DTAX', 'EBA/', 'ISEC', 'IDTX', 
-            'IMPS/', 'INF/', 'INFT', 'LCCBRN', 'LNPY', 'MMT/', 'NETG', 'NEFT/', 'ONL/', 
-            'PAC/', 'PAVC', 'PAYC', 'RCHG', 'SGB', 'SMO/', 'TOP/', 'UCCBRN', 'VAT/', 
-            'MAT/', 'NFS/', 'VPS/', 'IPS/', 'RTGS/',
-            # Generic banking patterns
-            'ACH/', 'CORP/', 'BANK/', 'OFI/', 'COLL', 'SAL-', 'SALARY', 'CMS/', 
-            'ECS/', 'NACH/', 'MANDATE/', 'REVERSAL', 'REFUND', 'INTEREST',
-            'CHARGES', 'TAX', 'TDS', 'GST', 'DIVIDEND', 'BONUS', 'COMMISSION',
-            # Additional common patterns
-            'FD clos', 'ATM/', 'POS/', 'CREDIT', 'DEBIT'
-        ]
+        # Description lines above each dated row, gathered in the same pass
+        continuations = ContinuationBuffer()
+        transaction_indicators = patterns.SCHEMA_TRANSACTION_INDICATORS
         
-        for i, line in enumerate(lines):
+        for line in lines:
             line = line.strip()
+            continuations.advance(line)
             
             # Start of transaction table - more flexible detection
             if ('DATE' in line and 'PARTICULARS' in line and 'BALANCE' in line) or \
@@ -1068,67 +1396,34 @@ class ICICIStatementParser:
                 continue
             
             # Handle B/F (balance forward) and C/F (carry forward)
-            if any(term in line for term in ['B/F', 'C/F', 'BALANCE B/F', 'BALANCE C/F']):
-                balance_match = re.search(r'([\d,]+\.\d{2})$', line)
+            if patterns.SCHEMA_BALANCE_FORWARD_TERMS.found_in(line):
+                balance_match = patterns.TRAILING_BALANCE_RE.search(line)
                 if balance_match:
                     previous_balance = float(balance_match.group(1).replace(',', ''))
                 continue
             
             # Skip credit card statement summary items
-            credit_card_summary_terms = [
-                'minimum amount due', 'minimum due', 'payment due', 'total amount due',
-                'outstanding balance', 'current balance', 'previous balance',
-                'credit limit', 'available credit', 'cash advance limit',
-                'statement date', 'due date', 'payment due date',
-                'total credits', 'total debits', 'finance charges',
-                'late payment fee', 'overlimit fee', 'annual fee'
-            ]
-            line_lower = line.lower()
-            if any(term in line_lower for term in credit_card_summary_terms):
-                logger.info(f"Skipping credit card summary line: {line}")
+            if patterns.CREDIT_CARD_SUMMARY_TERMS.found_in(line.lower()):
+                self.line_log.trace("Skipping credit card summary line: %s", line)
                 continue
             
-            # Multiple transaction patterns to catch different formats
-            transaction_patterns = [
-                # Standard: DD-MM-YYYY [MODE] [DETAILS] [AMOUNT] BALANCE
-                r'(\d{2}-\d{2}-\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})$',
-                # Alternative: DD/MM/YYYY format
-                r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})$',
-                # Credit card format: DD MMM YY with C/D/CR/DR suffix
-                r'(\d{1,2}\s+[A-Za-z]{3}\s+\d{2})\s+(.+?)\s+([\d,]+\.\d{2}\s*(?:CR|DR|C|D)?)$',
-                # With explicit debit/credit columns
-                r'(\d{2}-\d{2}-\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})$',
-                # Simplified pattern for edge cases
-                r'(\d{2}[-/]\d{2}[-/]\d{4})\s+(.+)\s+([\d,]+\.\d{2})$'
-            ]
-            
-            transaction_match = None
-            pattern_used = None
-            
-            for pattern in transaction_patterns:
-                match = re.match(pattern, line)
-                if match:
-                    transaction_match = match
-                    pattern_used = pattern
-                    break
+            # Multiple transaction patterns to catch different formats, merged into one scan
+            transaction_match = patterns.SCHEMA_TRANSACTION_LINE.match(line)
+            pattern_used = transaction_match.pattern if transaction_match else None
             
             # Also try to find lines that contain transaction indicators even without perfect regex match
             if not transaction_match:
                 # Look for lines with transaction indicators and amounts
-                if any(indicator in line for indicator in transaction_indicators):
+                if transaction_indicators.found_in(line):
                     # Try to extract date, description and amounts more flexibly
                     # Try multiple date patterns for flexible matching
-                    date_patterns_flex = [
-                        r'(\d{2}[-/]\d{2}[-/]\d{4})',           # DD-MM-YYYY
-                        r'(\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4})'   # DD MMM YY
-                    ]
                     date_match = None
-                    for pattern in date_patterns_flex:
-                        date_match = re.search(pattern, line)
+                    for date_re in patterns.SCHEMA_FLEXIBLE_DATE_RES:
+                        date_match = date_re.search(line)
                         if date_match:
                             break
                     # Updated amount pattern to include credit card C/D/CR/DR suffixes
-                    amount_matches = re.findall(r'([\d,]+\.\d{2}\s*(?:CR|DR|C|D)?)', line)
+                    amount_matches = patterns.SCHEMA_SUFFIXED_AMOUNT_RE.findall(line)
                     
                     if date_match and len(amount_matches) >= 2:
                         # Create a synthetic match object
@@ -1147,6 +1442,7 @@ class ICICIStatementParser:
                                 'group': lambda self, n: [None, date, middle_part, amount_matches[-2], amount_matches[-1]][n]
                             })()
                             pattern_used = 'flexible'
+                            metrics.count('regex_fallbacks')
             
             if transaction_match:
                 date = transaction_match.group(1)
@@ -1157,7 +1453,7 @@ class ICICIStatementParser:
                     if pattern_used == 'flexible' or len(transaction_match.group(0).split()) > 4:
                         # For flexible patterns or 5-group patterns
                         groups = transaction_match.group(0).split()
-                        amount_candidates = [g for g in groups if re.match(r'[\d,]+\.\d{2}$', g)]
+                        amount_candidates = [g for g in groups if patterns.DECIMAL_AMOUNT_TOKEN_RE.match(g)]
                         if len(amount_candidates) >= 2:
                             amount_1 = float(amount_candidates[-2].replace(',', ''))
                             balance = float(amount_candidates[-1].replace(',', ''))
@@ -1170,44 +1466,25 @@ class ICICIStatementParser:
                             balance = float(transaction_match.group(4).replace(',', ''))
                         else:
                             # Try to extract amounts from the line directly
-                            amounts = re.findall(r'([\d,]+\.\d{2})', transaction_match.group(0))
+                            amounts = patterns.DECIMAL_AMOUNT_RE.findall(transaction_match.group(0))
                             if len(amounts) >= 2:
                                 amount_1 = float(amounts[-2].replace(',', ''))
                                 balance = float(amounts[-1].replace(',', ''))
                             else:
                                 continue
                 except (IndexError, ValueError, AttributeError) as e:
-                    logger.debug(f"Error parsing amounts from line: {e}")
+                    self.line_log.trace("Error parsing amounts from line: %s", e)
                     continue
                 
                 # Collect ALL lines that belong to this transaction
                 description_lines = []
                 
                 # Start with middle_part if it has transaction info
-                if any(pattern in middle_part for pattern in transaction_indicators):
+                if transaction_indicators.found_in(middle_part):
                     description_lines.append(middle_part)
                 
-                # Look backward to collect all lines until previous transaction or empty line
-                collected_lines = []
-                for j in range(1, 15):  # Increased range to catch more lines
-                    if i - j >= 0:
-                        prev_line = lines[i - j].strip()
-                        if not prev_line or len(prev_line) <= 2:
-                            continue
-                        # Stop if we hit another transaction line with date
-                        if re.match(r'\d{2}[-/]\d{2}[-/]\d{4}', prev_line):
-                            break
-                        # Add any line that looks like transaction info
-                        if any(pattern in prev_line for pattern in transaction_indicators):
-                            collected_lines.append(prev_line)
-                        # Also catch continuation lines with meaningful content
-                        elif len(prev_line) > 10 and not prev_line.replace(' ', '').replace(',', '').replace('.', '').isdigit():
-                            # Check if it's likely a description continuation
-                            if any(char.isalpha() for char in prev_line) and not prev_line.startswith('Page'):
-                                collected_lines.append(prev_line)
-                
-                # Keep chronological order (first line first)
-                description_lines.extend(collected_lines)
+                # Then the lines above this row up to the previous dated line, nearest first
+                description_lines.extend(continuations.collected())
                 
                 # Combine all description lines in their original order
                 if description_lines:
@@ -1255,23 +1532,11 @@ class ICICIStatementParser:
                         transaction_type = 'income'
                 else:
                     # Enhanced fallback detection - updated with ICICI specific patterns
-                    income_keywords = [
-                        'fd clos', 'credit', 'salary', 'sal-', 'interest', 'dividend', 'bonus', 'refund', 'reversal',
-                        # ICICI specific income patterns
-                        'inf/', 'inft', 'rchg', 'sgb'  # Fund transfers, recharges can be income in some contexts
-                    ]
-                    expense_keywords = [
-                        'payment', 'transfer', 'withdrawal', 'charges', 'tax', 'tds', 'gst',
-                        # ICICI specific expense patterns
-                        'bbps', 'bpay', 'ccwd', 'dtax', 'idtx', 'bil/', 'onl/', 'top/', 'pac/', 'pavc', 'payc',
-                        'lccbrn', 'uccbrn', 'vat/', 'mat/', 'nfs/'  # Bill payments, taxes, fees
-                    ]
-                    
                     description_lower = main_description.lower()
-                    if any(keyword in description_lower for keyword in income_keywords):
+                    if patterns.SCHEMA_INCOME_KEYWORDS.found_in(description_lower):
                         amount = amount_1
                         transaction_type = 'income'
-                    elif any(keyword in description_lower for keyword in expense_keywords):
+                    elif patterns.SCHEMA_EXPENSE_KEYWORDS.found_in(description_lower):
                         amount = -amount_1
                         transaction_type = 'expense'
                     else:
@@ -1279,17 +1544,11 @@ class ICICIStatementParser:
                         amount = -amount_1
                         transaction_type = 'expense'
                 
-                transaction = {
-                    'date': date,
-                    'mode': mode,
-                    'description': main_description or details or middle_part,
-                    'details': details or middle_part,
-                    'amount': amount,
-                    'balance': balance,
-                    'type': transaction_type,
-                    'raw_line': line,
-                    'pattern_used': pattern_used or 'standard'
-                }
+                transaction = Transaction(
+                    SCHEMA_FIELDS, date, main_description or details or middle_part, amount, transaction_type,
+                    balance=balance, mode=mode, details=details or middle_part, raw_line=line,
+                    pattern_used=pattern_used or 'standard'
+                )
                 
                 transactions.append(transaction)
                 previous_balance = balance
@@ -1319,90 +1578,7 @@ class ICICIStatementParser:
     
     def _clean_hdfc_cc_description(self, description):
         """Clean HDFC credit card descriptions by removing timestamps and locations"""
-        if not description:
-            return description
-        
-        # HDFC CC patterns to clean:
-        # "09:43:59 AVENUEECOMMERCELIMITED Mumbai" -> "AVENUEECOMMERCELIMITED"
-        # "22:38:58 MyntraDesignsPvtLtd BANGALORE 70" -> "MyntraDesignsPvtLtd"
-        # "23:35:11 MYNTRADESIGNS GURGOAN 31" -> "MYNTRADESIGNS"
-        
-        import re
-        
-        # Pattern 1: Remove timestamp at the beginning (HH:MM:SS)
-        # Remove timestamp pattern like "09:43:59 " or "22:38:58 "
-        description = re.sub(r'^\d{2}:\d{2}:\d{2}\s+', '', description)
-        
-        # Pattern 2: Remove location and numbers at the end
-        # Remove patterns like " Mumbai", " BANGALORE 70", " GURGOAN 31"
-        # This removes city names followed by optional numbers/codes
-        city_patterns = [
-            r'\s+Mumbai\s*\d*\s*$',
-            r'\s+MUMBAI\s*\d*\s*$', 
-            r'\s+Delhi\s*\d*\s*$',
-            r'\s+DELHI\s*\d*\s*$',
-            r'\s+Bangalore\s*\d*\s*$',
-            r'\s+BANGALORE\s*\d*\s*$',
-            r'\s+Bengaluru\s*\d*\s*$',
-            r'\s+BENGALURU\s*\d*\s*$',
-            r'\s+Chennai\s*\d*\s*$',
-            r'\s+CHENNAI\s*\d*\s*$',
-            r'\s+Hyderabad\s*\d*\s*$',
-            r'\s+HYDERABAD\s*\d*\s*$',
-            r'\s+Pune\s*\d*\s*$',
-            r'\s+PUNE\s*\d*\s*$',
-            r'\s+Kolkata\s*\d*\s*$',
-            r'\s+KOLKATA\s*\d*\s*$',
-            r'\s+Ahmedabad\s*\d*\s*$',
-            r'\s+AHMEDABAD\s*\d*\s*$',
-            r'\s+Jaipur\s*\d*\s*$',
-            r'\s+JAIPUR\s*\d*\s*$',
-            r'\s+Lucknow\s*\d*\s*$',
-            r'\s+LUCKNOW\s*\d*\s*$',
-            r'\s+Chandigarh\s*\d*\s*$',
-            r'\s+CHANDIGARH\s*\d*\s*$',
-            r'\s+Gurgaon\s*\d*\s*$',
-            r'\s+GURGAON\s*\d*\s*$',
-            r'\s+Gurgoan\s*\d*\s*$',  # Handle typo in your example
-            r'\s+GURGOAN\s*\d*\s*$',
-            r'\s+Noida\s*\d*\s*$',
-            r'\s+NOIDA\s*\d*\s*$',
-            r'\s+Faridabad\s*\d*\s*$',
-            r'\s+FARIDABAD\s*\d*\s*$',
-            # Generic pattern: Remove any city-like word followed by numbers at the end
-            r'\s+[A-Z]{3,}\s*\d+\s*$',  # Match BANGALORE 70, GURGOAN 31, etc.
-            r'\s+[A-Z][a-z]{2,}\s*\d*\s*$'  # Match Mumbai, Chennai, etc.
-        ]
-        
-        for pattern in city_patterns:
-            description = re.sub(pattern, '', description, flags=re.IGNORECASE)
-        
-        # Pattern 3: Remove standalone numbers at the end
-        # Remove trailing numbers like " 70", " 31", " 123" that might be location codes
-        description = re.sub(r'\s+\d{1,3}\s*$', '', description)
-        
-        # Pattern 4: Clean up common merchant name suffixes
-        # Remove common business suffixes that don't help with categorization
-        business_suffixes = [
-            r'\s+LIMITED\s*$',
-            r'\s+LTD\s*$', 
-            r'\s+PVT\s*$',
-            r'\s+PRIVATE\s*$',
-            r'\s+INDIA\s*$',
-            r'\s+IN\s*$'
-        ]
-        
-        for suffix in business_suffixes:
-            description = re.sub(suffix, '', description, flags=re.IGNORECASE)
-        
-        # Final cleanup: Remove extra spaces and return cleaned description
-        cleaned = re.sub(r'\s+', ' ', description).strip()
-        
-        # Log the cleaning for debugging
-        if cleaned != description.strip():
-            logger.info(f"Cleaned HDFC CC description: '{description.strip()}' -> '{cleaned}'")
-        
-        return cleaned
+        return clean_hdfc_cc_description(description)
     
     def _smart_amount_distribution(self, debit_amounts, credit_amounts, row, column_mapping):
         """Intelligently distribute debit/credit amounts based on transaction patterns"""
@@ -1417,12 +1593,12 @@ class ICICIStatementParser:
             else:
                 description_lines = [desc_text.strip()]
         
-        logger.info(f"Description lines for smart distribution: {description_lines}")
+        self.multiline_log.trace("Description lines for smart distribution: %s", description_lines)
         
         # Strategy 1: If we have equal numbers of descriptions and amounts, use simple order
         total_amounts = len(debit_amounts) + len(credit_amounts)
         if len(description_lines) == total_amounts:
-            logger.info(f"Simple mapping: {len(description_lines)} descriptions = {total_amounts} amounts")
+            self.multiline_log.trace("Simple mapping: %d descriptions = %d amounts", len(description_lines), total_amounts)
             # Simple sequential mapping
             all_amounts = []
             debit_idx = 0
@@ -1449,7 +1625,7 @@ class ICICIStatementParser:
             return all_amounts
         
         # Strategy 2: If descriptions don't match, use pattern recognition
-        logger.info(f"Complex mapping: {len(description_lines)} descriptions, {total_amounts} amounts")
+        self.multiline_log.trace("Complex mapping: %d descriptions, %d amounts", len(description_lines), total_amounts)
         
         # For cases where we have more descriptions than amounts or vice versa
         # Use a heuristic approach based on common banking patterns
@@ -1468,7 +1644,7 @@ class ICICIStatementParser:
             if credit_position == 0:
                 credit_position = len(debit_amounts) // 2
             
-            logger.info(f"Placing credit at position {credit_position}")
+            self.multiline_log.trace("Placing credit at position %s", credit_position)
             
             # Build sequence with credit at determined position
             all_amounts = []
@@ -1484,7 +1660,7 @@ class ICICIStatementParser:
             return all_amounts
         
         # Fallback: simple concatenation
-        logger.info(f"Fallback: simple concatenation")
+        self.multiline_log.trace("Fallback: simple concatenation")
         return debit_amounts + credit_amounts
     
     def _group_hdfc_descriptions(self, description_lines, transaction_count):
@@ -1520,6 +1696,7 @@ class ICICIStatementParser:
         
         return grouped[:transaction_count]
     
+    @metrics.timed('line_parsing')
     def _parse_icici_credit_card_text(self, lines):
         """Parse ICICI credit card statements from text lines"""
         transactions = []
@@ -1532,50 +1709,35 @@ class ICICIStatementParser:
         logger.info(f"🔍 Starting ICICI CC text parsing with {len(lines)} lines")
         
         # First, let's see what lines contain dates
+        # (only the first 10 are kept for the trace log, not one entry per transaction)
+        date_line_count = 0
         date_lines = []
         for i, line in enumerate(lines):
-            line = line.strip()
-            if re.search(r'\d{2}/\d{2}/\d{4}', line):
-                date_lines.append((i, line))
-        
-        logger.info(f"📅 Found {len(date_lines)} lines with dates")
-        for i, (line_no, line) in enumerate(date_lines[:10]):  # Log first 10 date lines
-            logger.info(f"Date line {i+1}: {line}")
+            if patterns.SLASH_DATE_RE.search(line):
+                date_line_count += 1
+                if len(date_lines) < 10:
+                    date_lines.append((i, line.strip()))
+
+        logger.info(f"📅 Found {date_line_count} lines with dates")
+        for i, (line_no, line) in enumerate(date_lines):  # Log first 10 date lines
+            self.line_log.trace("Date line %d: %s", i + 1, line)
         
         for i, line in enumerate(lines):
             line = line.strip()
             
             # Skip obvious non-transaction lines
-            if len(line) < 20 or not re.search(r'\d{2}/\d{2}/\d{4}', line):
+            if len(line) < 20 or not patterns.SLASH_DATE_RE.search(line):
                 continue
             
-            logger.info(f"🔍 Processing ICICI CC line {i}: {line}")
-            
-            # Multiple patterns to catch different ICICI CC transaction formats
-            patterns = [
-                # Pattern 1: Date SerNo Description Amount CR/DR
-                r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d,]+\.?\d*)\s+(CR|DR)\s*$',
-                # Pattern 2: Date SerNo Description RewardPoints IntlAmount Amount CR/DR
-                r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+(\d+)\s+([^\d\s]*)\s+([\d,]+\.?\d*)\s+(CR|DR)\s*$',
-                # Pattern 3: Date SerNo Description Amount (no CR/DR suffix - most common for purchases)
-                r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d,]+\.?\d*)\s*$',
-                # Pattern 4: Date SerNo Description RewardPoints Amount (no CR/DR)
-                r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+(\d+)\s+([\d,]+\.?\d*)\s*$',
-                # Pattern 5: More flexible pattern with optional spaces and suffixes
-                r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d,]+\.?\d*)\s*(CR|DR)?\s*.*$',
-                # Pattern 6: Very flexible - any line starting with date and serial number
-                r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)[\s\d,]*?([\d,]+\.?\d*)\s*(CR|DR)?.*$'
-            ]
-            
-            match = None
-            pattern_used = None
+            self.line_log.trace("🔍 Processing ICICI CC line %d: %s", i, line)
             
-            for idx, pattern in enumerate(patterns):
-                match = re.search(pattern, line)
-                if match:
-                    pattern_used = idx + 1
-                    logger.debug(f"✅ Matched pattern {pattern_used}: {match.groups()}")
-                    break
+            # Multiple patterns to catch different ICICI CC transaction formats, scanned as one alternation
+            match = patterns.ICICI_CC_LINE.search(line)
+            pattern_used = match.number if match else None
+            if match:
+                self.line_log.trace("✅ Matched pattern %s: %s", pattern_used, match.groups())
+                if pattern_used >= 5:  # Flexible patterns: the layout-specific ones did not match
+                    metrics.count('regex_fallbacks')
             
             if match:
                 try:
@@ -1647,30 +1809,25 @@ class ICICIStatementParser:
                     date = self._parse_date_flexible(date_str)
                     
                     if date and amount != 0:  # Skip zero amounts
-                        transaction = {
-                            'date': date,
-                            'description': description,
-                            'amount': amount,
-                            'type': transaction_type,
-                            'mode': 'CREDIT_CARD',
-                            'details': f"SerNo: {serial_no} | {description}",
-                            'raw_line': line
-                        }
+                        transaction = Transaction(CARD_FIELDS, date, None, amount, transaction_type,
+                                                  mode='CREDIT_CARD', serial_no=serial_no, raw_line=line,
+                                                  description_span=match.span(3))
                         
                         transactions.append(transaction)
-                        logger.info(f"✅ Parsed ICICI CC transaction (Pattern {pattern_used}): {date} - {amount} - {description[:30]}...")
+                        self.line_log.sample("✅ Parsed ICICI CC transaction (Pattern %s): %s - %s - %s...", pattern_used, date, amount, description[:30])
                     else:
-                        logger.debug(f"Skipped transaction: invalid date or zero amount")
+                        self.line_log.trace("Skipped transaction: invalid date or zero amount")
                         
                 except (ValueError, IndexError) as e:
-                    logger.debug(f"Could not parse amount from line: {line} - {e}")
+                    self.line_log.trace("Could not parse amount from line: %s - %s", line, e)
                     continue
             else:
-                logger.debug(f"❌ No pattern matched for line: {line[:50]}...")
+                self.line_log.trace("❌ No pattern matched for line: %s...", line[:50])
         
         logger.info(f"ICICI Credit Card text parsing found {len(transactions)} transactions")
         return transactions
     
+    @metrics.timed('line_parsing')
     def _parse_indusind_credit_card_text(self, lines):
         """Parse IndusInd credit card statements from text lines"""
         transactions = []
@@ -1683,8 +1840,7 @@ class ICICIStatementParser:
             
             # Look for lines that match IndusInd credit card transaction pattern
             # Pattern: Date Description Amount DR/CR
-            indusind_cc_pattern = r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+(DR|CR)'
-            match = re.search(indusind_cc_pattern, line)
+            match = patterns.INDUSIND_CC_LINE_RE.search(line)
             
             if match:
                 date_str = match.group(1)
@@ -1708,26 +1864,21 @@ class ICICIStatementParser:
                     date = self._parse_date_flexible(date_str)
                     
                     if date:
-                        transaction = {
-                            'date': date,
-                            'description': description,
-                            'amount': amount,
-                            'type': transaction_type,
-                            'mode': 'CREDIT_CARD',
-                            'details': f"IndusInd CC | {description}",
-                            'raw_line': line
-                        }
+                        transaction = Transaction(CARD_FIELDS, date, None, amount, transaction_type,
+                                                  mode='CREDIT_CARD', details_prefix='IndusInd CC', raw_line=line,
+                                                  description_span=match.span(2))
                         
                         transactions.append(transaction)
-                        logger.info(f"✅ Parsed IndusInd CC transaction: {date} - {amount} - {description}")
+                        self.line_log.sample("✅ Parsed IndusInd CC transaction: %s - %s - %s", date, amount, description)
                     
                 except ValueError as e:
-                    logger.debug(f"Could not parse amount from line: {line} - {e}")
+                    self.line_log.trace("Could not parse amount from line: %s - %s", line, e)
                     continue
         
         logger.info(f"IndusInd Credit Card text parsing found {len(transactions)} transactions")
         return transactions
     
+    @metrics.timed('line_parsing')
     def _parse_hdfc_credit_card_text(self, lines):
         """Parse HDFC credit card statements from text lines"""
         transactions = []
@@ -1739,30 +1890,20 @@ class ICICIStatementParser:
         # 01/06/2025 TELE TRANSFER CREDIT (Ref# ST251530083000010428001) 13,334.00Cr
         
         # Statement summary items to ignore
-        summary_keywords = [
-            'minimum amount due', 'minimum due', 'payment due', 'total amount due',
-            'outstanding balance', 'current balance', 'previous balance',
-            'credit limit', 'available credit', 'cash advance limit',
-            'statement date', 'due date', 'payment due date',
-            'total credits', 'total debits', 'finance charges',
-            'late payment fee', 'overlimit fee', 'annual fee',
-            'In case you wish to update', 'please write a letter',
-            'For queries', 'Contact', 'Customer Care'
-        ]
+        summary_keywords = patterns.HDFC_CC_SUMMARY_TERMS
         
         for i, line in enumerate(lines):
             line = line.strip()
             
             # Skip lines that are clearly statement summary or policy text
             line_lower = line.lower()
-            if any(keyword in line_lower for keyword in summary_keywords):
-                logger.debug(f"Skipping summary/policy line: {line[:50]}...")
+            if summary_keywords.found_in(line_lower):
+                self.line_log.trace("Skipping summary/policy line: %s...", line[:50])
                 continue
             
             # Look for lines that match HDFC credit card transaction pattern
             # Pattern: Date Description Amount[Cr]
-            hdfc_cc_pattern = r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})(Cr)?'
-            match = re.search(hdfc_cc_pattern, line)
+            match = patterns.HDFC_CC_LINE_RE.search(line)
             
             if match:
                 date_str = match.group(1)
@@ -1773,12 +1914,12 @@ class ICICIStatementParser:
                 # Additional validation: ensure description looks like a real transaction
                 # Skip if description is too short or looks like summary text
                 if len(description) < 5:
-                    logger.debug(f"Skipping short description: {line}")
+                    self.line_log.trace("Skipping short description: %s", line)
                     continue
                 
                 # Skip if description contains summary keywords
-                if any(keyword in description.lower() for keyword in summary_keywords):
-                    logger.debug(f"Skipping summary description: {description}")
+                if summary_keywords.found_in(description.lower()):
+                    self.line_log.trace("Skipping summary description: %s", description)
                     continue
                 
                 # Parse the amount
@@ -1797,26 +1938,21 @@ class ICICIStatementParser:
                     date = self._parse_date_flexible(date_str)
                     
                     if date:
-                        transaction = {
-                            'date': date,
-                            'description': description,
-                            'amount': amount,
-                            'type': transaction_type,
-                            'mode': 'CREDIT_CARD',
-                            'details': f"HDFC CC | {description}",
-                            'raw_line': line
-                        }
+                        transaction = Transaction(CARD_FIELDS, date, None, amount, transaction_type,
+                                                  mode='CREDIT_CARD', details_prefix='HDFC CC', raw_line=line,
+                                                  description_span=match.span(2))
                         
                         transactions.append(transaction)
-                        logger.info(f"✅ Parsed HDFC CC transaction: {date} - {amount} - {description[:30]}...")
+                        self.line_log.sample("✅ Parsed HDFC CC transaction: %s - %s - %s...", date, amount, description[:30])
                     
                 except ValueError as e:
-                    logger.debug(f"Could not parse amount from line: {line} - {e}")
+                    self.line_log.trace("Could not parse amount from line: %s - %s", line, e)
                     continue
         
         logger.info(f"HDFC Credit Card text parsing found {len(transactions)} transactions")
         return transactions
     
+    @metrics.timed('line_parsing')
     def _parse_sbi_credit_card_text(self, lines):
         """Parse SBI credit card statements from text lines"""
         transactions = []
@@ -1827,35 +1963,22 @@ class ICICIStatementParser:
         # 22 Apr 25  PAYMENT RECEIVED  130.00 C
         
         # Statement summary items to ignore (be more specific to avoid filtering actual transactions)
-        summary_keywords = [
-            'minimum amount due', 'minimum due', 'payment due', 'total amount due',
-            'outstanding balance', 'current balance', 'previous balance',
-            'credit limit', 'available credit', 'cash advance limit',
-            'statement date', 'due date', 'payment due date',
-            'total credits', 'total debits', 'finance charges',
-            'late payment fee', 'overlimit fee', 'annual fee',
-            'reward points summary', 'cashback summary', 'offer details',
-            'important information', 'terms and conditions', 't&c apply',
-            'cashback will be posted', 'balance enquiry', 'finance charges'
-        ]
+        summary_keywords = patterns.SBI_CC_SUMMARY_TERMS
         
         for i, line in enumerate(lines):
             line = line.strip()
             
             # Skip lines that are clearly statement summary or policy text
             line_lower = line.lower()
-            if any(keyword in line_lower for keyword in summary_keywords):
-                logger.debug(f"Skipping summary/policy line: {line[:50]}...")
+            if summary_keywords.found_in(line_lower):
+                self.line_log.trace("Skipping summary/policy line: %s...", line[:50])
                 continue
             
             # Look for lines that match SBI credit card transaction pattern
             # Pattern: DD MMM YY Description Amount [C/D]
             # First extract date, then find amount + C/D at the end, everything in between is description
-            date_pattern = r'^(\d{1,2}\s+[A-Za-z]{3}\s+\d{2})\s+'
-            amount_pattern = r'\s+([0-9,]+\.?\d{0,2})\s*([CD])\s*$'
-            
-            date_match = re.match(date_pattern, line)
-            amount_match = re.search(amount_pattern, line)
+            date_match = patterns.SBI_CC_DATE_RE.match(line)
+            amount_match = patterns.SBI_CC_AMOUNT_RE.search(line) if date_match else None
             
             if date_match and amount_match:
                 date_str = date_match.group(1).strip()
@@ -1870,12 +1993,12 @@ class ICICIStatementParser:
                 # Additional validation: ensure description looks like a real transaction
                 # Skip if description is too short or looks like summary text
                 if len(description) < 3:
-                    logger.debug(f"Skipping short description: {line}")
+                    self.line_log.trace("Skipping short description: %s", line)
                     continue
                 
                 # Skip if description contains summary keywords
-                if any(keyword in description.lower() for keyword in summary_keywords):
-                    logger.debug(f"Skipping summary description: {description}")
+                if summary_keywords.found_in(description.lower()):
+                    self.line_log.trace("Skipping summary description: %s", description)
                     continue
                 
                 # Parse the amount
@@ -1902,28 +2025,22 @@ class ICICIStatementParser:
                     date = self._parse_date_flexible(date_str)
                     
                     if date:
-                        transaction = {
-                            'date': date,
-                            'description': description,
-                            'amount': amount,
-                            'type': transaction_type,
-                            'mode': 'CREDIT_CARD',
-                            'details': f"SBI CC | {description}",
-                            'raw_line': line
-                        }
+                        transaction = Transaction(CARD_FIELDS, date, None, amount, transaction_type,
+                                                  mode='CREDIT_CARD', details_prefix='SBI CC', raw_line=line,
+                                                  description_span=(date_end, amount_start))
                         
                         transactions.append(transaction)
-                        logger.info(f"✅ Parsed SBI CC transaction: {date} - {amount} - {description[:30]}...")
+                        self.line_log.sample("✅ Parsed SBI CC transaction: %s - %s - %s...", date, amount, description[:30])
                     
                 except ValueError as e:
-                    logger.debug(f"Could not parse amount from line: {line} - {e}")
+                    self.line_log.trace("Could not parse amount from line: %s - %s", line, e)
                     continue
         
         logger.info(f"SBI Credit Card text parsing found {len(transactions)} transactions")
         return transactions
     
     def _cleanup_temp_files(self):
-        """Clean up temporary files"""
+        """Clean up temporary files (only created when use_temp_files is set)"""
         for temp_file in self.temp_files:
             try:
                 os.unlink(temp_file)
@@ -1931,6 +2048,353 @@ class ICICIStatementParser:
                 logger.warning(f"Could not delete temp file {temp_file}: {e}")
         self.temp_files = []
 
+def _statement_digest(pdf_bytes=None, s3_bucket=None, s3_key=None):
+    """Content identity of a statement: SHA-256 of uploaded bytes or the S3 ETag"""
+    if pdf_bytes is not None:
+        return content_digest(pdf_bytes)
+    return etag_digest(s3_bucket, s3_key, boto3.client('s3'))
+
+
+@metrics.timed('parse')
+def _parse_statement(parser, pdf_bytes=None, s3_bucket=None, s3_key=None, password=None):
+    """Parse one statement from bytes or S3, reusing the result for a statement that was already parsed
+    
+    Returns (transactions, cache_hit).
+    """
+    result_key = None
+    if parse_cache:
+        digest = _statement_digest(pdf_bytes, s3_bucket, s3_key)
+        if digest:
+            result_key = cache_key(digest, PARSER_VERSION, password)
+            transactions = parse_cache.get(result_key)
+            if transactions is not None:
+                logger.info(f"⚡ Parse cache hit: {len(transactions)} transactions")
+                metrics.count('parse_cache_hits')
+                metrics.count('transactions', len(transactions))
+                return transactions, True
+    
+    if pdf_bytes is None:
+        transactions = parser.parse_pdf_from_s3(s3_bucket, s3_key, password)
+    else:
+        transactions = parser.parse_pdf_bytes(pdf_bytes, password)
+    metrics.count('transactions', len(transactions))
+    if result_key:
+        parse_cache.put(result_key, transactions)
+    return transactions, False
+
+
+def _transaction_summary(transactions):
+    return {
+        "total_transactions": len(transactions),
+        "total_debits": len([t for t in transactions if t['amount'] < 0]),
+        "total_credits": len([t for t in transactions if t['amount'] > 0]),
+        "total_debit_amount": sum([t['amount'] for t in transactions if t['amount'] < 0]),
+        "total_credit_amount": sum([t['amount'] for t in transactions if t['amount'] > 0])
+    }
+
+
+def _resolve_user_id(event, body):
+    """userId from the JWT token claims, or from the body for direct invocation"""
+    if 'requestContext' in event and 'authorizer' in event['requestContext']:
+        user_id = event['requestContext']['authorizer']['claims']['sub']
+        logger.info(f"✅ Successfully extracted userId from JWT token: {user_id}")
+    else:
+        user_id = body.get('userId', 'unknown')  # Fallback for direct invocation
+        logger.warning(f"⚠️ No JWT token found, using userId from body: {user_id}")
+    return user_id
+
+
+def _merge_categories(transactions, categorized_results):
+    """Copy ML categories onto transactions (results are in transaction order)"""
+    for i, txn in enumerate(transactions):
+        if i < len(categorized_results):
+            cat_result = categorized_results[i]
+            txn['category'] = cat_result.get('category', 'Other')
+            txn['category_confidence'] = cat_result.get('confidence', 0.0)
+            txn['ml_prediction'] = {
+                'method': cat_result.get('method', 'unknown'),
+                'processing_time_ms': cat_result.get('processing_time_ms', 0)
+            }
+
+
+def _invoke_categorizer(lambda_client, transactions, user_id, wallet_id):
+    """One synchronous ML Lambda call for a chunk of transactions
+    
+    Returns (ml_result, results, error); results is None when the chunk has to
+    fall back to keyword categories.
+    """
+    ml_payload = {
+        'transactions': transactions,
+        'userId': user_id,
+        'walletId': wallet_id,
+        'response_format': 'compact'  # Results are read back below, whatever RESPONSE_FORMAT the ML Lambda has
+    }
+    
+    try:
+        ml_function_name = os.environ.get('ML_CATEGORIZER_FUNCTION', 'CategorizeTransactionsFunction')
+        metrics.count('ml_invokes')
+        with metrics.span('ml_invoke'):
+            ml_response = lambda_client.invoke(
+                FunctionName=ml_function_name,
+                InvocationType='RequestResponse',  # Synchronous call
+                Payload=json.dumps(ml_payload)
+            )
+        
+        ml_result = json.loads(ml_response['Payload'].read())
+        logger.info("ML Lambda response: %s", payload_for_log(ml_result))
+        
+        if ml_response['StatusCode'] != 200:
+            return ml_result, None, ml_result
+        
+        # API Gateway style responses carry the results in 'body'
+        if 'body' in ml_result:
+            ml_body = json.loads(ml_result['body']) if isinstance(ml_result['body'], str) else ml_result['body']
+            missing_message = "No results found in ML response body"
+        else:
+            ml_body = ml_result
+            missing_message = "No results found in ML response"
+        
+        if 'results' not in ml_body:
+            logger.warning(missing_message)
+            return ml_result, None, None
+        return ml_result, ml_body['results'], None
+        
+    except Exception as ml_error:
+        logger.error(f"Error invoking ML Lambda: {ml_error}")
+        return None, None, str(ml_error)
+
+
+def _categorize_locally(transactions, user_id, wallet_id):
+    """(ml_result, results, error) from the in-process categorizer, or None to invoke the Lambda
+    
+    The results are stored as 'ml_original' feedback records, as the categorizer Lambda does.
+    """
+    start_time = time.time()
+    try:
+        with metrics.span('ml_local'):
+            ml_result = local_categorizer().batch_categorize(transactions)
+    except Exception as e:
+        logger.warning(f"In-process categorization failed, invoking the categorizer Lambda: {e}")
+        return None
+    logger.info(f"🧠 Categorized {len(transactions)} transactions in-process in {(time.time() - start_time) * 1000:.0f}ms")
+    store_ml_feedback(transactions, ml_result.get('results'), user_id, wallet_id)
+    return ml_result, ml_result.get('results'), None
+
+
+@metrics.timed('categorize')
+def _categorize_transactions(parser, transactions, user_id, wallet_id):
+    """Categorize transactions in-process or with concurrent ML Lambda calls per chunk, merging categories in place
+    
+    A chunk whose call fails (or returns no results) gets keyword categories
+    instead. Returns the response fields describing the outcome
+    (ml_categorization, message, categorization_error).
+    """
+    outcome = {}
+    
+    # Prepare transactions for ML processing (direct transaction passing, no S3 write)
+    ml_transactions = []
+    for txn in transactions:
+        # Extract meaningful description for ML categorization
+        ml_description = parser._extract_meaningful_description(txn)
+        
+        ml_transactions.append({
+            'description': ml_description,
+            'amount': txn['amount'],
+            'date': txn['date'],
+            'type': txn['type']
+        })
+    
+    # Small statements skip the Lambda hop when the ONNX model is packaged with the parser
+    local_outcome = _categorize_locally(ml_transactions, user_id, wallet_id) if should_categorize_locally(len(ml_transactions)) else None
+    if local_outcome:
+        chunks = [(0, ml_transactions)]
+        chunk_outcomes = [local_outcome]
+    else:
+        # Chunks keep each payload far below the 6 MB invoke limit and spread a large
+        # statement over several categorizer instances
+        chunks = [(start, ml_transactions[start:start + ML_CHUNK_SIZE])
+                  for start in range(0, len(ml_transactions), ML_CHUNK_SIZE)]
+        lambda_client = boto3.client('lambda')
+        workers = max(1, min(len(chunks), ML_MAX_CONCURRENCY))
+        if len(chunks) > 1:
+            logger.info(f"🧩 Categorizing {len(ml_transactions)} transactions in {len(chunks)} chunks ({workers} at a time)")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunk_outcomes = list(executor.map(
+                lambda chunk: _invoke_categorizer(lambda_client, chunk[1], user_id, wallet_id), chunks))
+    
+    # Each chunk numbers its results from 0; transaction_index is rebased onto the whole statement
+    categorized_results = [None] * len(ml_transactions)
+    errors = []
+    fallback_chunks = 0
+    for (start, chunk), (ml_result, results, error) in zip(chunks, chunk_outcomes):
+        if error is not None:
+            errors.append(error)
+        if results is None:
+            fallback_chunks += 1
+            continue
+        for position, cat_result in enumerate(results):
+            index = cat_result.get('transaction_index', position)
+            if isinstance(index, int) and 0 <= index < len(chunk):
+                cat_result['transaction_index'] = start + index
+                categorized_results[start + index] = cat_result
+    
+    fallback_count = 0
+    for index, cat_result in enumerate(categorized_results):
+        if cat_result is None:
+            ml_txn = ml_transactions[index]
+            categorized_results[index] = dict(fallback_categorization(ml_txn['description'], ml_txn['amount']),
+                                              transaction_index=index)
+            fallback_count += 1
+    _merge_categories(transactions, categorized_results)
+    
+    if len(chunks) == 1 and chunk_outcomes[0][0] is not None and not errors:
+        outcome['ml_categorization'] = chunk_outcomes[0][0]
+    elif len(chunks) > 1:
+        outcome['ml_categorization'] = {
+            'statusCode': 200,
+            'body': json.dumps({
+                'results': categorized_results,
+                'summary': {
+                    'total_transactions': len(ml_transactions),
+                    'chunks': len(chunks),
+                    'fallback_chunks': fallback_chunks,
+                    'fallback_transactions': fallback_count
+                }
+            }, separators=(',', ':'))
+        }
+    
+    if errors:
+        outcome['categorization_error'] = errors[0] if len(chunks) == 1 else errors
+    if fallback_count:
+        metrics.count('fallback_categorized', fallback_count)
+        logger.warning(f"⚠️ {fallback_count} transactions in {fallback_chunks} of {len(chunks)} chunks used fallback categories")
+        outcome['message'] = (f"Transactions parsed; ML categorization failed for {fallback_chunks} of "
+                              f"{len(chunks)} chunks, so keyword categories were used for them")
+    else:
+        outcome['message'] = "Transactions parsed and categorized successfully"
+        logger.info(f"Successfully merged {len(categorized_results)} categorized transactions")
+    
+    return outcome
+
+
+def _without_ml_results(ml_result):
+    """ML Lambda response minus the per-transaction results already merged into the transactions"""
+    if isinstance(ml_result.get('body'), str):
+        try:
+            ml_body = json.loads(ml_result['body'])
+        except ValueError:
+            return ml_result
+        if isinstance(ml_body, dict) and 'results' in ml_body:
+            ml_body.pop('results')
+            return dict(ml_result, body=json.dumps(ml_body, separators=(',', ':')))
+        return ml_result
+    return {key: value for key, value in ml_result.items() if key != 'results'}
+
+
+def _parse_response(result, headers, options, include_timings=False):
+    """Encode a single-statement or batch parse result in the requested response format"""
+    if include_timings:
+        # Batch results already carry their wall-clock parse/ML/total split
+        result['timings'] = dict(result.get('timings', {}), **metrics.timings())
+    if not options.pretty and isinstance(result.get('ml_categorization'), dict):
+        result['ml_categorization'] = _without_ml_results(result['ml_categorization'])
+    
+    if 'files' in result:
+        # Batch: NDJSON records are every file's transactions tagged with their s3_key
+        files = [{key: value for key, value in file_result.items() if key != 'transactions'}
+                 for file_result in result['files']]
+        if options.response_format == FORMAT_NDJSON:
+            transactions = [dict(project(dict(txn), options.fields), s3_key=file_result['s3_key'])
+                            for file_result in result['files'] for txn in file_result.get('transactions', [])]
+            result = dict(result, files=files, transactions=transactions)
+        elif options.fields:
+            for file_summary, file_result in zip(files, result['files']):
+                if 'transactions' in file_result:
+                    file_summary['transactions'] = [project(txn, options.fields)
+                                                    for txn in file_result['transactions']]
+            result = dict(result, files=files)
+        # Already projected above
+        options = ResponseOptions(options.response_format, None, options.gzip_body)
+    
+    return encode_response(200, result, headers, options, records_key='transactions', default=encode_transaction)
+
+
+def _parse_batch_file(file_spec, default_bucket):
+    """Parse one statement of a batch request; failures are reported for that file only"""
+    if isinstance(file_spec, str):
+        file_spec = {'s3_key': file_spec}
+    s3_bucket = file_spec.get('s3_bucket') or default_bucket
+    s3_key = file_spec.get('s3_key')
+    file_result = {'s3_key': s3_key}
+    start_time = time.time()
+    
+    try:
+        if not (s3_bucket and s3_key):
+            raise ValueError("Each file needs an s3_key (and an s3_bucket unless the request sets one)")
+        transactions, cache_hit = _parse_statement(ICICIStatementParser(), s3_bucket=s3_bucket, s3_key=s3_key,
+                                                   password=file_spec.get('password'))
+        file_result.update({
+            'status': 'ok',
+            'transactions': transactions,
+            'summary': _transaction_summary(transactions),
+            'cached': cache_hit
+        })
+    except Exception as e:
+        logger.error(f"Error parsing s3://{s3_bucket}/{s3_key}: {e}")
+        file_result.update({'status': 'error', 'error': str(e)})
+    
+    file_result['timings'] = {'parse_ms': round((time.time() - start_time) * 1000, 1)}
+    return file_result
+
+
+def _parse_batch(event, body, files):
+    """Parse several S3 statements concurrently and categorize all of their transactions in one ML call"""
+    start_time = time.time()
+    
+    # Threads: each file starts with an S3 download, and Lambda cannot host a process pool
+    # (PDF_PARSER_PARALLEL still fans each file's pages out to worker processes)
+    workers = min(len(files), BATCH_WORKERS)
+    logger.info(f"📚 Parsing a batch of {len(files)} statements with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        file_results = list(executor.map(_parse_batch_file, files, [body.get('s3_bucket')] * len(files)))
+    parse_ms = (time.time() - start_time) * 1000
+    
+    all_transactions = [txn for file_result in file_results if file_result['status'] == 'ok'
+                        for txn in file_result['transactions']]
+    logger.info(f"Parsed {len(all_transactions)} transactions from {len(files)} PDFs")
+    
+    summary = _transaction_summary(all_transactions)
+    summary['total_files'] = len(files)
+    summary['failed_files'] = len([r for r in file_results if r['status'] != 'ok'])
+    result = {
+        "files": file_results,
+        "summary": summary
+    }
+    
+    ml_ms = 0.0
+    if body.get('categorize', True) and all_transactions:
+        ml_start_time = time.time()
+        try:
+            user_id = _resolve_user_id(event, body)
+            wallet_id = body.get('walletId', 'unknown')
+            logger.info(f"📊 Processing batch for userId: {user_id}, walletId: {wallet_id}")
+            # Categories are merged into the same transaction dicts each file result holds
+            result.update(_categorize_transactions(ICICIStatementParser(), all_transactions, user_id, wallet_id))
+        except Exception as e:
+            logger.error(f"Error processing categorization: {e}")
+            result['categorization_error'] = str(e)
+        ml_ms = (time.time() - ml_start_time) * 1000
+    
+    result['timings'] = {
+        'parse_ms': round(parse_ms, 1),
+        'ml_ms': round(ml_ms, 1),
+        'total_ms': round((time.time() - start_time) * 1000, 1)
+    }
+    return result
+
+
+@instrumented('pdf-parser')
+@profiled('pdf-parser')
 def lambda_handler(event, context):
     """Main Lambda handler for PDF parsing and ML categorization"""
     
@@ -1952,7 +2416,7 @@ def lambda_handler(event, context):
     
     try:
         logger.info("PDF Parser Lambda invoked")
-        logger.info(f"Event: {json.dumps(event, indent=2)}")
+        logger.info("Event: %s", payload_for_log(event))
         
         # Parse input
         if 'body' in event:
@@ -1965,8 +2429,29 @@ def lambda_handler(event, context):
         pdf_content = body.get('pdf_content')
         s3_bucket = body.get('s3_bucket')
         s3_key = body.get('s3_key')
+        files = body.get('files')
+        continuation_token = body.get('continuation_token')  # Resume a parse that ran out of time
         categorize = body.get('categorize', True)  # Default to True
         password = body.get('password')  # Optional PDF password
+        options = response_options(event, body)  # Compact/NDJSON/gzip body and field projection
+        
+        # Batch request: several S3 statements (e.g. a year of history) in one call
+        if files is not None:
+            if not isinstance(files, list) or not files or len(files) > MAX_BATCH_FILES:
+                return {
+                    "statusCode": 400,
+                    "headers": cors_headers,
+                    "body": json.dumps({
+                        "error": f"files must be a list of 1 to {MAX_BATCH_FILES} statements",
+                        "expected_format": {
+                            "s3_bucket": "bucket-name",
+                            "files": [{"s3_key": "path/to/file.pdf", "password": "optional"}],
+                            "categorize": True
+                        }
+                    })
+                }
+            return _parse_response(_parse_batch(event, body, files), cors_headers, options,
+                                   timings_requested(event, body))
         
         if not pdf_content and not (s3_bucket and s3_key):
             return {
@@ -1977,157 +2462,88 @@ def lambda_handler(event, context):
                     "expected_format": {
                         "option1": {"pdf_content": "base64_encoded_pdf_content"},
                         "option2": {"s3_bucket": "bucket-name", "s3_key": "path/to/file.pdf"},
+                        "option3": {"s3_bucket": "bucket-name", "files": [{"s3_key": "path/to/file.pdf", "password": "optional"}]},
                         "categorize": True
                     }
                 })
             }
         
-        # Parse PDF
+        # Parse PDF (or reuse the result for a statement that was already parsed)
         parser = ICICIStatementParser()
-        if s3_bucket and s3_key:
-            transactions = parser.parse_pdf_from_s3(s3_bucket, s3_key, password)
-        else:
-            transactions = parser.parse_pdf_from_base64(pdf_content, password)
+        pdf_bytes = None if s3_bucket and s3_key else base64.b64decode(pdf_content)
+        owner = event.get('requestContext', {}).get('authorizer', {}).get('claims', {}).get('sub')
+        
+        if continuation_token:
+            checkpoint = checkpoint_store.load(continuation_token)
+            if (not checkpoint or checkpoint.get('parser_version') != PARSER_VERSION or
+                    checkpoint.get('owner') != owner or
+                    checkpoint.get('digest') != _statement_digest(pdf_bytes, s3_bucket, s3_key)):
+                return {
+                    "statusCode": 410,
+                    "headers": cors_headers,
+                    "body": json.dumps({
+                        "error": "Unknown or expired continuation_token for this statement; parse it again without one"
+                    })
+                }
+            parser.resume_pages = checkpoint['pages']
+            logger.info(f"⏯️ Resuming parse from page {checkpoint['next_page'] + 1}")
+        # Requests through API Gateway get its 29-second limit, not the Lambda timeout
+        parser.deadline = Deadline.from_context(context, API_GATEWAY_TIMEOUT_MS if 'httpMethod' in event else None)
+        checkpointed = False
+        
+        try:
+            transactions, _ = _parse_statement(parser, pdf_bytes=pdf_bytes, s3_bucket=s3_bucket, s3_key=s3_key,
+                                               password=password)
+        except DeadlineReached as e:
+            # Save the extracted pages so the next invocation continues instead of starting over
+            continuation_token = checkpoint_store.save({
+                'parser_version': PARSER_VERSION,
+                'digest': _statement_digest(pdf_bytes, s3_bucket, s3_key),
+                'owner': owner,
+                'next_page': e.page_index,
+                'pages': e.pages,
+                'created_at': int(time.time())
+            }, continuation_token)
+            checkpointed = True
+            return {
+                "statusCode": 202,
+                "headers": cors_headers,
+                "body": json.dumps({
+                    "status": "in_progress",
+                    "continuation_token": continuation_token,
+                    "next_page": e.page_index + 1,
+                    "message": "Statement not fully parsed before the time limit; "
+                               "send the same request with continuation_token to continue"
+                })
+            }
+        finally:
+            # Anything but a new checkpoint under the same token ends the resumed parse
+            if continuation_token and not checkpointed:
+                checkpoint_store.delete(continuation_token)
         
         logger.info(f"Parsed {len(transactions)} transactions from PDF")
         
         result = {
             "transactions": transactions,
-            "summary": {
-                "total_transactions": len(transactions),
-                "total_debits": len([t for t in transactions if t['amount'] < 0]),
-                "total_credits": len([t for t in transactions if t['amount'] > 0]),
-                "total_debit_amount": sum([t['amount'] for t in transactions if t['amount'] < 0]),
-                "total_credit_amount": sum([t['amount'] for t in transactions if t['amount'] > 0])
-            }
+            "summary": _transaction_summary(transactions)
         }
         
         # Send transactions to ML Lambda for categorization if requested
         if categorize and transactions:
             try:
-                # Prepare data for ML Lambda processing (direct transaction passing)
-                
-                # Create a unique timestamp for tracking
-                timestamp = int(time.time() * 1000)
-                
                 # Get userId from JWT token claims (secure and reliable)
-                if 'requestContext' in event and 'authorizer' in event['requestContext']:
-                    user_id = event['requestContext']['authorizer']['claims']['sub']
-                    logger.info(f"✅ Successfully extracted userId from JWT token: {user_id}")
-                else:
-                    user_id = body.get('userId', 'unknown')  # Fallback for direct invocation
-                    logger.warning(f"⚠️ No JWT token found, using userId from body: {user_id}")
-                
+                user_id = _resolve_user_id(event, body)
                 wallet_id = body.get('walletId', 'unknown')
                 logger.info(f"📊 Processing PDF for userId: {user_id}, walletId: {wallet_id}") 
                 
-                # Prepare transactions for ML processing
-                ml_input = {
-                    'userId': user_id,
-                    'walletId': wallet_id,
-                    'timestamp': timestamp,
-                    'source_file': s3_key if s3_key else 'uploaded_pdf',
-                    'transactions': []
-                }
-                
-                for txn in transactions:
-                    # Extract meaningful description for ML categorization
-                    ml_description = parser._extract_meaningful_description(txn)
-                    
-                    ml_input['transactions'].append({
-                        'description': ml_description,
-                        'amount': txn['amount'],
-                        'date': txn['date'],
-                        'type': txn['type']
-                    })
-                
-                # Invoke ML Lambda for categorization (no S3 write needed - direct transaction passing)
-                lambda_client = boto3.client('lambda')
-                ml_payload = {
-                    'transactions': ml_input['transactions'],
-                    'userId': user_id,
-                    'walletId': wallet_id
-                }
-                
-                try:
-                    ml_function_name = os.environ.get('ML_CATEGORIZER_FUNCTION', 'CategorizeTransactionsFunction')
-                    ml_response = lambda_client.invoke(
-                        FunctionName=ml_function_name,
-                        InvocationType='RequestResponse',  # Synchronous call
-                        Payload=json.dumps(ml_payload)
-                    )
-                    
-                    ml_result = json.loads(ml_response['Payload'].read())
-                    logger.info(f"ML Lambda response: {ml_result}")
-                    
-                    if ml_response['StatusCode'] == 200:
-                        result['ml_categorization'] = ml_result
-                        
-                        # Parse ML response with direct transaction results
-                        if 'body' in ml_result:
-                            ml_body = json.loads(ml_result['body']) if isinstance(ml_result['body'], str) else ml_result['body']
-                            
-                            # Get categorized transactions directly from ML response
-                            if 'results' in ml_body:
-                                categorized_results = ml_body['results']
-                                
-                                # Merge categories back into transactions
-                                for i, txn in enumerate(result['transactions']):
-                                    if i < len(categorized_results):
-                                        cat_result = categorized_results[i]
-                                        txn['category'] = cat_result.get('category', 'Other')
-                                        txn['category_confidence'] = cat_result.get('confidence', 0.0)
-                                        txn['ml_prediction'] = {
-                                            'method': cat_result.get('method', 'unknown'),
-                                            'processing_time_ms': cat_result.get('processing_time_ms', 0)
-                                        }
-                                
-                                result['message'] = "Transactions parsed and categorized successfully"
-                                logger.info(f"Successfully merged {len(categorized_results)} categorized transactions")
-                            else:
-                                logger.warning("No results found in ML response body")
-                                result['message'] = "Transactions parsed, but no ML results found"
-                        else:
-                            # Handle direct result format (non-API Gateway response)
-                            if 'results' in ml_result:
-                                categorized_results = ml_result['results']
-                                
-                                # Merge categories back into transactions
-                                for i, txn in enumerate(result['transactions']):
-                                    if i < len(categorized_results):
-                                        cat_result = categorized_results[i]
-                                        txn['category'] = cat_result.get('category', 'Other')
-                                        txn['category_confidence'] = cat_result.get('confidence', 0.0)
-                                        txn['ml_prediction'] = {
-                                            'method': cat_result.get('method', 'unknown'),
-                                            'processing_time_ms': cat_result.get('processing_time_ms', 0)
-                                        }
-                                
-                                result['message'] = "Transactions parsed and categorized successfully"
-                                logger.info(f"Successfully merged {len(categorized_results)} categorized transactions")
-                            else:
-                                logger.warning("No results found in ML response")
-                                result['message'] = "Transactions parsed, but no ML results found"
-                    else:
-                        result['categorization_error'] = ml_result
-                        result['message'] = "Transactions parsed but categorization failed"
-                        
-                except Exception as ml_error:
-                    logger.error(f"Error invoking ML Lambda: {ml_error}")
-                    result['categorization_error'] = str(ml_error)
-                    result['message'] = "Transactions parsed but ML categorization failed"
-                
-                # ML categorization completed (stored in DDB via ML lambda)
+                # ML categorization results are stored in DDB by the ML lambda
+                result.update(_categorize_transactions(parser, transactions, user_id, wallet_id))
                     
             except Exception as e:
                 logger.error(f"Error processing categorization: {e}")
                 result['categorization_error'] = str(e)
         
-        return {
-            "statusCode": 200,
-            "headers": cors_headers,
-            "body": json.dumps(result, indent=2)
-        }
+        return _parse_response(result, cors_headers, options, timings_requested(event, body))
         
     except Exception as e:
         logger.error(f"Error processing PDF: {str(e)}", exc_info=True)
@@ -2141,29 +2557,8 @@ def lambda_handler(event, context):
             })
         }
 
-# Test function for local development
-def test_local():
-    """Test function with sample PDF"""
-    
-    # This would need a real PDF file for testing
-    sample_pdf_path = '/Users/isaacabhishek/Downloads/Statement_2025MTH02_283537256-unlocked.pdf'
-    
-    if os.path.exists(sample_pdf_path):
-        # Read PDF file and convert to base64
-        with open(sample_pdf_path, 'rb') as f:
-            pdf_bytes = f.read()
-            pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        test_event = {
-            "pdf_content": pdf_base64,
-            "categorize": True
-        }
-        
-        result = lambda_handler(test_event, None)
-        print("Test Result:")
-        print(json.dumps(result, indent=2))
-    else:
-        print(f"Test PDF file not found: {sample_pdf_path}")
-
 if __name__ == "__main__":
-    test_local()
\ No newline at end of file
+    # Parse local statements: python parseBankStatement.py statement.pdf [--passwords passwords.json ...]
+    import sys
+    from bulk_parse import main
+    sys.exit(main())
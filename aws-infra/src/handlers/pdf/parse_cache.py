@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Content-addressed cache of parsed statement transactions
+
+Entries are keyed on the statement content (SHA-256 of the PDF bytes, or the
+S3 ETag), a digest of the password used to open it and the parser version,
+so a re-uploaded statement skips the whole parsing pipeline. Backends store
+opaque bytes under a string key; LocalDiskCache keeps an LRU on /tmp and
+S3Cache shares entries across Lambda containers.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from statement_transaction import encode_transaction
+
+logger = logging.getLogger()
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'parse-cache')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_S3_PREFIX = 'parse-cache/'
+
+_ENTRY_SUFFIX = '.json'
+
+
+def source_version(directory, pattern='*.py'):
+    """Digest of the parser sources so a deploy with parsing changes never reads stale entries"""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(directory, pattern))):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def content_digest(pdf_bytes):
+    """Cache identity of an uploaded statement"""
+    return 'sha256-' + hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def etag_digest(bucket, key, s3_client):
+    """Cache identity of an S3 statement from its ETag (None when it can't be read)"""
+    try:
+        etag = s3_client.head_object(Bucket=bucket, Key=key).get('ETag', '').strip('"')
+    except Exception as e:
+        logger.warning(f"Could not read ETag for s3://{bucket}/{key}: {e}")
+        return None
+    return 'etag-' + etag if etag else None
+
+
+def cache_key(digest, parser_version, password=None):
+    """Key for a statement digest; the password is folded in so a cached result still needs it"""
+    material = f"{parser_version}\x00{digest}\x00{password or ''}"
+    return f"{parser_version}/{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+
+class LocalDiskCache:
+    """File-per-entry cache on local disk, evicting least recently used entries past its limits"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key.replace('/', '_') + _ENTRY_SUFFIX)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as entry:
+                data = entry.read()
+            # Reads refresh the entry's position in the LRU order
+            os.utime(path, None)
+            return data
+        except OSError:
+            return None
+
+    def put(self, key, data):
+        path = self._path(key)
+        # Write then rename so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as entry:
+                entry.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, '*' + _ENTRY_SUFFIX)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(reverse=True)
+
+        total_bytes = 0
+        for index, (_, size, path) in enumerate(entries):
+            total_bytes += size
+            if index >= self.max_entries or total_bytes > self.max_bytes:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class S3Cache:
+    """Cache entries stored as objects under a bucket prefix"""
+
+    def __init__(self, bucket, prefix=DEFAULT_S3_PREFIX, s3_client=None, encryption=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        # ServerSideEncryption for every object written (e.g. 'aws:kms'), or the bucket default
+        self.encryption = encryption
+        if s3_client is None:
+            import boto3
+            s3_client = boto3.client('s3')
+        self.s3_client = s3_client
+
+    def get(self, key):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.prefix + key + _ENTRY_SUFFIX)
+        except Exception:
+            return None
+        return response['Body'].read()
+
+    def put(self, key, data):
+        extra = {'ServerSideEncryption': self.encryption} if self.encryption else {}
+        self.s3_client.put_object(Bucket=self.bucket, Key=self.prefix + key + _ENTRY_SUFFIX, Body=data,
+                                  ContentType='application/json', **extra)
+
+    def delete(self, key):
+        self.s3_client.delete_object(Bucket=self.bucket, Key=self.prefix + key + _ENTRY_SUFFIX)
+
+
+class ParseResultCache:
+    """Read-through chain of backends (fastest first) holding transaction lists as JSON
+
+    A hit in a slower backend is copied into the faster ones. Backend
+    failures are logged and treated as misses, never as parse errors.
+    """
+
+    def __init__(self, backends):
+        self.backends = list(backends)
+
+    def get(self, key):
+        for index, backend in enumerate(self.backends):
+            try:
+                data = backend.get(key)
+            except Exception as e:
+                logger.warning(f"Parse cache read failed ({type(backend).__name__}): {e}")
+                continue
+            if data is None:
+                continue
+            try:
+                transactions = json.loads(data)
+            except ValueError:
+                logger.warning(f"Discarding unreadable parse cache entry {key}")
+                continue
+            for faster in self.backends[:index]:
+                self._put_backend(faster, key, data)
+            return transactions
+        return None
+
+    def put(self, key, transactions):
+        data = json.dumps(transactions, separators=(',', ':'), default=encode_transaction).encode('utf-8')
+        for backend in self.backends:
+            self._put_backend(backend, key, data)
+
+    @staticmethod
+    def _put_backend(backend, key, data):
+        try:
+            backend.put(key, data)
+        except Exception as e:
+            logger.warning(f"Parse cache write failed ({type(backend).__name__}): {e}")
+
+
+def cache_from_environment():
+    """Cache configured by PDF_PARSE_CACHE* env vars, or None when disabled
+
+    PDF_PARSE_CACHE=0 disables caching, PDF_PARSE_CACHE_DIR / PDF_PARSE_CACHE_MAX_MB
+    size the local LRU and PDF_PARSE_CACHE_BUCKET adds a shared S3 backend.
+    """
+    if os.environ.get('PDF_PARSE_CACHE', '1') != '1':
+        return None
+
+    backends = []
+    try:
+        backends.append(LocalDiskCache(
+            directory=os.environ.get('PDF_PARSE_CACHE_DIR', DEFAULT_CACHE_DIR),
+            max_bytes=int(float(os.environ.get('PDF_PARSE_CACHE_MAX_MB', DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024),
+        ))
+    except OSError as e:
+        logger.warning(f"Local parse cache unavailable: {e}")
+
+    bucket = os.environ.get('PDF_PARSE_CACHE_BUCKET')
+    if bucket:
+        backends.append(S3Cache(bucket, prefix=os.environ.get('PDF_PARSE_CACHE_PREFIX', DEFAULT_S3_PREFIX)))
+
+    return ParseResultCache(backends) if backends else None
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Deadline-aware parsing: stop at a page boundary and resume in a follow-up invocation
+
+Nearly all of a parse is pdfplumber's per-page extraction. Before each page is
+extracted the Deadline compares the invocation's remaining time with a safety
+margin plus the slowest step seen so far; when time runs out the parse stops
+with DeadlineReached and the pages extracted so far are saved as a
+checkpoint. A resumed parse starts from those pages and replays the
+statement-level passes over them, so the result is the same as an
+uninterrupted parse.
+
+Checkpoints hold decrypted statement text, so they are short-lived: one is
+deleted as soon as its resumed parse finishes (or fails), a checkpoint older
+than PDF_CHECKPOINT_TTL_SECONDS is never resumed, and S3 checkpoints are
+written with KMS encryption under a prefix the bucket expires after a day.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+
+from parse_cache import LocalDiskCache, S3Cache
+
+logger = logging.getLogger()
+
+# Time kept back for ML categorization and the response after parsing stops
+DEFAULT_MARGIN_MS = 20000
+DEFAULT_CHECKPOINT_DIR = os.path.join(tempfile.gettempdir(), 'parse-checkpoints')
+DEFAULT_S3_PREFIX = 'parse-checkpoints/'
+DEFAULT_S3_ENCRYPTION = 'aws:kms'
+DEFAULT_TTL_SECONDS = 900
+CHECKPOINT_ENTRIES = 64
+# API Gateway answers 504 after 29 seconds whatever the Lambda timeout is
+API_GATEWAY_TIMEOUT_MS = 29000
+
+_TOKEN_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class DeadlineReached(Exception):
+    """Raised before extracting a page when the invocation is about to run out of time"""
+
+    def __init__(self, page_index):
+        super().__init__(f"Deadline reached before page {page_index + 1}")
+        self.page_index = page_index
+        # Filled in by the parser with the pages extracted so far
+        self.pages = None
+
+
+class Deadline:
+    """Remaining-time budget of one invocation, checked before every page extraction"""
+
+    def __init__(self, remaining_ms, margin_ms=DEFAULT_MARGIN_MS):
+        self._remaining_ms = remaining_ms
+        self.margin_ms = margin_ms
+        self.checks = 0
+        self.slowest_step_ms = 0.0
+        self._last_check = None
+
+    @classmethod
+    def from_context(cls, context, limit_ms=None):
+        """Deadline for a Lambda context (None outside Lambda or with PDF_PARSE_DEADLINE=0)
+
+        limit_ms caps the budget below the Lambda timeout, counted from now
+        (API_GATEWAY_TIMEOUT_MS for requests that came through API Gateway).
+        """
+        if os.environ.get('PDF_PARSE_DEADLINE', '1') != '1':
+            return None
+        remaining_ms = getattr(context, 'get_remaining_time_in_millis', None)
+        if not callable(remaining_ms):
+            return None
+        if limit_ms is not None:
+            context_remaining_ms = remaining_ms
+            started = time.monotonic()
+            remaining_ms = lambda: min(context_remaining_ms(), limit_ms - (time.monotonic() - started) * 1000)
+        return cls(remaining_ms, int(os.environ.get('PDF_PARSE_DEADLINE_MARGIN_MS', DEFAULT_MARGIN_MS)))
+
+    def check(self, page_index):
+        """Raise DeadlineReached when the next page might not finish in time"""
+        now = time.monotonic()
+        if self._last_check is not None:
+            self.slowest_step_ms = max(self.slowest_step_ms, (now - self._last_check) * 1000)
+        self._last_check = now
+        self.checks += 1
+        # The first page of an invocation always runs so every invocation makes progress
+        if self.checks > 1 and self._remaining_ms() < self.margin_ms + self.slowest_step_ms:
+            raise DeadlineReached(page_index)
+
+
+class CheckpointStore:
+    """Checkpoints by continuation token, on /tmp or under an S3 prefix"""
+
+    def __init__(self, backend, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    def save(self, state, token=None):
+        """Store a checkpoint, returning its continuation token"""
+        token = token if is_valid_token(token) else uuid.uuid4().hex
+        self.backend.put(token, json.dumps(state, separators=(',', ':')).encode('utf-8'))
+        return token
+
+    def load(self, token):
+        if not is_valid_token(token):
+            return None
+        data = self.backend.get(token)
+        if data is None:
+            return None
+        try:
+            state = json.loads(data)
+        except ValueError:
+            logger.warning(f"Discarding unreadable checkpoint {token}")
+            return None
+        if time.time() - state.get('created_at', 0) > self.ttl_seconds:
+            logger.info(f"Discarding checkpoint {token} older than {self.ttl_seconds}s")
+            self.delete(token)
+            return None
+        return state
+
+    def delete(self, token):
+        if is_valid_token(token):
+            try:
+                self.backend.delete(token)
+            except Exception as e:
+                logger.warning(f"Could not delete checkpoint {token}: {e}")
+
+
+def is_valid_token(token):
+    return isinstance(token, str) and bool(_TOKEN_RE.match(token))
+
+
+def store_from_environment():
+    """S3 store under PDF_CHECKPOINT_BUCKET when set (follow-ups may land on another container), else /tmp"""
+    bucket = os.environ.get('PDF_CHECKPOINT_BUCKET')
+    ttl_seconds = int(os.environ.get('PDF_CHECKPOINT_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+    if bucket:
+        return CheckpointStore(S3Cache(bucket, prefix=os.environ.get('PDF_CHECKPOINT_PREFIX', DEFAULT_S3_PREFIX),
+                                       encryption=os.environ.get('PDF_CHECKPOINT_ENCRYPTION', DEFAULT_S3_ENCRYPTION)),
+                               ttl_seconds)
+    return CheckpointStore(LocalDiskCache(os.environ.get('PDF_CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR),
+                                          max_entries=CHECKPOINT_ENTRIES), ttl_seconds)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Generated from src/handlers/shared/profiling.py by scripts/sync_shared_modules.py.
+# Edit the shared module and re-run the script; changes made here are overwritten.
+"""On-demand cProfile and tracemalloc capture for single invocations
+
+A slow or memory-hungry statement can't be reproduced once its PDF is gone,
+so a handler wrapped with @profiled(service) can profile the invocation
+itself. Profiling is off unless the request asks for it (direct-invocation
+or body "profile": true, ?profile=1) or PROFILE_INVOCATIONS=1 turns it on
+for every invocation.
+
+Each profiled invocation writes two files: <name>.pstats, a cProfile dump
+for pstats/snakeviz, and <name>.txt with the top PROFILE_TOP_N functions by
+cumulative time and the top allocation sites still held when the handler
+returned plus the peak traced memory. Only function names, file basenames
+and line numbers are kept, never arguments, locals or transaction text.
+Files go under PROFILE_BUCKET (prefix profiles/) when set, otherwise to
+PROFILE_DIR (default /tmp/profiles). Only the handler's thread is profiled.
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+logger = logging.getLogger()
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'profiles')
+DEFAULT_S3_PREFIX = 'profiles/'
+DEFAULT_TOP_N = 25
+
+# Allocations made by the profilers themselves are left out of the report
+_ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def profiling_requested(event):
+    """Whether this invocation should be profiled"""
+    if os.environ.get('PROFILE_INVOCATIONS', '0') == '1':
+        return True
+    if not isinstance(event, dict):
+        return False
+    query = event.get('queryStringParameters') or {}
+    if query.get('profile') in ('1', 'true') or event.get('profile') is True:
+        return True
+
+    body = event.get('body')
+    if isinstance(body, str) and '"profile"' in body:
+        # Only bodies that mention the flag are decoded a second time
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return False
+    return isinstance(body, dict) and body.get('profile') is True
+
+
+class ProfileSink:
+    """Writes profile files to a local directory or under an S3 prefix"""
+
+    def __init__(self, bucket=None, prefix=DEFAULT_S3_PREFIX, directory=DEFAULT_PROFILE_DIR, s3_client=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.directory = directory
+        self._s3_client = s3_client
+
+    @classmethod
+    def from_env(cls):
+        return cls(bucket=os.environ.get('PROFILE_BUCKET') or None,
+                   directory=os.environ.get('PROFILE_DIR', DEFAULT_PROFILE_DIR))
+
+    def write(self, name, data):
+        """Store data (bytes) as name and return where it went"""
+        if self.bucket:
+            if self._s3_client is None:
+                import boto3
+                self._s3_client = boto3.client('s3')
+            key = self.prefix + name
+            self._s3_client.put_object(Bucket=self.bucket, Key=key, Body=data)
+            return f"s3://{self.bucket}/{key}"
+
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+
+class InvocationProfile:
+    """cProfile and tracemalloc running around one handler call"""
+
+    def __init__(self, top_n=DEFAULT_TOP_N):
+        self.top_n = top_n
+        self.profiler = cProfile.Profile()
+        self.elapsed_ms = 0.0
+        self._started_tracemalloc = False
+        self._start_time = None
+        self._snapshot = None
+        self._peak_bytes = 0
+
+    def start(self):
+        # Enabled first: it raises ValueError when another profiler is active
+        self.profiler.enable()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        else:
+            tracemalloc.reset_peak()
+        self._start_time = time.perf_counter()
+
+    def stop(self):
+        self.profiler.disable()
+        self.elapsed_ms = (time.perf_counter() - self._start_time) * 1000
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+        self._peak_bytes = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def pstats_dump(self):
+        """Marshalled pstats data with directories stripped from file names"""
+        # Same bytes as Stats.dump_stats(), without a temporary file
+        return marshal.dumps(pstats.Stats(self.profiler).strip_dirs().stats)
+
+    def report(self, service):
+        """Text report of the slowest functions and the largest allocation sites"""
+        out = io.StringIO()
+        out.write(f"service: {service}\n")
+        out.write(f"elapsed_ms: {self.elapsed_ms:.1f}\n")
+        out.write(f"peak_traced_kib: {self._peak_bytes / 1024:.1f}\n\n")
+
+        out.write(f"Top {self.top_n} functions by cumulative time\n")
+        pstats.Stats(self.profiler, stream=out).strip_dirs().sort_stats('cumulative').print_stats(self.top_n)
+
+        out.write(f"Top {self.top_n} allocation sites held at return\n")
+        for stat in self._snapshot.statistics('lineno')[:self.top_n]:
+            frame = stat.traceback[0]
+            out.write(f"{os.path.basename(frame.filename)}:{frame.lineno} "
+                      f"size_kib={stat.size / 1024:.1f} blocks={stat.count}\n")
+        return out.getvalue()
+
+
+def _profile_name(service, context):
+    request_id = getattr(context, 'aws_request_id', None) or uuid.uuid4().hex
+    return f"{service}/{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{request_id}"
+
+
+def profiled(service):
+    """Lambda handler decorator that profiles the invocations that ask for it"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            if not profiling_requested(event):
+                return handler(event, context)
+
+            profile = InvocationProfile(int(os.environ.get('PROFILE_TOP_N', DEFAULT_TOP_N)))
+            try:
+                profile.start()
+            except ValueError as e:
+                logger.warning(f"Profiling unavailable: {e}")
+                return handler(event, context)
+
+            try:
+                return handler(event, context)
+            finally:
+                profile.stop()
+                try:
+                    sink = ProfileSink.from_env()
+                    name = _profile_name(service, context)
+                    stats_location = sink.write(name + '.pstats', profile.pstats_dump())
+                    report_location = sink.write(name + '.txt', profile.report(service).encode('utf-8'))
+                    logger.info(f"📊 Profile written: {stats_location}, {report_location}")
+                except Exception as e:
+                    logger.warning(f"Could not write profile: {e}")
+        return wrapper
+    return decorator
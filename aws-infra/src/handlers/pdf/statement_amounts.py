@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+SIGN_CREDIT = 1
+SIGN_DEBIT = -1
+SIGN_NONE = 0
+
+# Joins a column into one string for the bulk clean-up (cells never contain it in practice)
+_CELL_SEPARATOR = '\x00'
+_ASCII_DIGITS = frozenset('0123456789')
+# Last two characters of a cleaned cell -> (suffix length, sign) when a digit precedes
+# the suffix, e.g. "1234.50CR" / "1234.50C"; the rstrip() chain then just drops it
+_SUFFIX_ENDINGS = {}
+for _digit in '0123456789':
+    _SUFFIX_ENDINGS[_digit + 'C'] = (1, SIGN_CREDIT)
+    _SUFFIX_ENDINGS[_digit + 'D'] = (1, SIGN_DEBIT)
+for _suffix, _sign in (('CR', SIGN_CREDIT), ('Cr', SIGN_CREDIT), ('DR', SIGN_DEBIT), ('Dr', SIGN_DEBIT)):
+    _SUFFIX_ENDINGS[_suffix] = (2, _sign)
+
+
+def _clean_amount_text(text):
+    # Remove currency symbols and spaces
+    cleaned = text.replace('₹', '').replace('Rs', '').replace('INR', '')
+    return cleaned.replace(',', '').replace(' ', '')
+
+
+def _amount_from_cleaned(cleaned):
+    """(amount, sign) for an already cleaned cell, (None, SIGN_NONE) when it isn't an amount"""
+    cleaned = cleaned.strip()
+
+    # Handle empty or dash values
+    if not cleaned or cleaned == '-' or cleaned == '0.0':
+        return None, SIGN_NONE
+
+    # Handle credit card format with C/D/CR/DR suffixes (like "174.00 C", "130.00 D", "10,546.66 CR")
+    sign = SIGN_NONE
+    if cleaned.endswith('CR') or cleaned.endswith('C') or cleaned.endswith('Cr'):
+        sign = SIGN_CREDIT
+        cleaned = cleaned.rstrip('CR').rstrip('Cr').rstrip('C').strip()
+    elif cleaned.endswith('DR') or cleaned.endswith('D') or cleaned.endswith('Dr'):
+        sign = SIGN_DEBIT
+        cleaned = cleaned.rstrip('DR').rstrip('Dr').rstrip('D').strip()
+
+    try:
+        amount = float(cleaned)
+    except (ValueError, TypeError):
+        return None, SIGN_NONE
+
+    # Credits are positive, debits negative; unsuffixed amounts are returned as-is
+    # and the caller decides the sign from context
+    if sign == SIGN_CREDIT:
+        return abs(amount), sign
+    if sign == SIGN_DEBIT:
+        return -abs(amount), sign
+    return amount, sign
+
+
+def parse_amount(amount_str):
+    """Parse a single amount string, e.g. "₹1,234.50 Cr" -> 1234.5 (None when not an amount)"""
+    return _amount_from_cleaned(_clean_amount_text(str(amount_str)))[0]
+
+
+def parse_amount_column(cells):
+    """Parse a whole column of amount strings in one pass
+
+    Returns what parse_amount() returns for each cell, as a list (None for
+    cells that aren't amounts). The currency/comma/space clean-up runs once
+    over the joined column, and plain or suffixed amounts skip the per-cell
+    checks of parse_amount().
+    """
+    texts = [str(cell) for cell in cells]
+    joined = _CELL_SEPARATOR.join(texts)
+    if texts and joined.count(_CELL_SEPARATOR) == len(texts) - 1:
+        # Currency/comma/space removal for the whole column in a few C-level passes
+        cleaned_cells = _clean_amount_text(joined).split(_CELL_SEPARATOR)
+    else:
+        cleaned_cells = [_clean_amount_text(text) for text in texts]
+
+    amounts = []
+    add_amount = amounts.append
+    suffix_ending = _SUFFIX_ENDINGS.get
+    for cleaned in cleaned_cells:
+        cleaned = cleaned.strip()
+        if cleaned[-1:] in _ASCII_DIGITS:
+            # Plain "1234.50" ('0.0' is how some statements print an empty column)
+            if cleaned != '0.0':
+                try:
+                    add_amount(float(cleaned))
+                    continue
+                except ValueError:
+                    pass
+        else:
+            ending = suffix_ending(cleaned[-2:])
+            if ending and cleaned[-ending[0] - 1:-ending[0]] in _ASCII_DIGITS:
+                try:
+                    amount = abs(float(cleaned[:-ending[0]]))
+                    add_amount(amount if ending[1] == SIGN_CREDIT else -amount)
+                    continue
+                except ValueError:
+                    pass
+        # Blanks, dashes and anything unusual take the exact per-cell path
+        add_amount(_amount_from_cleaned(cleaned)[0])
+    return amounts
+
+
+def parse_amount_cells(cells):
+    """Batch equivalent of parsing each cell with the first valid amount of its lines
+
+    Multi-line cells (HDFC tables put one amount per transaction on its own
+    line) resolve to their first line that is an amount.
+    """
+    owners = []
+    lines = []
+    for cell_index, cell in enumerate(cells):
+        if not cell:
+            continue
+        text = str(cell).strip()
+        if '\n' in text:
+            for line in text.split('\n'):
+                line = line.strip()
+                if line:
+                    owners.append(cell_index)
+                    lines.append(line)
+        else:
+            owners.append(cell_index)
+            lines.append(text)
+
+    values = [None] * len(cells)
+    if not lines:
+        return values
+    for cell_index, value in zip(owners, parse_amount_column(lines)):
+        if values[cell_index] is None and value is not None:
+            values[cell_index] = value
+    return values
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Description lines printed above a generic statement's dated rows
+
+Schema inference used to look back up to 14 lines from every matched row to
+collect its narration, re-testing each of those lines against the
+transaction indicators. ContinuationBuffer sees every line once, in order,
+and keeps the candidate lines since the last dated line, so a row reads its
+continuations straight from the buffer.
+"""
+
+from collections import deque
+
+import statement_patterns as patterns
+
+# How many lines above a row may still belong to its description
+LOOK_BACK_LINES = 14
+
+
+def is_continuation_line(line):
+    """Whether a (stripped, non-dated) line can be part of a transaction's description"""
+    if patterns.SCHEMA_TRANSACTION_INDICATORS.found_in(line):
+        return True
+    return (len(line) > 10 and not line.replace(' ', '').replace(',', '').replace('.', '').isdigit()
+            and any(char.isalpha() for char in line) and not line.startswith('Page'))
+
+
+class ContinuationBuffer:
+    """Candidate description lines between the last dated line and the current line
+
+    advance() is called with every stripped line in order; collected() then
+    returns the candidates among the LOOK_BACK_LINES lines above the current
+    one, nearest first. Blank and one- or two-character lines are skipped, and
+    a line starting with a DD-MM-YYYY / DD/MM/YYYY date (usually the previous
+    row) empties the buffer.
+    """
+
+    def __init__(self, look_back=LOOK_BACK_LINES):
+        self.look_back = look_back
+        self._index = -1
+        self._current = None
+        self._lines = deque()
+
+    def advance(self, line):
+        """Move on to the next line; the line before it joins the buffer"""
+        if self._current is not None:
+            self._add(self._index, self._current)
+        self._index += 1
+        self._current = line
+
+    def collected(self):
+        """Continuation lines for a row on the current line, nearest first"""
+        return [line for _, line in reversed(self._lines)]
+
+    def _add(self, index, line):
+        # Lines more than look_back lines above the next one can't be collected any more
+        oldest = index + 1 - self.look_back
+        while self._lines and self._lines[0][0] < oldest:
+            self._lines.popleft()
+
+        if not line or len(line) <= 2:
+            return
+        if patterns.LEADING_NUMERIC_DATE_RE.match(line):
+            self._lines.clear()
+        elif is_continuation_line(line):
+            self._lines.append((index, line))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import re
+from datetime import datetime
+
+# Formats tried in order by the original strptime loop
+DATE_FORMATS = [
+    '%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d', '%Y/%m/%d',
+    '%d-%m-%y', '%d/%m/%y', '%d %b %Y', '%d %B %Y',
+    '%d-%b-%Y', '%d-%b-%y', '%d/%b/%Y', '%d/%b/%y',
+    '%d %b %y', '%d %B %y'  # Credit card formats like "20 Apr 25"
+]
+
+MONTH_NAMES = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+               'august', 'september', 'october', 'november', 'december']
+MONTH_NUMBERS = {}
+for _number, _name in enumerate(MONTH_NAMES, 1):
+    MONTH_NUMBERS[_name] = _number
+    MONTH_NUMBERS[_name[:3]] = _number
+
+
+def _alternation(names):
+    # Longest first, as strptime does, so 'june' is tried before 'jun'
+    return '|'.join(sorted(names, key=len, reverse=True))
+
+
+# Same sub-patterns strptime builds for each directive
+_DIRECTIVES = {
+    'd': r'(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    'm': r'(?P<m>1[0-2]|0[1-9]|[1-9])',
+    'Y': r'(?P<Y>\d\d\d\d)',
+    'y': r'(?P<y>\d\d)',
+    'b': f"(?P<b>{_alternation(name[:3] for name in MONTH_NAMES)})",
+    'B': f"(?P<B>{_alternation(MONTH_NAMES)})",
+}
+
+
+def _compile_format(fmt):
+    """Regex equivalent of datetime.strptime for one of DATE_FORMATS"""
+    pattern = re.sub(r'\s+', r'\\s+', fmt.replace('-', r'\-').replace('/', r'\/'))
+    pattern = re.sub(r'%([dmYybB])', lambda directive: _DIRECTIVES[directive.group(1)], pattern)
+    return re.compile(pattern, re.IGNORECASE)
+
+
+COMPILED_DATE_FORMATS = [_compile_format(fmt) for fmt in DATE_FORMATS]
+
+DATE_CACHE_SIZE = 4096
+
+
+class StatementDateParser:
+    """Parse statement dates to DD-MM-YYYY, remembering which format the statement uses
+
+    Equivalent to trying DATE_FORMATS with datetime.strptime in order: the
+    formats never match the same string with different results, so the
+    format that matched last is tried first and the full list is only
+    walked on a miss. Results are memoized since dates repeat across rows.
+    """
+
+    def __init__(self):
+        self.preferred_format = None
+        self._cache = {}
+
+    def parse(self, date_str):
+        """Parse a single date string ('' / unknown formats give None)"""
+        date_str = date_str.strip()
+        if date_str in self._cache:
+            return self._cache[date_str]
+
+        parsed = None
+        if self.preferred_format is not None:
+            parsed = self._parse_with(self.preferred_format, date_str)
+        if parsed is None:
+            for format_index in range(len(COMPILED_DATE_FORMATS)):
+                if format_index == self.preferred_format:
+                    continue
+                parsed = self._parse_with(format_index, date_str)
+                if parsed is not None:
+                    self.preferred_format = format_index
+                    break
+
+        if len(self._cache) >= DATE_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[date_str] = parsed
+        return parsed
+
+    def _parse_with(self, format_index, date_str):
+        match = COMPILED_DATE_FORMATS[format_index].match(date_str)
+        # strptime rejects trailing text ("unconverted data remains")
+        if not match or match.end() != len(date_str):
+            return None
+        fields = match.groupdict()
+        if 'Y' in fields:
+            year = int(fields['Y'])
+        else:
+            year = int(fields['y'])
+            year += 2000 if year <= 68 else 1900
+        if 'm' in fields:
+            month = int(fields['m'])
+        else:
+            month = MONTH_NUMBERS[(fields.get('b') or fields['B']).lower()]
+        try:
+            return datetime(year, month, int(fields['d'])).strftime('%d-%m-%Y')
+        except ValueError:
+            return None
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+
+import io
+import logging
+import pdfplumber
+
+from statement_layouts import region_bbox
+from instrumentation import metrics
+
+logger = logging.getLogger()
+
+# Table settings used when the default extract_tables() call finds nothing
+STRICT_LINE_TABLE_SETTINGS = {
+    "vertical_strategy": "lines_strict",
+    "horizontal_strategy": "lines_strict"
+}
+
+
+class StatementDocument:
+    """Open a statement PDF once and lazily cache per-page text, words and tables
+
+    Every detector and parsing strategy reads from the same instance so that
+    pdfplumber's layout analysis runs at most once per page and setting.
+    pdf_source may be a path, a binary file object or the raw PDF bytes; bytes
+    are read through an in-memory buffer so nothing is written to /tmp.
+    After set_region() pages are read through the issuer's transaction region,
+    falling back to the whole page when the crop yields nothing. page_hook,
+    when set, is called with the page index before any page is extracted (the
+    parse deadline uses it to stop at a page boundary).
+    """
+
+    def __init__(self, pdf_source, password=None):
+        self.pdf_source = pdf_source
+        self.password = password
+        self._pdf = None
+        self._page_text = {}
+        self._page_words = {}
+        self._page_tables = {}
+        self._whole_page_text = {}
+        self._whole_page_tables = {}
+        self._full_text = None
+        self._region = None
+        self._cropped_pages = {}
+        self._pending_snapshot = None
+        self.page_hook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @property
+    def pdf(self):
+        """Underlying pdfplumber document, opened on first access"""
+        if self._pdf is None:
+            source = self.pdf_source
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                source = io.BytesIO(source)
+            with metrics.span('pdf_open'):
+                self._pdf = pdfplumber.open(source, password=self.password)
+        return self._pdf
+
+    @property
+    def page_count(self):
+        return len(self.pdf.pages)
+
+    def page(self, page_index):
+        """pdfplumber page for a zero-based page index"""
+        return self.pdf.pages[page_index]
+
+    def set_region(self, region):
+        """Read pages through a transaction region from now on (see statement_layouts)
+
+        Whatever was cached from whole pages (statement detection) is set aside so
+        every parsing strategy sees the same view of the page; set_region(None)
+        goes back to whole pages and their cache.
+        """
+        if self._region is None:
+            # Kept for whole_page_text() / whole_page_tables() and for going back to whole pages
+            self._whole_page_text, self._whole_page_tables = self._page_text, self._page_tables
+        self._region = region
+        self._cropped_pages = {}
+        self._page_text = {} if region else self._whole_page_text
+        self._page_words = {}
+        self._page_tables = {} if region else self._whole_page_tables
+        self._full_text = None
+        if region and self._pending_snapshot:
+            snapshot, self._pending_snapshot = self._pending_snapshot, None
+            self.restore_pages(snapshot)
+
+    def _region_page(self, page_index):
+        """The page cropped to the transaction region (first page and later pages differ)"""
+        if page_index not in self._cropped_pages:
+            page = self.page(page_index)
+            box = self._region['first_page' if page_index == 0 else 'pages']
+            self._cropped_pages[page_index] = page.crop(region_bbox(page.bbox, box))
+        return self._cropped_pages[page_index]
+
+    def page_text(self, page_index):
+        """Extracted text of a page ('' when pdfplumber finds none)"""
+        if page_index not in self._page_text:
+            self._before_extract(page_index)
+            metrics.count('pages_read')
+            with metrics.span('pdf_text'):
+                text = ''
+                if self._region:
+                    text = self._region_page(page_index).extract_text() or ''
+                if not text.strip():
+                    text = self.page(page_index).extract_text() or ''
+            self._page_text[page_index] = text
+        return self._page_text[page_index]
+
+    def page_lines(self, page_index):
+        return self.page_text(page_index).split('\n')
+
+    def page_words(self, page_index):
+        """Words with their bounding boxes for a page"""
+        if page_index not in self._page_words:
+            self._before_extract(page_index)
+            with metrics.span('pdf_words'):
+                words = []
+                if self._region:
+                    words = self._region_page(page_index).extract_words()
+                if not words:
+                    words = self.page(page_index).extract_words()
+            self._page_words[page_index] = words
+        return self._page_words[page_index]
+
+    def page_tables(self, page_index, table_settings=None):
+        """Tables of a page, cached per table settings"""
+        settings_key = tuple(sorted(table_settings.items())) if table_settings else ()
+        cache_key = (page_index, settings_key)
+        if cache_key not in self._page_tables:
+            self._before_extract(page_index)
+            metrics.count('table_extractions')
+            with metrics.span('pdf_tables'):
+                tables = []
+                if self._region:
+                    tables = self._extract_tables(self._region_page(page_index), table_settings)
+                if not tables:
+                    tables = self._extract_tables(self.page(page_index), table_settings)
+            self._page_tables[cache_key] = tables
+        return self._page_tables[cache_key]
+
+    def whole_page_text(self, page_index):
+        """Text of the whole page, whatever the region"""
+        if self._region is None:
+            return self.page_text(page_index)
+        if page_index not in self._whole_page_text:
+            self._before_extract(page_index)
+            with metrics.span('pdf_text'):
+                self._whole_page_text[page_index] = self.page(page_index).extract_text() or ''
+        return self._whole_page_text[page_index]
+
+    def whole_page_tables(self, page_index, table_settings=None):
+        """Tables of the whole page, whatever the region"""
+        if self._region is None:
+            return self.page_tables(page_index, table_settings)
+        cache_key = (page_index, tuple(sorted(table_settings.items())) if table_settings else ())
+        if cache_key not in self._whole_page_tables:
+            self._before_extract(page_index)
+            with metrics.span('pdf_tables'):
+                self._whole_page_tables[cache_key] = self._extract_tables(self.page(page_index), table_settings)
+        return self._whole_page_tables[cache_key]
+
+    def _before_extract(self, page_index):
+        if self.page_hook is not None:
+            self.page_hook(page_index)
+
+    def snapshot_pages(self):
+        """Extracted page text and tables as plain JSON-compatible data (for checkpoints)"""
+        return {
+            'cropped': self._region is not None,
+            'text': {str(page_index): text for page_index, text in self._page_text.items()},
+            'tables': [[page_index, [list(item) for item in settings_key], tables]
+                       for (page_index, settings_key), tables in self._page_tables.items()],
+        }
+
+    def restore_pages(self, snapshot):
+        """Seed the page caches from snapshot_pages() so those pages aren't extracted again
+
+        A snapshot of cropped pages is held back until set_region() is called.
+        """
+        if snapshot.get('cropped') and self._region is None:
+            self._pending_snapshot = snapshot
+            return
+        for page_index, text in snapshot.get('text', {}).items():
+            self._page_text[int(page_index)] = text
+        for page_index, settings_items, tables in snapshot.get('tables', []):
+            settings_key = tuple(tuple(item) for item in settings_items)
+            self._page_tables[(page_index, settings_key)] = tables
+        self._full_text = None
+
+    @staticmethod
+    def _extract_tables(page, table_settings):
+        if table_settings:
+            return page.extract_tables(table_settings=table_settings)
+        return page.extract_tables()
+
+    @property
+    def full_text(self):
+        """Text of every page joined with newlines (empty pages skipped)"""
+        if self._full_text is None:
+            text = ''
+            for page_index in range(self.page_count):
+                page_text = self.page_text(page_index)
+                if page_text:
+                    text += page_text + '\n'
+            self._full_text = text
+        return self._full_text
+
+    @property
+    def lines(self):
+        return self.full_text.split('\n')
+
+    def header_text(self, max_chars):
+        """First max_chars of full_text, reading only as many pages as needed"""
+        if self._full_text is not None:
+            return self._full_text[:max_chars]
+        text = ''
+        for page_index in range(self.page_count):
+            if len(text) >= max_chars:
+                break
+            page_text = self.page_text(page_index)
+            if page_text:
+                text += page_text + '\n'
+        return text[:max_chars]
+
+    def first_page_text(self):
+        """Text of the first page that has any (skips blank or image-only cover pages)"""
+        for page_index in range(self.page_count):
+            page_text = self.page_text(page_index)
+            if page_text:
+                return page_text
+        return ''
+
+    def contains_any(self, keywords):
+        """Case-insensitive check for any keyword, stopping at the first page that has one"""
+        if self._full_text is not None:
+            text_lower = self._full_text.lower()
+            return any(keyword in text_lower for keyword in keywords)
+        for page_index in range(self.page_count):
+            page_lower = self.page_text(page_index).lower()
+            if any(keyword in page_lower for keyword in keywords):
+                return True
+        return False
+
+    def release_page(self, page_index):
+        """Drop everything cached for a page once it has been parsed"""
+        self._page_text.pop(page_index, None)
+        self._page_words.pop(page_index, None)
+        self._cropped_pages.pop(page_index, None)
+        self._whole_page_text.pop(page_index, None)
+        for tables in (self._page_tables, self._whole_page_tables):
+            for cache_key in [key for key in tables if key[0] == page_index]:
+                del tables[cache_key]
+        if self._pdf is not None:
+            page = self._pdf.pages[page_index]
+            # pdfplumber keeps parsed layout objects on the page until flushed
+            if hasattr(page, 'close'):
+                page.close()
+            elif hasattr(page, 'flush_cache'):
+                page.flush_cache()
+
+    def close(self):
+        """Close the PDF and drop every cached page artefact"""
+        if self._pdf is not None:
+            try:
+                self._pdf.close()
+            except Exception as e:
+                logger.warning(f"Could not close PDF document: {e}")
+            self._pdf = None
+        self._page_text = {}
+        self._page_words = {}
+        self._page_tables = {}
+        self._whole_page_text = {}
+        self._whole_page_tables = {}
+        self._cropped_pages = {}
+        self._full_text = None
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Where the transactions sit on each issuer's statement pages
+
+Regions are (x0, top, x1, bottom) fractions of the page, so they hold for any
+page size. The first page of a card statement opens with the account summary,
+reward points and offers, continuation pages only repeat a running header and
+footer. Cropping to the region keeps pdfplumber from analysing characters the
+parsers would discard anyway; a page whose crop yields nothing is read in full,
+and the parser drops the crop for a statement when a cropped sample page loses
+transactions or columns (see ICICIStatementParser._apply_region).
+
+The boxes are checked against benchmarks/synthetic_statements.py: every row of
+every layout's corpus has to survive the crop.
+"""
+
+import json
+import logging
+import os
+
+logger = logging.getLogger()
+
+FULL_PAGE = (0.0, 0.0, 1.0, 1.0)
+
+# Keyed by the STATEMENT_* types detected in parseBankStatement (ICICI_CC: see CARD_ONLY_REGIONS)
+TRANSACTION_REGIONS = {
+    'HDFC_CC': {'first_page': (0.0, 0.08, 1.0, 0.95), 'pages': (0.0, 0.03, 1.0, 0.95)},
+    'SBI_CC': {'first_page': (0.0, 0.08, 1.0, 0.95), 'pages': (0.0, 0.03, 1.0, 0.95)},
+    'INDUSIND_CC': {'first_page': (0.0, 0.08, 1.0, 0.95), 'pages': (0.0, 0.03, 1.0, 0.95)},
+    'ICICI_CC': {'first_page': (0.0, 0.08, 1.0, 0.95), 'pages': (0.0, 0.03, 1.0, 0.95)},
+}
+
+# Statement types that cover savings accounts as well as cards: only their card
+# statements (first page mentions a credit card) are cropped, to the card's region
+CARD_ONLY_REGIONS = {'ICICI': 'ICICI_CC'}
+
+
+def _valid_box(box):
+    if not isinstance(box, (list, tuple)) or len(box) != 4:
+        return False
+    x0, top, x1, bottom = box
+    return 0.0 <= x0 < x1 <= 1.0 and 0.0 <= top < bottom <= 1.0
+
+
+def transaction_region(statement_type, first_page_text=''):
+    """Region spec ({'first_page': box, 'pages': box}) for a statement type, or None to read whole pages
+
+    PDF_LAYOUT_REGIONS may hold a JSON object in the same shape to tune or add
+    issuers without a deploy.
+    """
+    if statement_type in CARD_ONLY_REGIONS:
+        if 'credit card' not in first_page_text.lower():
+            return None
+        statement_type = CARD_ONLY_REGIONS[statement_type]
+
+    regions = TRANSACTION_REGIONS
+    override = os.environ.get('PDF_LAYOUT_REGIONS')
+    if override:
+        try:
+            regions = dict(TRANSACTION_REGIONS, **json.loads(override))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring invalid PDF_LAYOUT_REGIONS: {e}")
+
+    region = regions.get(statement_type)
+    if not region:
+        return None
+    boxes = {page_kind: tuple(region.get(page_kind, FULL_PAGE)) for page_kind in ('first_page', 'pages')}
+    if not all(_valid_box(box) for box in boxes.values()):
+        logger.warning(f"Ignoring invalid transaction region for {statement_type}: {region}")
+        return None
+    return boxes
+
+
+def region_bbox(page_bbox, box):
+    """Absolute crop bbox for a fractional box within a page's (x0, top, x1, bottom) bbox"""
+    page_x0, page_top, page_x1, page_bottom = page_bbox
+    width = page_x1 - page_x0
+    height = page_bottom - page_top
+    x0, top, x1, bottom = box
+    return (page_x0 + x0 * width, page_top + top * height,
+            page_x0 + x1 * width, page_top + bottom * height)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+import re
+
+from keyword_matcher import KeywordAutomaton
+
+
+class PatternAlternation:
+    """Ordered regexes merged into one named alternation so a line is scanned once
+
+    Each pattern becomes an outer named group '<name>_<n>' (n starting at 1).
+    match()/search() return an AlternativeMatch whose group numbers are those
+    of the original pattern, so callers written against a list of patterns
+    keep working unchanged.
+
+    Trying the patterns one by one picks the first pattern that matches
+    anywhere; the alternation picks the leftmost position first. The two agree
+    for the patterns registered here because they are either used with
+    match() (all anchored at the line start) or share the same leading date
+    prefix and run to the end of the line.
+    """
+
+    def __init__(self, name, patterns):
+        self.name = name
+        self.patterns = list(patterns)
+        self._alternatives = {}
+        parts = []
+        group_index = 1
+        for number, pattern in enumerate(self.patterns, 1):
+            group_count = re.compile(pattern).groups
+            self._alternatives[group_index] = (number, pattern, group_count)
+            parts.append(f'(?P<{name}_{number}>{pattern})')
+            group_index += 1 + group_count
+        self.regex = re.compile('|'.join(parts))
+
+    def match(self, line):
+        return self._wrap(self.regex.match(line))
+
+    def search(self, line):
+        return self._wrap(self.regex.search(line))
+
+    def _wrap(self, match):
+        if not match:
+            return None
+        # The outer alternative group always closes last, so lastindex identifies it
+        number, pattern, group_count = self._alternatives[match.lastindex]
+        return AlternativeMatch(match, match.lastindex, number, pattern, group_count)
+
+
+class AlternativeMatch:
+    """Match of one alternative of a PatternAlternation, numbered like the original pattern"""
+
+    __slots__ = ('number', 'pattern', '_match', '_offset', '_group_count')
+
+    def __init__(self, match, offset, number, pattern, group_count):
+        self._match = match
+        self._offset = offset
+        self.number = number
+        self.pattern = pattern
+        self._group_count = group_count
+
+    def group(self, index=0):
+        return self._match.group(self._offset + index)
+
+    def groups(self):
+        return tuple(self._match.group(self._offset + index) for index in range(1, self._group_count + 1))
+
+    def start(self, index=0):
+        return self._match.start(self._offset + index)
+
+    def end(self, index=0):
+        return self._match.end(self._offset + index)
+
+    def span(self, index=0):
+        return self._match.span(self._offset + index)
+
+
+# --- Shared date/amount shapes ---
+
+# Any of DD-MM-YYYY / DD/MM/YYYY, YYYY-MM-DD or DD MMM YY/YYYY (credit card format)
+ANY_DATE_RE = re.compile(
+    r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b'
+    r'|\b\d{4}[-/]\d{1,2}[-/]\d{1,2}\b'
+    r'|\b\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\b'
+)
+GROUPED_AMOUNT_RE = re.compile(r'\b\d{1,3}(?:,\d{3})*\.?\d{0,2}\b')
+SLASH_DATE_RE = re.compile(r'\d{2}/\d{2}/\d{4}')
+LEADING_NUMERIC_DATE_RE = re.compile(r'\d{2}[-/]\d{2}[-/]\d{4}')
+DECIMAL_AMOUNT_RE = re.compile(r'([\d,]+\.\d{2})')
+DECIMAL_AMOUNT_TOKEN_RE = re.compile(r'[\d,]+\.\d{2}$')
+TRAILING_BALANCE_RE = re.compile(r'([\d,]+\.\d{2})$')
+
+# --- ICICI credit card table rows ---
+
+ICICI_CC_ROW_DATE_RE = re.compile(r'\d{2}/\d{2}/\d{4}')
+ICICI_CC_ROW_AMOUNT_RE = re.compile(r'[\d,]+\.?\d*(\s*(CR|DR))?$')
+ICICI_CC_ROW_PLAIN_AMOUNT_RE = re.compile(r'^\d+[\d,]*\.?\d*$')
+ICICI_CC_ROW_SERIAL_RE = re.compile(r'^\d+')
+
+# --- Bank credit card text lines ---
+
+ICICI_CC_LINE = PatternAlternation('icici_cc', [
+    # Pattern 1: Date SerNo Description Amount CR/DR
+    r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d,]+\.?\d*)\s+(CR|DR)\s*$',
+    # Pattern 2: Date SerNo Description RewardPoints IntlAmount Amount CR/DR
+    r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+(\d+)\s+([^\d\s]*)\s+([\d,]+\.?\d*)\s+(CR|DR)\s*$',
+    # Pattern 3: Date SerNo Description Amount (no CR/DR suffix - most common for purchases)
+    r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d,]+\.?\d*)\s*$',
+    # Pattern 4: Date SerNo Description RewardPoints Amount (no CR/DR)
+    r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+(\d+)\s+([\d,]+\.?\d*)\s*$',
+    # Pattern 5: More flexible pattern with optional spaces and suffixes
+    r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d,]+\.?\d*)\s*(CR|DR)?\s*.*$',
+    # Pattern 6: Very flexible - any line starting with date and serial number
+    r'(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)[\s\d,]*?([\d,]+\.?\d*)\s*(CR|DR)?.*$',
+])
+
+# IndusInd: DD/MM/YYYY MERCHANT_DESCRIPTION AMOUNT DR/CR
+INDUSIND_CC_LINE_RE = re.compile(r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+(DR|CR)')
+
+# HDFC: DD/MM/YYYY MERCHANT_DESCRIPTION AMOUNT[Cr]
+HDFC_CC_LINE_RE = re.compile(r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})(Cr)?')
+
+# SBI: DD MMM YY ... AMOUNT C/D
+SBI_CC_DATE_RE = re.compile(r'^(\d{1,2}\s+[A-Za-z]{3}\s+\d{2})\s+')
+SBI_CC_AMOUNT_RE = re.compile(r'\s+([0-9,]+\.?\d{0,2})\s*([CD])\s*$')
+
+# --- Generic bank statement text (schema inference) ---
+
+SCHEMA_TRANSACTION_LINE = PatternAlternation('schema', [
+    # Standard: DD-MM-YYYY [MODE] [DETAILS] [AMOUNT] BALANCE
+    r'(\d{2}-\d{2}-\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})$',
+    # Alternative: DD/MM/YYYY format
+    r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})$',
+    # Credit card format: DD MMM YY with C/D/CR/DR suffix
+    r'(\d{1,2}\s+[A-Za-z]{3}\s+\d{2})\s+(.+?)\s+([\d,]+\.\d{2}\s*(?:CR|DR|C|D)?)$',
+    # With explicit debit/credit columns
+    r'(\d{2}-\d{2}-\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})$',
+    # Simplified pattern for edge cases
+    r'(\d{2}[-/]\d{2}[-/]\d{4})\s+(.+)\s+([\d,]+\.\d{2})$',
+])
+
+# Tried in order (not merged): the first shape that appears anywhere wins
+SCHEMA_FLEXIBLE_DATE_RES = [
+    re.compile(r'(\d{2}[-/]\d{2}[-/]\d{4})'),           # DD-MM-YYYY
+    re.compile(r'(\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4})'),   # DD MMM YY
+]
+# Amount with optional credit card C/D/CR/DR suffix
+SCHEMA_SUFFIXED_AMOUNT_RE = re.compile(r'([\d,]+\.\d{2}\s*(?:CR|DR|C|D)?)')
+
+# Narration codes that mark a line as transaction text (case-sensitive)
+SCHEMA_TRANSACTION_INDICATORS = KeywordAutomaton([
+    # UPI patterns
+    'UPI/', 'UPI-',
+    # ICICI specific codes from bank statement legends
+    'BBPS', 'BCTT', 'BIL/', 'BPAY', 'CCWD', 'DTAX', 'EBA/', 'ISEC', 'IDTX',
+    'IMPS/', 'INF/', 'INFT', 'LCCBRN', 'LNPY', 'MMT/', 'NETG', 'NEFT/', 'ONL/',
+    'PAC/', 'PAVC', 'PAYC', 'RCHG', 'SGB', 'SMO/', 'TOP/', 'UCCBRN', 'VAT/',
+    'MAT/', 'NFS/', 'VPS/', 'IPS/', 'RTGS/',
+    # Generic banking patterns
+    'ACH/', 'CORP/', 'BANK/', 'OFI/', 'COLL', 'SAL-', 'SALARY', 'CMS/',
+    'ECS/', 'NACH/', 'MANDATE/', 'REVERSAL', 'REFUND', 'INTEREST',
+    'CHARGES', 'TAX', 'TDS', 'GST', 'DIVIDEND', 'BONUS', 'COMMISSION',
+    # Additional common patterns
+    'FD clos', 'ATM/', 'POS/', 'CREDIT', 'DEBIT',
+])
+# Balance brought/carried forward rows
+SCHEMA_BALANCE_FORWARD_TERMS = KeywordAutomaton(['B/F', 'C/F', 'BALANCE B/F', 'BALANCE C/F'])
+# Credit card statement summary items (matched against the lowercased line)
+_CARD_SUMMARY_TERMS = [
+    'minimum amount due', 'minimum due', 'payment due', 'total amount due',
+    'outstanding balance', 'current balance', 'previous balance',
+    'credit limit', 'available credit', 'cash advance limit',
+    'statement date', 'due date', 'payment due date',
+    'total credits', 'total debits', 'finance charges',
+    'late payment fee', 'overlimit fee', 'annual fee',
+]
+CREDIT_CARD_SUMMARY_TERMS = KeywordAutomaton(_CARD_SUMMARY_TERMS)
+# Direction of a transaction without a running balance (matched against the lowercased description)
+SCHEMA_INCOME_KEYWORDS = KeywordAutomaton([
+    'fd clos', 'credit', 'salary', 'sal-', 'interest', 'dividend', 'bonus', 'refund', 'reversal',
+    # ICICI specific income patterns: fund transfers, recharges can be income in some contexts
+    'inf/', 'inft', 'rchg', 'sgb',
+])
+SCHEMA_EXPENSE_KEYWORDS = KeywordAutomaton([
+    'payment', 'transfer', 'withdrawal', 'charges', 'tax', 'tds', 'gst',
+    # ICICI specific expense patterns: bill payments, taxes, fees
+    'bbps', 'bpay', 'ccwd', 'dtax', 'idtx', 'bil/', 'onl/', 'top/', 'pac/', 'pavc', 'payc',
+    'lccbrn', 'uccbrn', 'vat/', 'mat/', 'nfs/',
+])
+
+# --- Bank credit card text lines: summary and policy text (matched against the lowercased line) ---
+
+# The mixed-case entries can't occur in a lowercased line; matching them would also
+# drop CONTACTLESS purchases, so they stay as they are
+HDFC_CC_SUMMARY_TERMS = KeywordAutomaton(_CARD_SUMMARY_TERMS + [
+    'In case you wish to update', 'please write a letter',
+    'For queries', 'Contact', 'Customer Care',
+])
+SBI_CC_SUMMARY_TERMS = KeywordAutomaton(_CARD_SUMMARY_TERMS + [
+    'reward points summary', 'cashback summary', 'offer details',
+    'important information', 'terms and conditions', 't&c apply',
+    'cashback will be posted', 'balance enquiry',
+])
+
+# --- Table rows read as text lines ---
+
+# Transaction codes and banking words (matched against the lowercased line)
+TRANSACTION_ROW_KEYWORDS = KeywordAutomaton([
+    # UPI patterns
+    'upi', 'upi-',
+    # ICICI specific codes
+    'bbps', 'bctt', 'bil', 'bpay', 'ccwd', 'dtax', 'eba', 'isec', 'idtx',
+    'imps', 'inf', 'inft', 'lccbrn', 'lnpy', 'mmt', 'netg', 'neft', 'onl',
+    'pac', 'pavc', 'payc', 'rchg', 'sgb', 'smo', 'top', 'uccbrn', 'vat',
+    'mat', 'nfs', 'vps', 'ips', 'rtgs',
+    # Generic banking patterns
+    'ach', 'banking', 'transfer', 'payment', 'corp', 'bank', 'ofi', 'coll',
+    'salary', 'cms', 'ecs', 'nach', 'mandate', 'reversal', 'refund', 'interest',
+    'charges', 'tax', 'tds', 'gst', 'dividend', 'bonus', 'commission', 'credit', 'debit',
+])
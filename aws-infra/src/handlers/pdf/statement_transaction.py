@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Compact transaction records built by the statement parsers
+
+Parsers used to build one dict per transaction that held the description
+again in 'details' (often behind a prefix such as "HDFC CC | ") and a third
+time inside 'raw_line'. A Transaction keeps one copy: details is derived from
+the description and a shared prefix/suffix (or the row's serial number), and
+raw_line from the source line or table cells, both only when read; a
+description read from a text line is kept as its span in that line. Records
+answer txn['amount'], txn.get(...) and txn['category'] = ... like the old
+dicts and become the same JSON objects only when a response or cache entry is
+encoded.
+"""
+
+import sys
+
+# Keys (in JSON order) of each record shape, as the parsers used to build them
+TABLE_FIELDS = ('date', 'description', 'amount', 'balance', 'type', 'mode', 'details', 'raw_line')
+CARD_FIELDS = ('date', 'description', 'amount', 'type', 'mode', 'details', 'raw_line')
+SCHEMA_FIELDS = ('date', 'mode', 'description', 'details', 'amount', 'balance', 'type', 'raw_line',
+                 'pattern_used')
+
+DETAILS_SEPARATOR = ' | '
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Transaction:
+    """One parsed transaction; details and raw_line are computed on access"""
+
+    __slots__ = ('date', '_description', 'amount', 'balance', 'type', 'mode', 'pattern_used',
+                 'details_prefix', 'details_suffix', 'serial_no', '_details', '_raw', '_fields', '_extra')
+
+    def __init__(self, fields, date, description, amount, type, balance=None, mode=None, details=None,
+                 details_prefix=None, details_suffix='', raw_line=None, row=None, pattern_used=None,
+                 serial_no=None, description_span=None):
+        self._fields = fields
+        self.date = date
+        # With description_span the description is raw_line[start:end].strip(), sliced when read
+        self._description = description if description_span is None else description_span
+        self.amount = amount
+        self.balance = balance
+        self.type = type
+        # Modes, issuer prefixes and pattern names repeat on every row of a statement; per-row values
+        # such as serial numbers do not and are never interned
+        self.mode = _intern(mode)
+        self.pattern_used = _intern(pattern_used)
+        self.details_prefix = _intern(details_prefix)
+        self.details_suffix = details_suffix
+        self.serial_no = serial_no
+        self._details = details
+        # Table rows keep their cells and are only joined when raw_line is read
+        self._raw = tuple(row) if row is not None else raw_line
+        self._extra = None
+
+    @property
+    def description(self):
+        if isinstance(self._description, tuple):
+            start, end = self._description
+            return self._raw[start:end].strip()
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        self._description = value
+
+    @property
+    def details(self):
+        if self._details is not None:
+            return self._details
+        prefix = self.details_prefix if self.serial_no is None else f"SerNo: {self.serial_no}"
+        if prefix is None:
+            return self.description + self.details_suffix
+        return prefix + DETAILS_SEPARATOR + self.description + self.details_suffix
+
+    @details.setter
+    def details(self, value):
+        self._details = value
+
+    @property
+    def raw_line(self):
+        if isinstance(self._raw, tuple):
+            return ' | '.join(str(cell) for cell in self._raw if cell)
+        return self._raw
+
+    @raw_line.setter
+    def raw_line(self, value):
+        # A description sliced from the old line is kept before the line is replaced
+        self._description = self.description
+        self._raw = value
+
+    def keys(self):
+        return self._fields + tuple(self._extra or ())
+
+    def to_dict(self):
+        """The JSON object this transaction is returned as"""
+        record = {field: getattr(self, field) for field in self._fields}
+        if self._extra:
+            record.update(self._extra)
+        return record
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in self._fields or bool(self._extra and key in self._extra)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._fields) + len(self._extra or ())
+
+    def __eq__(self, other):
+        if isinstance(other, Transaction):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+def encode_transaction(obj):
+    """json.dumps default= hook that writes transactions as their dict form"""
+    if isinstance(obj, Transaction):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Keyword categories for transactions the ML categorizer could not categorize
+
+Used by the parser when a chunk's categorizer invoke fails, and by the
+categorizers' _fallback_categorization when their model is unavailable, so
+both give the same categories.
+"""
+
+from keyword_matcher import KeywordAutomaton
+
+# (category, method, keywords, income only), first match wins
+FALLBACK_RULES = [
+    ('Food & Drink', 'fallback_food', ['swiggy', 'zomato', 'food', 'restaurant', 'dining'], False),
+    ('Transport', 'fallback_transport', ['uber', 'ola', 'taxi', 'transport', 'metro', 'bus'], False),
+    ('Groceries', 'fallback_grocery', ['grocery', 'supermarket', 'vegetables', 'fruits'], False),
+    ('Salary', 'fallback_income', ['salary', 'income', 'payroll'], True),
+    ('Fuel', 'fallback_fuel', ['fuel', 'petrol', 'diesel'], False),
+]
+
+# Every rule's keywords in one automaton, valued by rule index, so a description is scanned once
+_RULE_KEYWORDS = KeywordAutomaton(
+    (keyword, index) for index, (_, _, keywords, _) in enumerate(FALLBACK_RULES) for keyword in keywords)
+
+
+def fallback_categorization(description, amount):
+    """Category result in the categorizer's result shape"""
+    if not description:
+        return {"category": "Miscellaneous", "confidence": 0.1, "processing_time_ms": 1,
+                "method": "fallback_no_description"}
+
+    for index in sorted(_RULE_KEYWORDS.values_in(description.lower())):
+        category, method, _, income_only = FALLBACK_RULES[index]
+        if income_only and not (amount and amount > 0):
+            continue
+        return {"category": category, "confidence": 0.7, "processing_time_ms": 1, "method": method}
+    return {"category": "Miscellaneous", "confidence": 0.3, "processing_time_ms": 1, "method": "fallback"}
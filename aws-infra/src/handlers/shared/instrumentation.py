@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Per-stage timings and counters, emitted in CloudWatch Embedded Metric Format
+
+Stages are timed with context-manager spans and events are counted as they
+happen:
+
+    with metrics.span('pdf_tables'):
+        tables = page.extract_tables()
+    metrics.count('tables_tried')
+
+Handlers are wrapped with @instrumented(service), which resets the metrics
+when an invocation starts and calls metrics.emit(service) when it returns.
+emit() prints one EMF JSON line (CloudWatch turns its fields into
+metrics under METRICS_NAMESPACE) and returns the same numbers as a `timings`
+block for the response. Time spent in a stage is summed over all of its
+spans, so nested stages overlap their parents. METRICS_EMF=0 stops the log
+lines.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_NAMESPACE = 'Spendulon'
+
+
+class Metrics:
+    """Stage timings (ms) and counters for the current invocation; safe to use from threads"""
+
+    def __init__(self, namespace=None):
+        self.namespace = namespace or os.environ.get('METRICS_NAMESPACE', DEFAULT_NAMESPACE)
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._counters = {}
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block and add it to the stage's total"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, (time.perf_counter() - start_time) * 1000)
+
+    def timed(self, stage):
+        """Decorator form of span() for a function that is one stage"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_time(self, stage, elapsed_ms):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + elapsed_ms
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def timings(self):
+        """{'stages_ms': {...}, 'counters': {...}} collected since the last reset"""
+        with self._lock:
+            return {
+                'stages_ms': {stage: round(elapsed_ms, 1) for stage, elapsed_ms in self._stages.items()},
+                'counters': dict(self._counters),
+            }
+
+    def emf_record(self, service, timings=None):
+        """EMF log object for the collected timings and counters, with a Service dimension"""
+        timings = timings or self.timings()
+        metric_definitions = []
+        record = {'Service': service}
+        for stage, elapsed_ms in timings['stages_ms'].items():
+            record[f"{stage}_ms"] = elapsed_ms
+            metric_definitions.append({'Name': f"{stage}_ms", 'Unit': 'Milliseconds'})
+        for name, value in timings['counters'].items():
+            record[name] = value
+            metric_definitions.append({'Name': name, 'Unit': 'Count'})
+        record['_aws'] = {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': self.namespace,
+                'Dimensions': [['Service']],
+                'Metrics': metric_definitions,
+            }],
+        }
+        return record
+
+    def emit(self, service):
+        """Write the EMF line for this invocation and return its timings block"""
+        timings = self.timings()
+        if os.environ.get('METRICS_EMF', '1') == '1' and (timings['stages_ms'] or timings['counters']):
+            # EMF lines must reach the log unprefixed, so they bypass the logging handlers
+            sys.stdout.write(json.dumps(self.emf_record(service, timings), separators=(',', ':')) + '\n')
+            sys.stdout.flush()
+        return timings
+
+
+def instrumented(service):
+    """Lambda handler decorator: fresh metrics for every invocation, emitted when it returns"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            metrics.reset()
+            try:
+                return handler(event, context)
+            finally:
+                metrics.emit(service)
+        return wrapper
+    return decorator
+
+
+def timings_requested(event, body=None):
+    """Whether the caller asked for a timings block (body "timings": true, ?timings=1 or RESPONSE_TIMINGS=1)"""
+    body = body if isinstance(body, dict) else {}
+    query = (event or {}).get('queryStringParameters') or {}
+    return (body.get('timings') is True or query.get('timings') in ('1', 'true') or
+            os.environ.get('RESPONSE_TIMINGS', '0') == '1')
+
+
+# Shared by every module of a handler package
+metrics = Metrics()
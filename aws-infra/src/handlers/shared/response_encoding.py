@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Lambda proxy responses in compact JSON, NDJSON or gzip
+
+Results used to be written with json.dumps(result, indent=2). The encoder
+drops the indentation by default and can project records (transactions or
+ML results) down to the requested fields. For large results it can also
+write NDJSON: a header object on the first line, then one record per line.
+Either body can be gzipped; API Gateway then needs a binary media type that
+matches the request's Accept header.
+
+The format comes from the request (body "response_format" / "fields" /
+"response_encoding", the query string, or the Accept header), falling back
+to RESPONSE_FORMAT ("pretty", "compact" or "ndjson").
+"""
+
+import base64
+import gzip
+import json
+import os
+
+FORMAT_PRETTY = 'pretty'
+FORMAT_COMPACT = 'compact'
+FORMAT_NDJSON = 'ndjson'
+RESPONSE_FORMATS = (FORMAT_PRETTY, FORMAT_COMPACT, FORMAT_NDJSON)
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+GZIP_CONTENT_TYPE = 'application/gzip'
+
+_COMPACT_SEPARATORS = (',', ':')
+
+
+class ResponseOptions:
+    """How a handler should encode its result"""
+
+    def __init__(self, response_format=FORMAT_COMPACT, fields=None, gzip_body=False):
+        self.response_format = response_format
+        self.fields = fields
+        self.gzip_body = gzip_body
+
+    @property
+    def pretty(self):
+        return self.response_format == FORMAT_PRETTY
+
+
+def _header(event, name):
+    for key, value in ((event or {}).get('headers') or {}).items():
+        if key.lower() == name:
+            return value or ''
+    return ''
+
+
+def _field_list(fields):
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    if not isinstance(fields, (list, tuple)):
+        return None
+    fields = tuple(field.strip() for field in fields if isinstance(field, str) and field.strip())
+    return fields or None
+
+
+def response_options(event, body=None):
+    """Response format requested by an API Gateway or direct-invocation event"""
+    body = body if isinstance(body, dict) else {}
+    query = (event or {}).get('queryStringParameters') or {}
+    accept = _header(event, 'accept')
+
+    response_format = body.get('response_format') or query.get('format')
+    if not response_format and NDJSON_CONTENT_TYPE in accept:
+        response_format = FORMAT_NDJSON
+    if response_format not in RESPONSE_FORMATS:
+        response_format = os.environ.get('RESPONSE_FORMAT', FORMAT_COMPACT)
+        if response_format not in RESPONSE_FORMATS:
+            response_format = FORMAT_COMPACT
+
+    # Gzip only on explicit request: browsers send Accept-Encoding: gzip on every call,
+    # but API Gateway only turns a base64 body back into bytes for binary media types
+    gzip_body = body.get('response_encoding') == 'gzip' or GZIP_CONTENT_TYPE in accept
+
+    return ResponseOptions(response_format, _field_list(body.get('fields') or query.get('fields')), gzip_body)
+
+
+def project(record, fields):
+    """Record reduced to the requested fields (records are dicts or dict-like)"""
+    if not fields:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def encode_body(result, options, records_key=None, default=None):
+    """(body text, content type) for a result whose records sit under result[records_key]"""
+    records = result.get(records_key) if records_key else None
+    if records is not None and options.fields:
+        records = [project(record, options.fields) for record in records]
+        result = dict(result, **{records_key: records})
+
+    if options.response_format == FORMAT_NDJSON and records is not None:
+        header = {key: value for key, value in result.items() if key != records_key}
+        header['record_count'] = len(records)
+        lines = [json.dumps(header, separators=_COMPACT_SEPARATORS, default=default)]
+        lines.extend(json.dumps(record, separators=_COMPACT_SEPARATORS, default=default) for record in records)
+        return '\n'.join(lines) + '\n', NDJSON_CONTENT_TYPE
+
+    if options.pretty:
+        return json.dumps(result, indent=2, default=default), 'application/json'
+    return json.dumps(result, separators=_COMPACT_SEPARATORS, default=default), 'application/json'
+
+
+def encode_response(status_code, result, headers, options, records_key=None, default=None):
+    """Lambda proxy response for a result, encoded as the request asked"""
+    body, content_type = encode_body(result, options, records_key, default)
+    headers = dict(headers, **{'Content-Type': content_type})
+    if not options.gzip_body:
+        return {"statusCode": status_code, "headers": headers, "body": body}
+
+    headers['Content-Encoding'] = 'gzip'
+    return {
+        "statusCode": status_code,
+        "headers": headers,
+        "body": base64.b64encode(gzip.compress(body.encode('utf-8'), compresslevel=6)).decode('ascii'),
+        "isBase64Encoded": True
+    }
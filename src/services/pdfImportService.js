@@ -1,5 +1,8 @@
 import { API_CONFIG } from '../config/api-config';
 
+// Follow-up requests allowed for one statement that keeps running out of time
+const MAX_CONTINUATIONS = 20;
+
 class PdfImportService {
   constructor() {
     this.baseUrl = API_CONFIG.baseUrl;
@@ -204,27 +207,40 @@ class PdfImportService {
    */
   async triggerProcessing(userId, walletId, s3Key, s3Bucket, authToken, password = null) {
     try {
-      const response = await fetch(`${this.baseUrl}/pdf/parse`, {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${authToken}`,
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-          s3_bucket: s3Bucket,
-          s3_key: s3Key,
-          userId: userId,
-          walletId: walletId,
-          categorize: true,
-          password: password || null
-        })
-      });
+      let continuationToken = null;
 
-      if (!response.ok) {
-        throw new Error(`Failed to trigger processing: ${response.status}`);
+      // A long statement comes back as 202 with a continuation_token until every page is parsed
+      for (let attempt = 0; attempt < MAX_CONTINUATIONS; attempt++) {
+        const response = await fetch(`${this.baseUrl}/pdf/parse`, {
+          method: 'POST',
+          headers: {
+            'Authorization': `Bearer ${authToken}`,
+            'Content-Type': 'application/json'
+          },
+          body: JSON.stringify({
+            s3_bucket: s3Bucket,
+            s3_key: s3Key,
+            userId: userId,
+            walletId: walletId,
+            categorize: true,
+            password: password || null,
+            ...(continuationToken && { continuation_token: continuationToken })
+          })
+        });
+
+        if (!response.ok) {
+          throw new Error(`Failed to trigger processing: ${response.status}`);
+        }
+
+        const result = await response.json();
+        if (response.status !== 202) {
+          return result;
+        }
+        continuationToken = result.continuation_token;
+        console.log(`PDF still parsing, continuing from page ${result.next_page}`);
       }
 
-      return await response.json();
+      throw new Error('Failed to trigger processing: statement still not parsed after the maximum number of continuations');
     } catch (error) {
       console.error('Trigger processing error:', error);
       throw error;